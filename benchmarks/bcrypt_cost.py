@@ -0,0 +1,34 @@
+# benchmarks/bcrypt_cost.py
+"""
+bcrypt hash time per cost factor on this machine, and the cost the startup
+calibration would pick for PASSWORD_HASH_TARGET_MS.
+
+Use it to choose a PASSWORD_HASH_ROUNDS to pin across workers / replicas.
+
+    python benchmarks/bcrypt_cost.py --min 10 --max 14 --target-ms 250
+"""
+import argparse
+import statistics
+
+from omniai.core.hashing import calibrate_bcrypt_rounds, measure_bcrypt_seconds
+
+
+def run(min_rounds: int, max_rounds: int, target_ms: float, samples: int) -> None:
+    print(f"bcrypt cost vs hash time ({samples} samples each)")
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings = [measure_bcrypt_seconds(rounds) * 1000 for _ in range(samples)]
+        marker = "  <= target" if statistics.median(timings) <= target_ms else ""
+        print(f"  cost {rounds:2d}   median {statistics.median(timings):8.1f} ms   max {max(timings):8.1f} ms{marker}")
+
+    rounds, elapsed_ms = calibrate_bcrypt_rounds(target_ms, min_rounds, max_rounds)
+    print(f"calibrated for {target_ms:.0f} ms target: cost {rounds} ({elapsed_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min", dest="min_rounds", type=int, default=10)
+    parser.add_argument("--max", dest="max_rounds", type=int, default=14)
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+    run(args.min_rounds, args.max_rounds, args.target_ms, args.samples)
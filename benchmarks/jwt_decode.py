@@ -0,0 +1,58 @@
+# benchmarks/jwt_decode.py
+"""
+decode_token (with the verified-token cache) vs plain jwt.decode.
+
+Simulates a worker seeing `--clients` distinct tokens, each reused for its
+whole lifetime, and decodes `--requests` of them in random order.
+
+    python benchmarks/jwt_decode.py --requests 200000 --clients 2000
+"""
+import argparse
+import random
+import time
+import uuid
+
+import jwt
+
+from omniai.core.config import settings
+from omniai.core.jwt import create_access_token, decode_token, verified_token_cache
+
+
+def plain_decode(token: str) -> None:
+    jwt.decode(
+        token,
+        settings.JWT_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+        options={"verify_exp": True, "require": ["exp", "sub"]},
+    )
+
+
+def run(requests: int, clients: int) -> None:
+    tokens = [create_access_token({"sub": f"usr_{uuid.uuid4().hex}"}) for _ in range(clients)]
+    stream = [random.choice(tokens) for _ in range(requests)]
+
+    start = time.perf_counter()
+    for token in stream:
+        plain_decode(token)
+    plain = time.perf_counter() - start
+
+    verified_token_cache.clear()
+    start = time.perf_counter()
+    for token in stream:
+        decode_token(token)
+    cached = time.perf_counter() - start
+
+    stats = verified_token_cache.stats()
+    print(f"{requests} decodes over {clients} distinct tokens ({settings.JWT_ALGORITHM})")
+    print(f"  jwt.decode        {requests / plain:12,.0f} /s   {plain / requests * 1e6:7.2f} µs each")
+    print(f"  decode_token      {requests / cached:12,.0f} /s   {cached / requests * 1e6:7.2f} µs each")
+    print(f"  cache hit rate    {stats['hit_rate']:.2%} ({stats['entries']} entries, {stats['evictions']} evictions)")
+    print(f"  speedup           {plain / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=2_000)
+    args = parser.parse_args()
+    run(args.requests, args.clients)
@@ -0,0 +1,117 @@
+# benchmarks/logging_throughput.py
+"""
+Request throughput with the default logging vs LOG_ASYNC=true.
+
+Starts one uvicorn worker per mode with stdout going to a file (as it would
+to a container log driver), then drives it over HTTP with a fixed number of
+concurrent clients for a fixed time.
+
+    python benchmarks/logging_throughput.py --seconds 10 --concurrency 32
+
+DATABASE_URL must point at a reachable, migrated database: a throwaway user
+is created so /v1/me (auth, tenant check, one query, four log events) can be
+measured next to /v1/health.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+MODES = {"default": {"LOG_ASYNC": "false"}, "async": {"LOG_ASYNC": "true"}}
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/v1/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("app did not start")
+
+
+async def login_headers(client: httpx.AsyncClient) -> dict[str, str]:
+    email = f"bench-{uuid.uuid4().hex[:12]}@omniai.dev"
+    password = "BenchPass123!"
+    (await client.post("/v1/auth/signup", json={"email": email, "password": password})).raise_for_status()
+    login = await client.post("/v1/auth/login", data={"username": email, "password": password})
+    login.raise_for_status()
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+async def load(
+    client: httpx.AsyncClient, path: str, headers: dict[str, str], seconds: float, concurrency: int
+) -> tuple[int, list[float]]:
+    samples: list[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(samples), samples
+
+
+async def run_mode(mode: str, port: int, seconds: float, concurrency: int, log_dir: Path) -> dict[str, tuple[float, float]]:
+    log_path = log_dir / f"{mode}.log"
+    env = {**os.environ, **MODES[mode]}
+    with log_path.open("wb") as log_file:
+        app = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "omniai.main:app", "--port", str(port), "--no-access-log"],
+            env=env, stdout=log_file, stderr=subprocess.STDOUT,
+        )
+        try:
+            limits = httpx.Limits(max_connections=concurrency)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+                await wait_ready(client)
+                routes = {"/v1/health": {}, "/v1/me": await login_headers(client)}
+                results = {}
+                for path, headers in routes.items():
+                    await load(client, path, headers, min(2.0, seconds), concurrency)  # warm-up
+                    count, samples = await load(client, path, headers, seconds, concurrency)
+                    p99 = sorted(samples)[int(len(samples) * 0.99) - 1]
+                    results[path] = (count / seconds, p99 * 1000)
+                metrics = (await client.get("/metrics")).json()
+        finally:
+            app.terminate()
+            app.wait(10)
+    lines = len(log_path.read_bytes().splitlines())
+    print(f"{mode}: {lines} log lines, logging stats {metrics.get('logging')}")
+    return results
+
+
+async def main(seconds: float, concurrency: int, port: int) -> None:
+    with tempfile.TemporaryDirectory() as log_dir:
+        results = {
+            mode: await run_mode(mode, port, seconds, concurrency, Path(log_dir))
+            for mode in MODES
+        }
+    for path in ("/v1/health", "/v1/me"):
+        print(path)
+        for mode, by_path in results.items():
+            rps, p99 = by_path[path]
+            print(f"  {mode:<8} {rps:8.0f} req/s   p99 {p99:7.1f} ms")
+        base, fast = results["default"][path][0], results["async"][path][0]
+        print(f"  change   {fast / base - 1:+.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.concurrency, args.port))
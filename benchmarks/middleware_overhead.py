@@ -0,0 +1,157 @@
+# benchmarks/middleware_overhead.py
+"""
+Per-request overhead of the middleware stack: BaseHTTPMiddleware vs pure ASGI.
+
+Both stacks run the same trace_id binding and the same tenant authorization
+(`TenantValidationMiddleware.authorize`); only the middleware plumbing differs.
+Requests go through httpx's in-process ASGI transport, so there is no socket I/O.
+
+    python benchmarks/middleware_overhead.py --requests 2000
+
+/v1/health needs nothing. /v1/me needs DATABASE_URL to point at a reachable,
+migrated database (a throwaway user is created); it is skipped otherwise.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+from starlette.types import ASGIApp
+from structlog.contextvars import bind_contextvars, clear_contextvars
+
+from omniai.api.v1 import auth, health, me
+from omniai.core.logging import logger
+from omniai.core.logging_middleware import LoggingMiddleware
+from omniai.core.middleware import PUBLIC_PATHS, TenantValidationMiddleware
+from omniai.db.session import AsyncSessionLocal
+
+CallNext = Callable[[Request], Awaitable[Response]]
+
+
+# --- The stack as it was before the pure-ASGI rewrite ---
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        clear_contextvars()
+        bind_contextvars(trace_id=str(uuid.uuid4()))
+        logger.info(
+            "http_request_start",
+            method=request.method,
+            url=str(request.url),
+            client_ip=request.client.host if request.client else "unknown",
+        )
+        response = await call_next(request)
+        logger.info("http_request_end", status_code=response.status_code, content_length=0)
+        return response
+
+
+class LegacyTenantValidationMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp) -> None:
+        super().__init__(app)
+        self._tenant = TenantValidationMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next: CallNext) -> Response:
+        if request.url.path in PUBLIC_PATHS:
+            return await call_next(request)
+        async with AsyncSessionLocal() as db:
+            request.state.db = db
+            denied = await self._tenant.authorize(request, db)
+            if denied is not None:
+                return denied
+            return await call_next(request)
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+    if legacy:
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyTenantValidationMiddleware)
+    else:
+        app.add_middleware(LoggingMiddleware)
+        app.add_middleware(TenantValidationMiddleware)
+    app.include_router(health.router, prefix="/v1")
+    app.include_router(auth.router, prefix="/v1/auth")
+    app.include_router(me.router, prefix="/v1")
+    return app
+
+
+async def time_route(
+    app: FastAPI, path: str, headers: dict[str, str], requests: int, warmup: int
+) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(warmup):
+            (await client.get(path, headers=headers)).raise_for_status()
+        samples = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return samples
+
+
+async def login_token(app: FastAPI) -> Optional[str]:
+    email = f"bench-{uuid.uuid4().hex[:12]}@omniai.dev"
+    password = "BenchPass123!"
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            signup = await client.post("/v1/auth/signup", json={"email": email, "password": password})
+            if signup.status_code != 201:
+                return None
+            login = await client.post("/v1/auth/login", data={"username": email, "password": password})
+            return str(login.json()["access_token"])
+    except Exception:
+        return None
+
+
+def report(route: str, legacy: list[float], asgi: list[float]) -> None:
+    def row(name: str, samples: list[float]) -> str:
+        us = sorted(s * 1e6 for s in samples)
+        p99 = us[int(len(us) * 0.99) - 1]
+        return f"  {name:<20} mean {statistics.fmean(us):8.1f} µs   p50 {statistics.median(us):8.1f} µs   p99 {p99:8.1f} µs"
+
+    print(route)
+    print(row("BaseHTTPMiddleware", legacy))
+    print(row("pure ASGI", asgi))
+    saved = statistics.fmean(legacy) - statistics.fmean(asgi)
+    print(f"  saved per request    {saved * 1e6:8.1f} µs ({saved / statistics.fmean(legacy):.0%})")
+
+
+async def main(requests: int, warmup: int) -> None:
+    # Rendering is identical in both stacks; keep it off stdout so it doesn't dominate
+    logging.getLogger().setLevel(logging.WARNING)
+
+    legacy_app, asgi_app = build_app(legacy=True), build_app(legacy=False)
+
+    report(
+        "GET /v1/health",
+        await time_route(legacy_app, "/v1/health", {}, requests, warmup),
+        await time_route(asgi_app, "/v1/health", {}, requests, warmup),
+    )
+
+    token = await login_token(asgi_app)
+    if token is None:
+        print("GET /v1/me: skipped (database unavailable or signup failed)")
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+    report(
+        "GET /v1/me",
+        await time_route(legacy_app, "/v1/me", headers, requests, warmup),
+        await time_route(asgi_app, "/v1/me", headers, requests, warmup),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.warmup))
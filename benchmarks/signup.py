@@ -0,0 +1,103 @@
+# benchmarks/signup.py
+"""
+POST /v1/auth/signup latency and how long each signup holds a pooled DB connection.
+
+Runs `--requests` signups, `--concurrency` at a time, through httpx's
+in-process ASGI transport against DATABASE_URL (must be reachable and
+migrated). Connection hold time is measured from pool checkout to checkin.
+
+    PASSWORD_HASH_ROUNDS=4 python benchmarks/signup.py --requests 400 --concurrency 16
+    PASSWORD_HASH_ROUNDS=4 python benchmarks/signup.py --requests 90 --collide
+
+A low bcrypt cost keeps hashing from drowning out the DB work being measured.
+--collide gives every user the same personal-org slug prefix, so slugs clash.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from omniai.api.v1 import auth
+from omniai.core.logging_middleware import LoggingMiddleware
+from omniai.core.middleware import TenantValidationMiddleware
+from omniai.db.session import engine
+
+held: list[float] = []
+_checked_out: dict[int, float] = {}
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+def _on_checkout(_dbapi_connection: Any, connection_record: Any, _connection_proxy: Any) -> None:
+    _checked_out[id(connection_record)] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _on_checkin(_dbapi_connection: Any, connection_record: Any) -> None:
+    started = _checked_out.pop(id(connection_record), None)
+    if started is not None:
+        held.append(time.perf_counter() - started)
+
+
+def build_app() -> FastAPI:
+    # The real signup stack, minus admission control (it would shed the benchmark)
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+    app.add_middleware(TenantValidationMiddleware)
+    app.include_router(auth.router, prefix="/v1/auth")
+    return app
+
+
+def percentiles(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p99 = ms[max(0, int(len(ms) * 0.99) - 1)]
+    return f"p50 {statistics.median(ms):7.2f} ms   p99 {p99:7.2f} ms   max {ms[-1]:7.2f} ms"
+
+
+async def main(requests: int, concurrency: int, collide: bool) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    run_id = uuid.uuid4().hex[:8]
+    if collide:
+        # Same first 26 slug characters for everyone in this run
+        emails = [f"c{run_id}{run_id}-{n}@omniai.dev" for n in range(requests)]
+    else:
+        emails = [f"bench-{n}-{run_id}@omniai.dev" for n in range(requests)]
+    latencies: list[float] = []
+    failures = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def signup(email: str) -> None:
+            nonlocal failures
+            async with gate:
+                start = time.perf_counter()
+                response = await client.post("/v1/auth/signup", json={"email": email, "password": "BenchPass123!"})
+                latencies.append(time.perf_counter() - start)
+                failures += response.status_code != 201
+
+        start = time.perf_counter()
+        await asyncio.gather(*(signup(email) for email in emails))
+        elapsed = time.perf_counter() - start
+
+    print(f"{requests} signups, concurrency {concurrency}{', colliding slugs' if collide else ''}")
+    print(f"  throughput        {requests / elapsed:8.1f} signups/s   ({failures} failed)")
+    print(f"  latency           {percentiles(latencies)}")
+    print(f"  connection held   {percentiles(held)}   ({len(held)} checkouts)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--collide", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.collide))
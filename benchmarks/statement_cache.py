@@ -0,0 +1,123 @@
+# benchmarks/statement_cache.py
+"""
+Python CPU per execution of the hot authorization queries: statements rebuilt
+on every call (as they used to be) vs the module-level constants.
+
+For each query, runs `--iterations` executions against DATABASE_URL on one
+connection and reports client CPU time (time.process_time: statement
+construction, SQLAlchemy cache-key / compile lookup, asyncpg encode / decode)
+and wall time per execution. The constants are also run with the prepared
+statement cache off, which is what DB_PGBOUNCER=true costs.
+
+    python benchmarks/statement_cache.py --iterations 5000
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Callable
+
+from sqlalchemy import Executable, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from omniai.api.v1.me import _USER_WITH_ORGS
+from omniai.core.config import settings
+from omniai.models.organization import Organization
+from omniai.models.user import User, user_organization
+from omniai.services.auth import _USER_BY_EMAIL
+from omniai.services.organization import _MEMBERSHIP_CLAIM_ROWS, _USER_ORG_ROLE
+
+USER_ID = "usr_statement_cache_benchmark"
+ORG_ID = "org_statement_cache_benchmark"
+EMAIL = "statement-cache@benchmark.invalid"
+
+# (name, rebuilt per call, constant, parameters for the constant)
+QUERIES: list[tuple[str, Callable[[], Executable], Executable, dict[str, Any]]] = [
+    (
+        "authenticate_user (email)",
+        lambda: select(User).where(User.email == EMAIL),
+        _USER_BY_EMAIL,
+        {"email": EMAIL},
+    ),
+    (
+        "get_user_org_role",
+        lambda: select(user_organization.c.role)
+        .where(user_organization.c.user_id == USER_ID)
+        .where(user_organization.c.organization_id == ORG_ID),
+        _USER_ORG_ROLE,
+        {"user_id": USER_ID, "org_id": ORG_ID},
+    ),
+    (
+        "load_membership_claim",
+        lambda: select(
+            User.membership_version,
+            user_organization.c.organization_id,
+            user_organization.c.role,
+            user_organization.c.is_default,
+        )
+        .select_from(User)
+        .outerjoin(user_organization, user_organization.c.user_id == User.id)
+        .where(User.id == USER_ID)
+        .limit(65),
+        _MEMBERSHIP_CLAIM_ROWS,
+        {"user_id": USER_ID, "limit": 65},
+    ),
+    (
+        "/me user + orgs",
+        lambda: select(
+            User.email,
+            Organization.id,
+            Organization.name,
+            Organization.slug,
+            user_organization.c.role,
+            user_organization.c.is_default,
+        )
+        .select_from(User)
+        .outerjoin(user_organization, user_organization.c.user_id == User.id)
+        .outerjoin(Organization, Organization.id == user_organization.c.organization_id)
+        .where(User.id == USER_ID)
+        .order_by(Organization.id),
+        _USER_WITH_ORGS,
+        {"user_id": USER_ID},
+    ),
+]
+
+
+async def measure(conn: AsyncConnection, iterations: int, run: Callable[[], Any]) -> tuple[float, float]:
+    """(CPU µs, wall µs) per execution."""
+    for _ in range(50):  # warm the compiled / prepared statement caches
+        (await conn.execute(*run())).fetchall()
+    cpu, wall = time.process_time(), time.perf_counter()
+    for _ in range(iterations):
+        (await conn.execute(*run())).fetchall()
+    return (
+        (time.process_time() - cpu) / iterations * 1e6,
+        (time.perf_counter() - wall) / iterations * 1e6,
+    )
+
+
+async def main(iterations: int) -> None:
+    cached = create_async_engine(settings.DATABASE_URL)
+    uncached = create_async_engine(
+        settings.DATABASE_URL, connect_args={"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+    )
+    print(f"{iterations} executions per query; CPU / wall µs per execution\n")
+    print(f"{'query':28} {'rebuilt':>17} {'constant':>17} {'no stmt cache':>17}  CPU saved")
+    async with cached.connect() as conn, uncached.connect() as conn_uncached:
+        for name, build, statement, params in QUERIES:
+            rebuilt = await measure(conn, iterations, lambda build=build: (build(),))
+            constant = await measure(conn, iterations, lambda s=statement, p=params: (s, p))
+            no_cache = await measure(conn_uncached, iterations, lambda s=statement, p=params: (s, p))
+            print(
+                f"{name:28} "
+                + " ".join(f"{cpu:7.1f} / {wall:7.1f}" for cpu, wall in (rebuilt, constant, no_cache))
+                + f"  {(rebuilt[0] - constant[0]) / rebuilt[0]:8.0%}"
+            )
+    await cached.dispose()
+    await uncached.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
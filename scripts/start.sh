@@ -1,6 +1,12 @@
 #!/bin/sh
 set -e
 
+# Apply pending schema migrations once, before any worker starts. Set
+# RUN_MIGRATIONS=false where a separate release job runs them instead.
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    python -m omniai.db.migrate
+fi
+
 # Build the command dynamically
 CMD="uvicorn omniai.main:app --host ${UVICORN_HOST:-0.0.0.0} --port ${UVICORN_PORT:-8000}"
 
@@ -0,0 +1,65 @@
+# src/omniai/api/v1/audit.py
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from omniai.api.v1.schemas import AuditEventOut, AuditEventPage
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.db.session import get_db
+from omniai.services.audit import list_tenant_events
+
+router = APIRouter()
+
+
+@router.get("/audit/events", response_model=AuditEventPage)
+async def list_audit_events(
+    request: Request,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    action: Optional[str] = None,
+    before_id: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=settings.AUDIT_PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_db),
+) -> AuditEventPage:
+    """
+    The current tenant's audit events in [since, until), newest first. Owners
+    only. Defaults to the last 24 hours; at most AUDIT_QUERY_MAX_DAYS at once.
+    Older pages: `until=next_until&before_id=next_before_id`.
+    Events reach the table within about AUDIT_FLUSH_INTERVAL_SECONDS.
+    """
+    if request.state.membership.role != "owner":
+        logger.warn("audit_query_forbidden", role=request.state.membership.role)
+        raise HTTPException(status_code=403, detail="Only organization owners can read the audit log")
+
+    until = until or datetime.now(timezone.utc)
+    since = since or until - timedelta(days=1)
+    if since.tzinfo is None or until.tzinfo is None:
+        raise HTTPException(status_code=400, detail="since and until need a timezone offset")
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if until - since > timedelta(days=settings.AUDIT_QUERY_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"At most {settings.AUDIT_QUERY_MAX_DAYS} days per query")
+
+    rows, has_more = await list_tenant_events(
+        db, request.state.tenant_id, since, until, limit, action, before_id
+    )
+    return AuditEventPage(
+        items=[
+            AuditEventOut(
+                id=row.id,
+                occurred_at=row.occurred_at,
+                action=row.action,
+                outcome=row.outcome,
+                user_id=row.user_id,
+                trace_id=row.trace_id,
+                client_ip=row.client_ip,
+                detail=row.detail,
+            )
+            for row in rows
+        ],
+        next_until=rows[-1].occurred_at if has_more else None,
+        next_before_id=rows[-1].id if has_more else None,
+    )
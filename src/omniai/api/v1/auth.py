@@ -1,30 +1,45 @@
 ## src/omniai/api/v1/auth.py
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from omniai.api.v1.schemas import Token, UserCreate
-from omniai.core.jwt import create_access_token
+from omniai.api.v1.schemas import RefreshRequest, Token, UserCreate
+from omniai.core.admission import auth_admission
+from omniai.core.audit import audit_log
+from omniai.core.hashing import PasswordHashQueueFull
 from omniai.core.logging import logger
 from omniai.db.session import get_db
 from omniai.models.user import User
-from omniai.services.auth import authenticate_user, create_user_with_org
+from omniai.services.auth import (
+    EmailAlreadyRegistered,
+    authenticate_user,
+    create_user_with_org,
+    issue_access_token,
+)
+from omniai.services.sessions import (
+    RefreshTokenError,
+    revoke_refresh_token,
+    rotate_refresh_token,
+    start_session,
+)
 
 router = APIRouter()
 
-@router.post("/signup", status_code=status.HTTP_201_CREATED)
-async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
-    logger.info("signup_attempt", email=user.email)
+# Admission control sheds credential-stuffing bursts before any DB / bcrypt work.
+# Only the password endpoints: refresh and logout are cheap and must keep working
+# under load, or valid sessions would be shed with them
+password_admission = [Depends(auth_admission)]
 
-    result = await db.execute(select(User).where(User.email == user.email))
-    existing_user = result.scalar_one_or_none()
 
-    if existing_user:
-        logger.warn("signup_failed", email=user.email, reason="email_already_registered")
-        raise HTTPException(status_code=400, detail="Email already registered") from None
+def _client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+@router.post("/signup", status_code=status.HTTP_201_CREATED, dependencies=password_admission)
+async def signup(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
+    logger.info("signup_attempt", email=user.email)
 
     try:
         new_user = await create_user_with_org(
@@ -33,14 +48,25 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)) -> dict[s
             password=user.password
         )
         logger.info("signup_success", user_id=str(new_user.id), email=user.email)
+        audit_log.record("signup", "success", user_id=str(new_user.id), client_ip=_client_ip(request))
         return {"msg": "User created"}
+    except EmailAlreadyRegistered:
+        logger.warn("signup_failed", email=user.email, reason="email_already_registered")
+        audit_log.record(
+            "signup", "failure", client_ip=_client_ip(request), detail={"reason": "email_already_registered"}
+        )
+        raise HTTPException(status_code=400, detail="Email already registered") from None
+    except PasswordHashQueueFull:
+        logger.warn("signup_shed", email=user.email, reason="password_hash_queue_full")
+        raise
     except Exception as e:
         logger.exception("signup_error", email=user.email, error=str(e))
         raise HTTPException(status_code=500, detail="Signup failed") from None
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=password_admission)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ) -> Token:
@@ -49,13 +75,44 @@ async def login(
     user: Optional[User] = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         logger.warn("login_failed", email=form_data.username, reason="invalid_credentials")
+        audit_log.record("login", "failure", client_ip=_client_ip(request), detail={"reason": "invalid_credentials"})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         ) from None
 
-    access_token = create_access_token(data={"sub": str(user.id)})  # ensure str
+    access_token = await issue_access_token(db, str(user.id))  # ensure str
+    refresh_token = await start_session(db, str(user.id))
     logger.info("login_success", user_id=str(user.id), email=user.email)
+    audit_log.record("login", "success", user_id=str(user.id), client_ip=_client_ip(request))
+
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, request: Request, db: AsyncSession = Depends(get_db)) -> Token:
+    """Rotate a refresh token and issue a new access token (no password check)."""
+    try:
+        user_id, refresh_token = await rotate_refresh_token(db, body.refresh_token)
+    except RefreshTokenError as e:
+        logger.warn("refresh_failed", reason=e.reason)
+        audit_log.record("refresh", "failure", client_ip=_client_ip(request), detail={"reason": e.reason})
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from None
+
+    access_token = await issue_access_token(db, user_id)
+    logger.info("refresh_success", user_id=user_id)
+    audit_log.record("refresh", "success", user_id=user_id, client_ip=_client_ip(request))
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
 
-    return Token(access_token=access_token, token_type="bearer")
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest, request: Request, db: AsyncSession = Depends(get_db)) -> None:
+    """Revoke the refresh token's session; idempotent."""
+    user_id = await revoke_refresh_token(db, body.refresh_token)
+    logger.info("logout", user_id=user_id)
+    audit_log.record("logout", "success", user_id=user_id, client_ip=_client_ip(request))
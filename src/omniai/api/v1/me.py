@@ -1,6 +1,9 @@
 # src/omniai/api/v1/me.py
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy import select
+import hashlib
+from typing import Any, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import Row, bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from omniai.api.v1.schemas import OrganizationSummary, UserMe
@@ -11,11 +14,41 @@ from omniai.models.user import User, user_organization
 
 router = APIRouter()
 
+# Built once: only the user_id changes between requests
+_USER_WITH_ORGS = (
+    select(
+        User.email,
+        Organization.id,
+        Organization.name,
+        Organization.slug,
+        user_organization.c.role,
+        user_organization.c.is_default
+    )
+    .select_from(User)
+    .outerjoin(user_organization, user_organization.c.user_id == User.id)
+    .outerjoin(Organization, Organization.id == user_organization.c.organization_id)
+    .where(User.id == bindparam("user_id"))
+    .order_by(Organization.id)
+)
+
+def _etag_for(user_id: str, tenant_id: str, role: str, rows: Sequence[Row[Any]]) -> str:
+    # Strong validator: hashes exactly the fields the representation is built from
+    digest = hashlib.sha256(repr((user_id, tenant_id, role, [tuple(row) for row in rows])).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: a W/ prefix is ignored
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
 @router.get("/me", response_model=UserMe)
 async def read_users_me(
     request: Request,
     db: AsyncSession = Depends(get_db)
-) -> UserMe:
+) -> Response:
     user_id = getattr(request.state, "user_id", None)
     tenant_id = getattr(request.state, "tenant_id", None)
 
@@ -23,35 +56,32 @@ async def read_users_me(
         logger.warn("me_request_missing_context", url=str(request.url))
         raise HTTPException(status_code=401, detail="Authentication required")
 
-    # 1. Fetch user
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
-        logger.warn("me_request_user_not_found")
-        raise HTTPException(status_code=401, detail="User not found")
-
-    # 2. Verify user is member of tenant_id AND get role
-    membership_result = await db.execute(
-        select(user_organization.c.is_default, user_organization.c.role)
-        .where(
-            user_organization.c.user_id == user_id,
-            user_organization.c.organization_id == tenant_id
-        )
-    )
-    membership = membership_result.fetchone()
-    if not membership:
+    # 1. Membership + role were resolved by TenantValidationMiddleware
+    membership = getattr(request.state, "membership", None)
+    if membership is None or membership.role is None:
         logger.warn("me_request_not_org_member")
         raise HTTPException(status_code=403, detail="Not a member of this organization")
 
     role = membership.role
 
-    # 3. Fetch all orgs for user
-    orgs_result = await db.execute(
-        select(Organization.id, Organization.name, Organization.slug, user_organization.c.role, user_organization.c.is_default)
-        .join(user_organization, Organization.id == user_organization.c.organization_id)
-        .where(user_organization.c.user_id == user_id)
-    )
-    orgs = orgs_result.fetchall()
+    # 2. User and all their orgs in ONE query; an org-less user yields one NULL row
+    result = await db.execute(_USER_WITH_ORGS, {"user_id": user_id})
+    rows = result.fetchall()
+    if not rows:
+        logger.warn("me_request_user_not_found")
+        raise HTTPException(status_code=401, detail="User not found")
+
+    email = rows[0].email
+    orgs = [row for row in rows if row.id is not None]
+
+    # 3. Conditional request: unchanged → 304, nothing serialized
+    etag = _etag_for(user_id, tenant_id, role, rows)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization, X-Tenant-ID"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        logger.info("user_profile_not_modified", role_in_active_org=role)
+        return Response(status_code=304, headers=headers)
+
     organizations = [
         OrganizationSummary(
             id=org.id,
@@ -70,10 +100,11 @@ async def read_users_me(
         total_organizations=len(organizations)
     )
 
-    return UserMe(
-        id=user.id,
-        email=user.email,
+    body = UserMe(
+        id=user_id,
+        email=email,
         active_organization_id=tenant_id,
         role_in_active_org=role,
         organizations=organizations
     )
+    return Response(content=body.model_dump_json(), media_type="application/json", headers=headers)
@@ -0,0 +1,52 @@
+# src/omniai/api/v1/metrics.py
+import hmac
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from omniai.core.admission import auth_admission_controller
+from omniai.core.audit import audit_log
+from omniai.core.config import settings
+from omniai.core.hashing import password_hash_policy, password_hash_pool
+from omniai.core.jwt import verified_token_cache
+from omniai.core.logging import logging_stats
+from omniai.core.membership_cache import membership_cache
+from omniai.core.startup import startup_timer
+from omniai.db.pool import pool_stats
+from omniai.db.session import engine, replica_set, shard_map
+
+router = APIRouter()
+
+
+def require_metrics_token(request: Request) -> None:
+    """With METRICS_TOKEN set, /metrics needs `Authorization: Bearer <METRICS_TOKEN>`."""
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Metrics token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def read_metrics() -> dict[str, Any]:
+    """In-process counters for this worker (each uvicorn worker reports its own)."""
+    return {
+        "audit_log": audit_log.stats(),
+        "auth_admission": auth_admission_controller.stats(),
+        "db_pool": pool_stats(engine.pool),
+        "db_replicas": replica_set.stats(),
+        "db_shards": shard_map.stats(),
+        "jwt_verify_cache": verified_token_cache.stats(),
+        "logging": logging_stats(),
+        "membership_cache": membership_cache.stats(),
+        "password_hash_pool": password_hash_pool.stats(),
+        "password_hash_policy": {
+            "rounds": password_hash_policy.rounds,
+            "calibrated_ms": password_hash_policy.calibrated_ms,
+        },
+        "startup": startup_timer.report(),
+    }
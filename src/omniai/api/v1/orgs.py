@@ -0,0 +1,103 @@
+# src/omniai/api/v1/orgs.py
+import base64
+import binascii
+import json
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from omniai.api.v1.schemas import (
+    BulkMembershipRequest,
+    BulkMembershipResponse,
+    MembershipConflictOut,
+    OrganizationPage,
+    OrganizationSummary,
+)
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.db.session import get_db
+from omniai.services.organization import (
+    MembershipChange,
+    get_user_org_role,
+    list_user_organizations,
+    upsert_memberships,
+)
+
+router = APIRouter()
+
+
+# Cursors are opaque to clients: base64url JSON of the last org id and the
+# filter it was issued for, so a cursor can't be replayed under another filter
+def _encode_cursor(after_org_id: str, role: Optional[str]) -> str:
+    raw = json.dumps({"after": after_org_id, "role": role}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, role: Optional[str]) -> str:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        after_org_id = data["after"]
+        cursor_role = data["role"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if not isinstance(after_org_id, str) or cursor_role != role:
+        raise HTTPException(status_code=400, detail="Cursor does not match this query") from None
+    return after_org_id
+
+
+@router.get("/orgs", response_model=OrganizationPage)
+async def list_organizations(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.ORGS_PAGE_SIZE_MAX),
+    role: Optional[Literal["owner", "member"]] = None,
+    db: AsyncSession = Depends(get_db),
+) -> OrganizationPage:
+    """The caller's organizations, a keyset page at a time, in a stable order."""
+    user_id = request.state.user_id
+    page_size = limit or settings.ORGS_PAGE_SIZE
+    after_org_id = _decode_cursor(cursor, role) if cursor else None
+
+    rows, has_more = await list_user_organizations(db, user_id, page_size, after_org_id, role)
+    items = [
+        OrganizationSummary(id=row.id, name=row.name, slug=row.slug, role=row.role, is_default=row.is_default)
+        for row in rows
+    ]
+    logger.info("organizations_listed", count=len(items), has_more=has_more, role=role)
+    return OrganizationPage(
+        items=items,
+        next_cursor=_encode_cursor(rows[-1].id, role) if has_more else None,
+    )
+
+
+@router.put("/orgs/{org_id}/members/bulk", response_model=BulkMembershipResponse)
+async def bulk_upsert_members(
+    org_id: str,
+    body: BulkMembershipRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> BulkMembershipResponse:
+    """
+    Add or update up to ORG_MEMBERS_BULK_MAX memberships of an organization in
+    one statement. Owners only. Only rows that could not be applied are returned.
+    """
+    user_id = request.state.user_id
+    membership = getattr(request.state, "membership", None)
+    if request.state.tenant_id == org_id and membership is not None:
+        role = membership.role
+    else:
+        role = await get_user_org_role(db, user_id, org_id)
+    if role != "owner":
+        logger.warn("bulk_members_forbidden", org_id=org_id, role=role)
+        raise HTTPException(status_code=403, detail="Only organization owners can manage members")
+
+    result = await upsert_memberships(
+        db,
+        org_id,
+        [MembershipChange(m.user_id, m.role, m.is_default) for m in body.members],
+    )
+    return BulkMembershipResponse(
+        changed=len(result.changed_user_ids),
+        conflicts=[MembershipConflictOut(index=c.index, user_id=c.user_id, reason=c.reason) for c in result.conflicts],
+    )
@@ -1,8 +1,11 @@
 # src/omniai/api/v1/schemas.py
 import re
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+from omniai.core.config import settings
 
 
 class UserCreate(BaseModel):
@@ -28,6 +31,11 @@ class UserCreate(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class OrganizationSummary(BaseModel):
@@ -38,9 +46,53 @@ class OrganizationSummary(BaseModel):
     is_default: bool
 
 
+class OrganizationPage(BaseModel):
+    items: List[OrganizationSummary]
+    next_cursor: Optional[str]  # pass back as ?cursor= for the next page; None on the last page
+
+
 class UserMe(BaseModel):
     id: str
     email: str
     active_organization_id: str
     role_in_active_org: str
     organizations: List[OrganizationSummary]
+
+
+class MembershipIn(BaseModel):
+    user_id: str
+    role: Literal["owner", "member"] = "member"
+    is_default: bool = False
+
+
+class BulkMembershipRequest(BaseModel):
+    members: List[MembershipIn] = Field(min_length=1, max_length=settings.ORG_MEMBERS_BULK_MAX)
+
+
+class MembershipConflictOut(BaseModel):
+    index: int  # position in the request's members list
+    user_id: str
+    reason: str  # "duplicate" | "user_not_found" | "default_org_exists"
+
+
+class BulkMembershipResponse(BaseModel):
+    changed: int
+    conflicts: List[MembershipConflictOut]
+
+
+class AuditEventOut(BaseModel):
+    id: int
+    occurred_at: datetime
+    action: str
+    outcome: str
+    user_id: Optional[str] = None
+    trace_id: Optional[str] = None
+    client_ip: Optional[str] = None
+    detail: Optional[Dict[str, Any]] = None
+
+
+class AuditEventPage(BaseModel):
+    items: List[AuditEventOut]
+    # Pass as `until` and `before_id` for the next (older) page
+    next_until: Optional[datetime] = None
+    next_before_id: Optional[int] = None
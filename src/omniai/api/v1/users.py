@@ -0,0 +1,69 @@
+# src/omniai/api/v1/users.py
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from omniai.core.logging import logger
+from omniai.db.instrumentation import query_budget
+from omniai.db.session import get_db
+from omniai.services.provisioning import ImportFormat, import_users, read_records
+
+router = APIRouter()
+
+IMPORT_CONTENT_TYPES: dict[str, ImportFormat] = {
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+    "text/csv": "csv",
+}
+
+
+class RowReportResponse(StreamingResponse):
+    """
+    NDJSON report streamed while the request body is still being read.
+
+    StreamingResponse normally listens for client disconnects on `receive`,
+    which would swallow the body chunks the report is computed from; here the
+    body iterator owns `receive`, and a disconnect surfaces there instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, _scope: Scope, _receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+# Several statements per batch: the request-wide query budget doesn't apply
+@router.post("/users/import", dependencies=[Depends(query_budget(None))])
+async def import_users_endpoint(request: Request, db: AsyncSession = Depends(get_db)) -> RowReportResponse:
+    """
+    Bulk-create users in the active organization from a JSONL or CSV body
+    (`email`, `password` per record). Owners only. Responds with one NDJSON
+    result line per input row, then a summary line.
+    """
+    membership = getattr(request.state, "membership", None)
+    if membership is None or membership.role != "owner":
+        logger.warn("user_import_forbidden", role=getattr(membership, "role", None))
+        raise HTTPException(status_code=403, detail="Only organization owners can import users")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Send the records as one of: {', '.join(sorted(IMPORT_CONTENT_TYPES))}",
+        )
+
+    tenant_id: str = request.state.tenant_id
+    logger.info("user_import_start", organization_id=tenant_id, format=fmt)
+
+    async def report() -> AsyncIterator[bytes]:
+        records = read_records(request.stream(), fmt)
+        async for result in import_users(db, records, tenant_id, imported_by=request.state.user_id):
+            yield (json.dumps(result) + "\n").encode("utf-8")
+
+    return RowReportResponse(report())
@@ -0,0 +1,140 @@
+# src/omniai/core/admission.py
+"""
+Admission control for the CPU-heavy auth endpoints (signup / login → bcrypt).
+
+Checked before any DB or hash work runs:
+1. per-client-IP token bucket      → 429 + Retry-After
+2. per-email token bucket          → 429 + Retry-After
+3. global in-flight cap per worker → 503 + Retry-After
+
+Client IPs come from the ASGI scope; behind a proxy run uvicorn with
+--proxy-headers / --forwarded-allow-ips so they are the real clients.
+"""
+import math
+from typing import AsyncGenerator, Optional
+
+from fastapi import HTTPException, Request, status
+
+from omniai.core.cache import TTLLRUCache
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.core.ratelimit import TokenBucket
+
+
+class RateLimit:
+    """Token buckets per key, kept in a bounded LRU (idle buckets refill and expire)."""
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int) -> None:
+        self.rate = per_minute / 60
+        self.burst = float(burst)
+        # Once a bucket has been idle long enough to refill, a fresh one is identical
+        self._buckets: TTLLRUCache[str, TokenBucket] = TTLLRUCache(max_keys, ttl_seconds=self.burst / self.rate)
+
+    def take(self, key: str) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.burst)
+        retry_after = bucket.take(self.rate, self.burst)
+        self._buckets.set(key, bucket)
+        return retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int,
+        ip_limit: RateLimit,
+        email_limit: RateLimit,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+        self.in_flight = 0
+        # Counters
+        self.admitted = 0
+        self.shed_ip = 0
+        self.shed_email = 0
+        self.shed_concurrency = 0
+
+    def admit(self, client_ip: str, email: Optional[str]) -> None:
+        """Reserve a slot or raise HTTPException (429 / 503) with Retry-After."""
+        retry_after = self.ip_limit.take(client_ip)
+        if retry_after:
+            self.shed_ip += 1
+            self._reject(status.HTTP_429_TOO_MANY_REQUESTS, "ip_rate_limited", retry_after, client_ip=client_ip)
+
+        if email:
+            retry_after = self.email_limit.take(email.lower())
+            if retry_after:
+                self.shed_email += 1
+                self._reject(status.HTTP_429_TOO_MANY_REQUESTS, "email_rate_limited", retry_after, email=email)
+
+        if self.in_flight >= self.max_concurrency:
+            self.shed_concurrency += 1
+            self._reject(status.HTTP_503_SERVICE_UNAVAILABLE, "concurrency_limited", 1.0)
+
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    @staticmethod
+    def _reject(status_code: int, reason: str, retry_after: float, **log_fields: str) -> None:
+        logger.warn("auth_request_shed", reason=reason, retry_after=retry_after, **log_fields)
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many requests, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "admitted": self.admitted,
+            "shed_ip": self.shed_ip,
+            "shed_email": self.shed_email,
+            "shed_concurrency": self.shed_concurrency,
+        }
+
+
+auth_admission_controller = AdmissionController(
+    max_concurrency=settings.AUTH_MAX_CONCURRENCY,
+    ip_limit=RateLimit(
+        settings.AUTH_IP_RATE_PER_MINUTE, settings.AUTH_IP_BURST, settings.AUTH_ADMISSION_MAX_KEYS
+    ),
+    email_limit=RateLimit(
+        settings.AUTH_EMAIL_RATE_PER_MINUTE, settings.AUTH_EMAIL_BURST, settings.AUTH_ADMISSION_MAX_KEYS
+    ),
+)
+
+
+async def _email_from(request: Request) -> Optional[str]:
+    # Starlette caches the body, so the route still parses it normally afterwards
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+            email = body.get("email") if isinstance(body, dict) else None
+        elif content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            email = (await request.form()).get("username")
+        else:
+            return None
+    except Exception:
+        return None  # Malformed bodies are rejected by the route's own validation
+    return email if isinstance(email, str) else None
+
+
+async def auth_admission(request: Request) -> AsyncGenerator[None, None]:
+    """FastAPI dependency placed in front of the login and signup routes."""
+    if not settings.AUTH_ADMISSION_ENABLED:
+        yield
+        return
+
+    client_ip = request.client.host if request.client else "unknown"
+    auth_admission_controller.admit(client_ip, await _email_from(request))
+    try:
+        yield
+    finally:
+        auth_admission_controller.release()
@@ -0,0 +1,197 @@
+# src/omniai/core/audit.py
+"""
+Audit trail of auth and tenant decisions, written to Postgres in batches.
+
+- `audit_log.record(...)` appends to an in-memory buffer and returns at once;
+  request handlers never wait for the database
+- A background task flushes the buffer every AUDIT_FLUSH_INTERVAL_SECONDS,
+  or as soon as a full AUDIT_BATCH_SIZE is waiting, with one COPY per batch
+  into the month-partitioned audit_events table (models/audit.py)
+- The buffer is bounded (AUDIT_BUFFER_SIZE): when the writer can't keep up
+  or the database is down, new events are dropped and counted rather than
+  growing memory or slowing requests; a failed batch is put back for the
+  next flush as far as it fits
+- On shutdown everything still buffered is flushed
+
+Partitions are created on demand, one per calendar month (UTC); dropping a
+month of history is `DROP TABLE audit_events_yYYYYmMM`.
+"""
+import asyncio
+import contextlib
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from structlog.contextvars import get_contextvars
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+
+COLUMNS = ("occurred_at", "action", "outcome", "user_id", "tenant_id", "trace_id", "client_ip", "detail")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _trace_id() -> Optional[str]:
+    return get_contextvars().get("trace_id")
+
+
+@dataclass(frozen=True)
+class AuditEvent:
+    action: str                     # e.g. "login", "tenant_access"
+    outcome: str                    # "allowed" | "denied" | "success" | "failure"
+    user_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    client_ip: Optional[str] = None
+    detail: Optional[dict[str, Any]] = None
+    trace_id: Optional[str] = field(default_factory=_trace_id)
+    occurred_at: datetime = field(default_factory=_now)
+
+    def to_record(self) -> tuple[Any, ...]:
+        detail = json.dumps(self.detail) if self.detail is not None else None
+        return (
+            self.occurred_at, self.action, self.outcome, self.user_id,
+            self.tenant_id, self.trace_id, self.client_ip, detail,
+        )
+
+
+def month_start(moment: datetime) -> date:
+    return moment.astimezone(timezone.utc).date().replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_ddl(month: date) -> str:
+    upper = next_month(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS audit_events_y{month.year:04d}m{month.month:02d} "
+        f"PARTITION OF audit_events FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{upper.isoformat()} 00:00:00+00')"
+    )
+
+
+class AuditLog:
+    def __init__(self, capacity: int, batch_size: int, flush_interval: float) -> None:
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: deque[AuditEvent] = deque()
+        self._wake = asyncio.Event()
+        self._engine: Optional[AsyncEngine] = None
+        self._writer: Optional[asyncio.Task[None]] = None
+        self._stopping = False
+        self._partitions: set[date] = set()
+        # Metrics
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_ms: Optional[float] = None
+
+    def record(self, action: str, outcome: str, **fields: Any) -> bool:
+        """Buffer one event; never blocks. False when it was dropped (buffer full)."""
+        if not settings.AUDIT_ENABLED:
+            return False
+        if len(self._buffer) >= self.capacity:
+            if self.dropped == 0 or self.dropped % 1000 == 0:
+                logger.warn("audit_buffer_full", capacity=self.capacity, dropped=self.dropped + 1)
+            self.dropped += 1
+            return False
+        self._buffer.append(AuditEvent(action, outcome, **fields))
+        self.recorded += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def _copy(self, batch: list[AuditEvent]) -> None:
+        assert self._engine is not None
+        async with self._engine.connect() as conn:
+            # COPY goes through asyncpg directly: one round trip per batch
+            driver_conn: Any = (await conn.get_raw_connection()).driver_connection
+            for month in sorted({month_start(event.occurred_at) for event in batch} - self._partitions):
+                await driver_conn.execute(partition_ddl(month))
+                self._partitions.add(month)
+            await driver_conn.copy_records_to_table(
+                "audit_events", records=[event.to_record() for event in batch], columns=COLUMNS
+            )
+
+    async def flush(self) -> int:
+        """Write everything buffered; returns the number of events written."""
+        written = 0
+        while self._buffer and self._engine is not None:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            start = time.perf_counter()
+            try:
+                await self._copy(batch)
+            except Exception as e:
+                self.failures += 1
+                # Back to the front for the next attempt, as far as there is room
+                room = self.capacity - len(self._buffer)
+                self._buffer.extendleft(reversed(batch[:room]))
+                self.dropped += max(0, len(batch) - room)
+                logger.warn("audit_flush_failed", events=len(batch), error=str(e))
+                break
+            self.flushes += 1
+            self.written += len(batch)
+            written += len(batch)
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 1)
+        return written
+
+    async def _run_writer(self) -> None:
+        while not self._stopping:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            self._wake.clear()
+            await self.flush()
+
+    async def start(self, engine: AsyncEngine) -> None:
+        """Startup hook: make sure this and next month's partitions exist, then start the writer."""
+        self._engine = engine
+        if not settings.AUDIT_ENABLED:
+            return
+        today = month_start(_now())
+        async with engine.connect() as conn:
+            driver_conn: Any = (await conn.get_raw_connection()).driver_connection
+            for month in (today, next_month(today)):
+                await driver_conn.execute(partition_ddl(month))
+                self._partitions.add(month)
+        self._writer = asyncio.create_task(self._run_writer())
+
+    async def stop(self) -> None:
+        """Shutdown hook: stop the writer and flush what is left."""
+        if self._writer is not None:
+            # Let an in-flight COPY finish rather than cancelling it mid-batch
+            self._stopping = True
+            self._wake.set()
+            await self._writer
+            self._writer = None
+        written = await self.flush()
+        logger.info("audit_log_stopped", flushed=written, pending=len(self._buffer), dropped=self.dropped)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "capacity": self.capacity,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+audit_log = AuditLog(
+    capacity=settings.AUDIT_BUFFER_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
@@ -1,6 +1,7 @@
 # src/omniai/core/config.py
 # multi database multi country
-from typing import Any
+import os
+from typing import Any, Literal, Optional
 
 from pydantic import Field, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -17,6 +18,239 @@ class Settings(BaseSettings):
     )
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = Field(
+        default=30,
+        gt=0,
+        description="Idle lifetime of a refresh token; each rotation starts a new one"
+    )
+    AUTH_SESSION_PURGE_INTERVAL_SECONDS: float = Field(
+        default=3600.0,
+        ge=0,
+        description="How often each worker deletes expired refresh-token rows (0 disables)"
+    )
+    AUTH_SESSION_PURGE_BATCH_SIZE: int = Field(default=5_000, ge=1, description="Rows deleted per transaction")
+    JWT_VERIFY_CACHE_SIZE: int = Field(
+        default=10_000,
+        ge=0,
+        description="Verified tokens kept per worker to skip repeated signature checks (0 disables)"
+    )
+    # Membership claims are checked per worker: a worker only treats a claim
+    # as stale once it has seen the user's newer membership_version, so a
+    # removal or downgrade handled by one worker is not known to the others.
+    # They keep honouring the old claim until it is
+    # JWT_MEMBERSHIP_CLAIM_MAX_AGE_SECONDS old (the same bound the membership
+    # cache TTL puts on cached answers), then fall back to the cache / DB.
+    JWT_EMBED_MEMBERSHIPS: bool = Field(
+        default=False,
+        description="Embed org IDs, roles and default org in access tokens so tenant checks skip the DB"
+    )
+    JWT_MEMBERSHIP_CLAIM_MAX_AGE_SECONDS: float = Field(
+        default=60.0,
+        gt=0,
+        description="Membership claims are trusted this long after the token was issued"
+    )
+    JWT_MEMBERSHIP_CLAIM_MAX_ORGS: int = Field(
+        default=64,
+        ge=0,
+        description="Users with more orgs than this get a plain token and are checked against the DB"
+    )
+
+    # Connection pool, per worker (see db/pool.py)
+    WEB_CONCURRENCY: int = Field(
+        default=1,
+        ge=1,
+        description="uvicorn worker processes (uvicorn reads the same variable for --workers)"
+    )
+    DB_MAX_CONNECTIONS: int = Field(
+        default=30,
+        ge=2,
+        description="Connections all workers of this instance may open together (keep below Postgres max_connections)"
+    )
+    DB_POOL_SIZE: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Persistent connections per worker; unset = derived from DB_MAX_CONNECTIONS / WEB_CONCURRENCY"
+    )
+    DB_MAX_OVERFLOW: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Extra connections per worker under load; unset = the rest of the worker's share"
+    )
+    DB_POOL_TIMEOUT: float = Field(default=30.0, gt=0, description="Seconds to wait for a free connection")
+    DB_POOL_RECYCLE: int = Field(default=1800, description="Reconnect connections older than this (seconds, -1 = never)")
+    DB_STATEMENT_CACHE_SIZE: int = Field(
+        default=100,
+        ge=0,
+        description="Prepared statements kept per connection, so repeated queries skip server-side parsing (0 disables)"
+    )
+    DB_PGBOUNCER: bool = Field(
+        default=False,
+        description="DATABASE_URL points at PgBouncer in transaction mode: never reuse prepared statements"
+    )
+
+    # Warm-up before the worker accepts requests (see core/prewarm.py)
+    STARTUP_PREWARM_CONNECTIONS: int = Field(
+        default=0,
+        ge=0,
+        description="Pool connections opened, with the hot statements prepared, at startup (capped at the pool size)"
+    )
+    STARTUP_PREWARM_ROUTES: bool = Field(
+        default=False,
+        description="Send one in-process request to each hot route at startup"
+    )
+
+    # Read replicas (see db/routing.py)
+    DATABASE_REPLICA_URLS: str = Field(
+        default="",
+        description="Comma-separated async URLs of read replicas; empty = everything goes to DATABASE_URL"
+    )
+    DB_REPLICA_MAX_LAG_SECONDS: float = Field(
+        default=10.0,
+        gt=0,
+        description="Replicas further behind than this stop receiving reads until they catch up"
+    )
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = Field(default=5.0, gt=0)
+    DB_READ_YOUR_WRITES_SECONDS: float = Field(
+        default=5.0,
+        ge=0,
+        description="After a user's own write, their reads stay on the primary this long"
+    )
+
+    # Tenant data shards (see db/sharding.py)
+    DATABASE_SHARD_URLS: str = Field(
+        default="",
+        description="Comma-separated name=url pairs of tenant-data shards; DATABASE_URL is always shard 'main'"
+    )
+    SHARD_DIRECTORY_CACHE_SECONDS: float = Field(
+        default=30.0,
+        gt=0,
+        description="How long a worker trusts a cached org → shard placement; tenant moves wait this long"
+    )
+    SHARD_DIRECTORY_CACHE_MAX_ENTRIES: int = Field(default=10_000, ge=0)
+
+    # Query instrumentation (see db/instrumentation.py)
+    DB_QUERY_BUDGET: int = Field(default=12, ge=1, description="Statements one request may run before it is flagged")
+    DB_QUERY_BUDGET_STRICT: bool = Field(
+        default=False,
+        description="Fail the request instead of logging when the budget is exceeded (for tests)"
+    )
+    DB_SLOW_QUERY_MS: float = Field(default=200.0, gt=0)
+
+    # Tenant membership cache (per worker, see core/membership_cache.py)
+    MEMBERSHIP_CACHE_ENABLED: bool = True
+    MEMBERSHIP_CACHE_MAX_ENTRIES: int = Field(default=10_000, ge=0)
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = Field(
+        default=60.0,
+        gt=0,
+        description="How long a positive membership answer may be served without the DB"
+    )
+    MEMBERSHIP_CACHE_NEGATIVE_TTL_SECONDS: float = Field(
+        default=5.0,
+        gt=0,
+        description="TTL for 'not a member' / 'org not found' / 'no default org' answers"
+    )
+
+    # Password hashing pool (see core/hashing.py)
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = Field(
+        default_factory=lambda: min(4, os.cpu_count() or 1),
+        ge=1,
+        description="Concurrent bcrypt calls per app worker"
+    )
+    PASSWORD_HASH_MAX_QUEUE: int = Field(
+        default=32,
+        ge=0,
+        description="Hash calls allowed to wait for a worker before callers get a 503"
+    )
+    PASSWORD_HASH_ROUNDS: Optional[int] = Field(
+        default=None,
+        ge=4,
+        le=31,
+        description="Fixed bcrypt cost; leave unset to calibrate against PASSWORD_HASH_TARGET_MS at startup"
+    )
+    PASSWORD_HASH_TARGET_MS: float = Field(default=250.0, gt=0)
+    PASSWORD_HASH_MIN_ROUNDS: int = Field(default=10, ge=4, le=31, description="Calibration never goes below this")
+    PASSWORD_HASH_MAX_ROUNDS: int = Field(default=16, ge=4, le=31)
+
+    # Bulk user import (see services/provisioning.py)
+    USER_IMPORT_BATCH_SIZE: int = Field(
+        default=500,
+        ge=1,
+        le=2_000,  # keeps the multi-row INSERTs under asyncpg's 32767 bind parameters
+        description="Rows validated, hashed and inserted together"
+    )
+    USER_IMPORT_MAX_ROWS: int = Field(default=100_000, ge=1, description="Rows accepted per import request")
+
+    ORGS_PAGE_SIZE: int = Field(default=50, ge=1, description="Default page size of GET /v1/orgs")
+    ORGS_PAGE_SIZE_MAX: int = Field(default=200, ge=1)
+    ORG_MEMBERS_BULK_MAX: int = Field(default=10_000, ge=1, description="Rows per bulk membership request")
+
+    # Logging (see core/logging.py)
+    LOG_ASYNC: bool = Field(
+        default=False,
+        description="Render JSON with orjson and write from a background thread instead of the event loop"
+    )
+    LOG_QUEUE_SIZE: int = Field(
+        default=10_000,
+        ge=1,
+        description="Records waiting for the writer thread; when full, new records are dropped and counted"
+    )
+    LOG_BATCH_MAX: int = Field(default=256, ge=1, description="Records joined into one write to stdout")
+    LOG_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=0.05,
+        ge=0,
+        description="Pause of the writer thread after a partial batch; records wait at most about this long"
+    )
+    LOG_SAMPLE_RATES: str = Field(
+        default="",
+        description='Comma-separated event=rate pairs, e.g. "http_request_start=0.01"; requests are kept or dropped whole'
+    )
+    LOG_RATE_LIMITS: str = Field(
+        default="",
+        description='Comma-separated event=per_second:burst pairs, e.g. "auth_and_tenant_success=50:100"'
+    )
+    LOG_SLOW_REQUEST_MS: float = Field(
+        default=1000.0,
+        gt=0,
+        description="Requests at least this slow are logged in full, whatever their sampling rate"
+    )
+    LOG_TRACE_MAX_OPEN: int = Field(
+        default=10_000,
+        ge=1,
+        description="Requests whose events are held back for the sampling decision; beyond that the oldest is dropped"
+    )
+    LOG_TRACE_MAX_EVENTS: int = Field(default=100, ge=1, description="A request that logs this many events is kept")
+
+    # Internal endpoints
+    METRICS_TOKEN: str = Field(
+        default="",
+        description="Bearer token GET /metrics requires; empty = unauthenticated (keep it off the public network)"
+    )
+
+    # Audit log (see core/audit.py)
+    AUDIT_ENABLED: bool = True
+    AUDIT_BUFFER_SIZE: int = Field(
+        default=10_000,
+        ge=1,
+        description="Events held in memory per worker; when full, new events are dropped and counted"
+    )
+    AUDIT_BATCH_SIZE: int = Field(default=1_000, ge=1, description="Events per COPY; a full batch is flushed early")
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0, gt=0)
+    AUDIT_QUERY_MAX_DAYS: int = Field(default=31, ge=1, description="Widest time range one audit query may cover")
+    AUDIT_PAGE_SIZE_MAX: int = Field(default=500, ge=1)
+
+    # Admission control for /v1/auth (see core/admission.py)
+    AUTH_ADMISSION_ENABLED: bool = True
+    AUTH_MAX_CONCURRENCY: int = Field(default=16, ge=1, description="In-flight auth requests per worker")
+    AUTH_IP_RATE_PER_MINUTE: float = Field(default=60.0, gt=0)
+    AUTH_IP_BURST: int = Field(default=30, ge=1)
+    AUTH_EMAIL_RATE_PER_MINUTE: float = Field(default=10.0, gt=0)
+    AUTH_EMAIL_BURST: int = Field(default=5, ge=1)
+    AUTH_ADMISSION_MAX_KEYS: int = Field(
+        default=50_000,
+        ge=1,
+        description="IPs / emails tracked at once; least recently seen buckets are dropped first"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
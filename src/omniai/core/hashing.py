@@ -0,0 +1,202 @@
+# src/omniai/core/hashing.py
+"""
+Bounded worker pool for password hashing.
+
+bcrypt takes ~250ms of CPU per call; running it on the event loop stalls every
+other request on the worker. Calls go to a thread pool (bcrypt releases the GIL)
+or a process pool, and at most `workers + max_queue` calls may be in flight.
+Beyond that callers get PasswordHashQueueFull immediately, which the app turns
+into a fast 503 instead of letting requests pile up.
+
+The bcrypt cost factor is either fixed (PASSWORD_HASH_ROUNDS) or calibrated at
+startup to the largest cost whose hash time fits PASSWORD_HASH_TARGET_MS on this
+machine. With several workers or replicas, calibration can land on different
+costs and logins would keep rehashing; pin PASSWORD_HASH_ROUNDS there
+(`python benchmarks/bcrypt_cost.py` shows the timings).
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+import bcrypt
+from fastapi import Request
+from starlette.responses import JSONResponse
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+
+T = TypeVar("T")
+
+
+# bcrypt.gensalt() default, used until calibration runs
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+class PasswordHashQueueFull(Exception):
+    """Raised when the password hashing queue is saturated."""
+
+
+class PasswordHashPolicy:
+    """Target bcrypt cost for new hashes (and rehash-on-login)."""
+
+    def __init__(self, rounds: int) -> None:
+        self.rounds = rounds
+        self.calibrated_ms: Optional[float] = None
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return bcrypt_cost(hashed_password) != self.rounds
+
+
+def bcrypt_cost(hashed_password: str) -> int:
+    """Cost factor of a modular-crypt bcrypt hash, e.g. "$2b$12$..." → 12."""
+    return int(hashed_password.split("$")[2])
+
+
+def measure_bcrypt_seconds(rounds: int) -> float:
+    salt = bcrypt.gensalt(rounds=rounds)
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", salt)
+    return time.perf_counter() - start
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int, max_rounds: int) -> tuple[int, float]:
+    """
+    Largest cost in [min_rounds, max_rounds] whose hash time fits target_ms.
+    Each extra round doubles the work, so we stop as soon as the next one would
+    not fit; returns (rounds, measured milliseconds at that cost).
+    """
+    rounds = min_rounds
+    elapsed_ms = measure_bcrypt_seconds(rounds) * 1000
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms = measure_bcrypt_seconds(rounds) * 1000
+    return rounds, elapsed_ms
+
+
+def _timed_call(fn: Callable[..., T], *args: Any) -> tuple[float, T]:
+    # Runs in the worker; returns when it actually started so callers can
+    # measure queue wait (time.monotonic is system-wide, so this also works
+    # across processes)
+    return time.monotonic(), fn(*args)
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int, max_queue: int, executor: str) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHashQueueFull("Password hashing queue is full")
+
+        self._in_flight += 1
+        submitted = time.monotonic()
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        wait = max(0.0, started - submitted)
+        self.completed += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        return result
+
+    async def run_many(self, fn: Callable[..., T], calls: Sequence[tuple[Any, ...]]) -> list[T]:
+        """
+        Bulk work (e.g. user imports): keeps at most `workers` of these calls in
+        flight and waits instead of failing while interactive traffic has the
+        queue full, so a big batch never starves logins of queue slots.
+        """
+        slots = asyncio.Semaphore(self.workers)
+
+        async def call(args: tuple[Any, ...]) -> T:
+            async with slots:
+                while self._in_flight >= self.workers + self.max_queue:
+                    await asyncio.sleep(0.05)
+                return await self.run(fn, *args)
+
+        return await asyncio.gather(*(call(args) for args in calls))
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(self.wait_seconds_total / self.completed * 1000, 2) if self.completed else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+        }
+
+
+password_hash_policy = PasswordHashPolicy(rounds=settings.PASSWORD_HASH_ROUNDS or DEFAULT_BCRYPT_ROUNDS)
+
+
+async def calibrate_password_hash_policy() -> None:
+    """Startup hook: pick the bcrypt cost for this machine unless it is pinned."""
+    if settings.PASSWORD_HASH_ROUNDS is not None:
+        logger.info("password_hash_rounds_fixed", rounds=password_hash_policy.rounds)
+        return
+
+    rounds, elapsed_ms = await asyncio.to_thread(
+        calibrate_bcrypt_rounds,
+        settings.PASSWORD_HASH_TARGET_MS,
+        settings.PASSWORD_HASH_MIN_ROUNDS,
+        settings.PASSWORD_HASH_MAX_ROUNDS,
+    )
+    password_hash_policy.rounds = rounds
+    password_hash_policy.calibrated_ms = round(elapsed_ms, 1)
+    logger.info(
+        "password_hash_rounds_calibrated",
+        rounds=rounds,
+        hash_ms=password_hash_policy.calibrated_ms,
+        target_ms=settings.PASSWORD_HASH_TARGET_MS,
+    )
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+
+async def password_hash_busy_handler(request: Request, exc: Exception) -> JSONResponse:
+    logger.warn("password_hash_queue_full", url=str(request.url), error=str(exc), **password_hash_pool.stats())
+    return JSONResponse(
+        status_code=503,
+        content={"error": {"code": "AUTH_BUSY", "message": "Too many concurrent sign-ins, retry shortly"}},
+        headers={"Retry-After": "1"},
+    )
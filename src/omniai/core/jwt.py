@@ -1,22 +1,104 @@
+import hashlib
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Optional
 
 import jwt
 from jwt import PyJWTError
 
+from omniai.core.cache import TTLLRUCache
 from omniai.core.config import settings
 
+# Optional compact membership claim (settings.JWT_EMBED_MEMBERSHIPS):
+#   "mbr": {"v": <membership_version>, "d": <default org id | null>, "o": {<org id>: <role>}}
+# Its age is the token's "iat"; see JWT_MEMBERSHIP_CLAIM_MAX_AGE_SECONDS.
+MEMBERSHIP_CLAIM = "mbr"
+
+
+@dataclass(frozen=True)
+class MembershipClaim:
+    version: int
+    default_org_id: Optional[str]
+    roles: dict[str, str] = field(default_factory=dict)
+    issued_at: float = field(default=0.0, compare=False)   # token's iat; 0 = unknown
+
+    def is_fresh(self, max_age_seconds: float) -> bool:
+        """Still young enough to authorize from; other workers may not know of a newer version."""
+        return 0 <= time.time() - self.issued_at < max_age_seconds
+
+    def to_payload(self) -> dict[str, Any]:
+        return {"v": self.version, "d": self.default_org_id, "o": self.roles}
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> Optional["MembershipClaim"]:
+        """Parse the claim out of a verified token; None if absent or malformed."""
+        raw = payload.get(MEMBERSHIP_CLAIM)
+        if not isinstance(raw, dict):
+            return None
+        version, default_org_id, roles = raw.get("v"), raw.get("d"), raw.get("o")
+        if not isinstance(version, int) or not isinstance(roles, dict):
+            return None
+        if default_org_id is not None and not isinstance(default_org_id, str):
+            return None
+        issued_at = payload.get("iat")
+        if not isinstance(issued_at, (int, float)):
+            issued_at = 0.0  # tokens from before iat was set: never fresh
+        return cls(version=version, default_org_id=default_org_id, roles=roles, issued_at=float(issued_at))
+
 
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    expire = datetime.now(timezone.utc) + expires_delta
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    to_encode.update({"exp": now + expires_delta, "iat": now})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
+class VerifiedTokenCache:
+    """
+    Bounded cache of tokens that already passed signature + claim validation.
+
+    - Keyed by the SHA-256 digest of the token, never the token itself
+    - Each entry expires at the token's own `exp`
+    - Everything is dropped when the signing key or algorithm changes
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._tokens: TTLLRUCache[bytes, dict[str, Any]] = TTLLRUCache(max_entries, ttl_seconds=0)
+        self._signing_key: tuple[str, str] | None = None
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        self._check_key_rotation()
+        return self._tokens.get(hashlib.sha256(token.encode("utf-8")).digest())
+
+    def put(self, token: str, payload: dict[str, Any]) -> None:
+        remaining = float(payload["exp"]) - time.time()
+        if remaining > 0:
+            self._tokens.set(hashlib.sha256(token.encode("utf-8")).digest(), payload, ttl_seconds=remaining)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+    def _check_key_rotation(self) -> None:
+        signing_key = (settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        if signing_key != self._signing_key:
+            self._tokens.clear()
+            self._signing_key = signing_key
+
+    def stats(self) -> dict[str, float]:
+        return self._tokens.stats()
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.JWT_VERIFY_CACHE_SIZE)
+
+
 def decode_token(token: str) -> dict[str, Any]:
+    cached = verified_token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+
     try:
         payload = jwt.decode(
             token,
@@ -27,6 +109,8 @@ def decode_token(token: str) -> dict[str, Any]:
         user_id = payload.get("sub")
         if not isinstance(user_id, str) or not user_id.startswith("usr_"):
             raise PyJWTError("Invalid user ID format")
-        return payload
     except PyJWTError as e:
         raise PyJWTError(f"Token decode failed: {str(e)}") from e
+
+    verified_token_cache.put(token, payload)
+    return dict(payload)
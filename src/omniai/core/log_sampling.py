@@ -0,0 +1,224 @@
+# src/omniai/core/log_sampling.py
+"""
+Log sampling and per-event rate limits (LOG_SAMPLE_RATES, LOG_RATE_LIMITS).
+
+`LogSampler` is the last structlog processor and wraps the renderer. Events
+of a request (same trace_id, bound by LoggingMiddleware) are held back and
+decided together when http_request_end arrives, so a request is logged in
+full or not at all:
+
+- kept whole when any of its events is a warning or worse, its status is
+  5xx or it took LOG_SLOW_REQUEST_MS or longer. A warning releases what was
+  held back at once and lets the rest of the request straight through
+- otherwise the request's rate is the lowest LOG_SAMPLE_RATES entry among
+  its events (unlisted events count as 1.0), and a hash of the trace_id
+  decides whether it falls inside that rate: every worker makes the same
+  call for the same trace
+- a sampled-in request then takes one token from the bucket of each
+  rate-limited event it contains, and is dropped when one is empty
+
+Events outside a request (no trace_id) are sampled and rate-limited one by
+one. Memory is bounded: at most LOG_TRACE_MAX_OPEN requests are held back
+(beyond that the oldest is dropped) and a request that reaches
+LOG_TRACE_MAX_EVENTS events is kept.
+"""
+import hashlib
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, MutableMapping, Optional
+
+from structlog import DropEvent
+
+from omniai.core.config import settings
+from omniai.core.ratelimit import TokenBucket
+
+EventDict = MutableMapping[str, Any]
+Renderer = Callable[[Any, str, EventDict], Any]
+
+TRACE_END = "http_request_end"
+
+# add_log_level has already mapped warn → warning and exception → error
+_KEEP_LEVELS = frozenset({"warning", "error", "critical"})
+
+
+def _pairs(value: str, setting: str) -> dict[str, str]:
+    pairs = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        name, sep, spec = entry.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"{setting} entries must be event=value: {entry!r}")
+        pairs[name.strip()] = spec.strip()
+    return pairs
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """LOG_SAMPLE_RATES: "event=rate,..." with rates between 0 and 1."""
+    rates = {}
+    for name, spec in _pairs(value, "LOG_SAMPLE_RATES").items():
+        rate = float(spec)
+        if not 0 <= rate <= 1:
+            raise ValueError(f"LOG_SAMPLE_RATES rate for {name!r} must be between 0 and 1: {spec!r}")
+        rates[name] = rate
+    return rates
+
+
+def parse_rate_limits(value: str) -> dict[str, tuple[float, float]]:
+    """LOG_RATE_LIMITS: "event=per_second:burst,..." (burst defaults to per_second)."""
+    limits = {}
+    for name, spec in _pairs(value, "LOG_RATE_LIMITS").items():
+        per_second, _, burst = spec.partition(":")
+        rate = float(per_second)
+        size = float(burst) if burst else max(rate, 1.0)
+        if rate <= 0 or size < 1:
+            raise ValueError(f"LOG_RATE_LIMITS for {name!r} needs per_second > 0 and burst >= 1: {spec!r}")
+        limits[name] = (rate, size)
+    return limits
+
+
+def trace_fraction(trace_id: str) -> float:
+    """Stable position of a trace in [0, 1)."""
+    digest = hashlib.blake2b(trace_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+@dataclass
+class _Trace:
+    events: list[tuple[str, EventDict]] = field(default_factory=list)
+    kept: bool = False      # decided early: the rest passes straight through
+
+
+class LogSampler:
+    def __init__(
+        self,
+        renderer: Renderer,
+        sample_rates: dict[str, float],
+        rate_limits: dict[str, tuple[float, float]],
+        slow_ms: float,
+        max_traces: int,
+        max_events: int,
+    ) -> None:
+        self.renderer = renderer
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self.slow_ms = slow_ms
+        self.max_traces = max_traces
+        self.max_events = max_events
+        self._buckets = {name: TokenBucket(burst) for name, (_, burst) in rate_limits.items()}
+        self._traces: OrderedDict[str, _Trace] = OrderedDict()
+        # Password hashing threads log too; the event loop isn't the only caller
+        self._lock = threading.Lock()
+        # Counters, in events
+        self.kept = 0
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self.evicted = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: EventDict) -> Any:
+        trace_id = event_dict.get("trace_id")
+        with self._lock:
+            if trace_id is None:
+                self._admit_untraced(event_dict)
+                self.kept += 1
+                release: list[tuple[str, EventDict]] = []
+            else:
+                release = self._admit_traced(str(trace_id), method_name, event_dict)
+        # Render outside the lock; the current event is returned to structlog last
+        for name, held in release[:-1]:
+            getattr(logger, name)(self.renderer(logger, name, held))
+        return self.renderer(logger, method_name, event_dict)
+
+    def _admit_untraced(self, event_dict: EventDict) -> None:
+        name = str(event_dict.get("event"))
+        if event_dict.get("level") in _KEEP_LEVELS:
+            return
+        if random.random() >= self.sample_rates.get(name, 1.0):
+            self.sampled_out += 1
+            raise DropEvent
+        if not self._take_tokens({name}):
+            self.rate_limited += 1
+            raise DropEvent
+
+    def _admit_traced(self, trace_id: str, method_name: str, event_dict: EventDict) -> list[tuple[str, EventDict]]:
+        """Events to release now, ending with this one; raises DropEvent to hold or drop it."""
+        end = event_dict.get("event") == TRACE_END
+        trace = self._traces.get(trace_id)
+        if trace is None:
+            trace = self._traces[trace_id] = _Trace()
+            if len(self._traces) > self.max_traces:
+                _, oldest = self._traces.popitem(last=False)
+                self.evicted += len(oldest.events)
+        if trace.kept:
+            if end:
+                del self._traces[trace_id]
+            self.kept += 1
+            return [(method_name, event_dict)]
+
+        trace.events.append((method_name, event_dict))
+        if self._keep_whole(event_dict) or len(trace.events) >= self.max_events:
+            if end:
+                del self._traces[trace_id]
+            else:
+                trace.kept = True
+            return self._release(trace)
+        if not end:
+            raise DropEvent  # held back until the request ends
+
+        del self._traces[trace_id]
+        names = {str(held.get("event")) for _, held in trace.events}
+        if trace_fraction(trace_id) >= min(self.sample_rates.get(name, 1.0) for name in names):
+            self.sampled_out += len(trace.events)
+            raise DropEvent
+        if not self._take_tokens(names):
+            self.rate_limited += len(trace.events)
+            raise DropEvent
+        return self._release(trace)
+
+    def _keep_whole(self, event_dict: EventDict) -> bool:
+        if event_dict.get("level") in _KEEP_LEVELS:
+            return True
+        if event_dict.get("event") != TRACE_END:
+            return False
+        return int(event_dict.get("status_code", 0)) >= 500 or float(event_dict.get("duration_ms", 0)) >= self.slow_ms
+
+    def _release(self, trace: _Trace) -> list[tuple[str, EventDict]]:
+        release, trace.events = trace.events, []
+        self.kept += len(release)
+        return release
+
+    def _take_tokens(self, names: set[str]) -> bool:
+        for name in names:
+            if name not in self.rate_limits:
+                continue
+            rate, burst = self.rate_limits[name]
+            if self._buckets[name].take(rate, burst):
+                return False
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "open_traces": len(self._traces),
+            "kept": self.kept,
+            "sampled_out": self.sampled_out,
+            "rate_limited": self.rate_limited,
+            "evicted": self.evicted,
+        }
+
+
+def build_log_sampler(renderer: Renderer) -> Optional[LogSampler]:
+    """Sampler around `renderer` as configured in Settings; None when nothing is sampled or limited."""
+    sample_rates = parse_sample_rates(settings.LOG_SAMPLE_RATES)
+    rate_limits = parse_rate_limits(settings.LOG_RATE_LIMITS)
+    if not sample_rates and not rate_limits:
+        return None
+    return LogSampler(
+        renderer,
+        sample_rates,
+        rate_limits,
+        slow_ms=settings.LOG_SLOW_REQUEST_MS,
+        max_traces=settings.LOG_TRACE_MAX_OPEN,
+        max_events=settings.LOG_TRACE_MAX_EVENTS,
+    )
@@ -1,20 +1,157 @@
 # src/omniai/core/logging.py
+"""
+structlog configuration.
+
+Two modes:
+
+- default: events are rendered and written to stdout through the stdlib
+  logging handler, synchronously, from the calling thread (the event loop)
+- LOG_ASYNC=true: events are rendered to JSON bytes with orjson and handed to
+  a `QueueLogWriter`; one daemon thread writes them to stdout in batches,
+  at most every LOG_FLUSH_INTERVAL_SECONDS unless a full batch is waiting.
+  The queue is bounded (LOG_QUEUE_SIZE): when stdout can't keep up, records
+  are dropped and counted instead of stalling requests. `shutdown_logging()`
+  (lifespan shutdown, and atexit) writes whatever is still queued.
+
+In both, LOG_SAMPLE_RATES / LOG_RATE_LIMITS put a LogSampler around the
+renderer (core/log_sampling.py).
+"""
+import atexit
 import logging
+import queue
 import sys
-from typing import Any, Callable, Mapping, MutableMapping, Tuple, Union
+import threading
+import time
+from typing import IO, Any, Callable, Mapping, MutableMapping, Optional, Tuple, Union
 
+import orjson
 import structlog
 from structlog import get_logger
 from structlog.dev import ConsoleRenderer
 from structlog.processors import JSONRenderer
 
+from omniai.core.config import settings
+from omniai.core.log_sampling import LogSampler, Renderer, build_log_sampler
+
 # Define the processor type to help MyPy
 ProcessorType = Callable[
     [Any, str, MutableMapping[str, Any]],
     Union[Mapping[str, Any], str, bytes, bytearray, Tuple[Any, ...]]
 ]
 
+_STOP = object()
+
+
+class QueueLogWriter:
+    """Bounded queue of rendered lines, written out by one background thread."""
+
+    def __init__(self, stream: IO[bytes], max_queue: int, batch_max: int, flush_interval: float = 0.0) -> None:
+        self.stream = stream
+        self.batch_max = batch_max
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Metrics: `dropped` is counted by producers, the rest by the writer thread
+        self.dropped = 0
+        self._dropped_reported = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, line: bytes) -> bool:
+        """Queue one rendered line; never blocks. False when it was dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_max:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            lines = [line for line in batch if line is not _STOP]
+            dropped = self.dropped
+            if dropped != self._dropped_reported:
+                # Reported in-band, so a gap in the logs explains itself
+                lines.append(orjson.dumps({"event": "log_records_dropped", "level": "warning", "dropped": dropped}))
+                self._dropped_reported = dropped
+            if lines:
+                try:
+                    self.stream.write(b"\n".join(lines) + b"\n")
+                    self.stream.flush()
+                    self.written += len(lines)
+                    self.batches += 1
+                except (OSError, ValueError):
+                    self.write_errors += 1
+            if stop:
+                return
+            if len(batch) < self.batch_max and self.flush_interval:
+                # Let records accumulate: fewer writes, and the thread isn't
+                # woken (and contending for the GIL) for every single record
+                time.sleep(self.flush_interval)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting records and wait until everything queued is written."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # The writer is draining, so room for the sentinel frees up quickly
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": "async",
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+
+class QueueLogger:
+    """structlog logger that passes the renderer's bytes to a QueueLogWriter."""
+
+    def __init__(self, writer: QueueLogWriter) -> None:
+        self._writer = writer
+
+    def msg(self, message: bytes) -> None:
+        self._writer.write(message)
+
+    log = debug = info = warn = warning = msg
+    error = err = critical = exception = fatal = failure = msg
+
+
+log_writer: Optional[QueueLogWriter] = None
+log_sampler: Optional[LogSampler] = None
+
+
+def _sampled(renderer: Renderer) -> Renderer:
+    """`renderer`, wrapped in the LogSampler when sampling or rate limits are configured."""
+    global log_sampler
+    log_sampler = build_log_sampler(renderer)
+    return log_sampler or renderer
+
+
 def configure_logging() -> None:
+    global log_writer
+
     # Set root logger level
     logging.basicConfig(
         format="%(message)s",
@@ -22,9 +159,6 @@ def configure_logging() -> None:
         level=logging.INFO,
     )
 
-    # Detect dev vs prod
-    is_dev = sys.stdout.isatty()
-
     # Shared processors
     shared_processors: list[ProcessorType] = [
         structlog.contextvars.merge_contextvars,
@@ -34,11 +168,30 @@ def configure_logging() -> None:
         structlog.processors.format_exc_info,
     ]
 
+    if settings.LOG_ASYNC:
+        # OPT_NON_STR_KEYS: json.dumps also accepts str subclasses / ints as keys
+        orjson_renderer = JSONRenderer(serializer=orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+        writer = QueueLogWriter(
+            sys.stdout.buffer, settings.LOG_QUEUE_SIZE, settings.LOG_BATCH_MAX, settings.LOG_FLUSH_INTERVAL_SECONDS
+        )
+        atexit.register(writer.close)
+        log_writer = writer
+        structlog.configure(
+            processors=shared_processors + [_sampled(orjson_renderer)],
+            wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+            logger_factory=lambda *_: QueueLogger(writer),
+            cache_logger_on_first_use=True,
+        )
+        return
+
+    # Detect dev vs prod
+    is_dev = sys.stdout.isatty()
+
     # Annotate renderer with union type
     renderer = ConsoleRenderer() if is_dev else JSONRenderer()
 
     # Final processor list
-    all_processors: list[ProcessorType] = shared_processors + [renderer]
+    all_processors: list[ProcessorType] = shared_processors + [_sampled(renderer)]
 
     structlog.configure(
         processors=all_processors,
@@ -47,8 +200,18 @@ def configure_logging() -> None:
         cache_logger_on_first_use=True,
     )
 
-    # 🔥 CRITICAL: Route standard library logs through structlog
-    structlog.stdlib.recreate_defaults()
+
+def shutdown_logging() -> None:
+    """Write out everything the async writer still holds (no-op in the default mode)."""
+    if log_writer is not None:
+        log_writer.close()
+
+
+def logging_stats() -> dict[str, Any]:
+    stats: dict[str, Any] = log_writer.stats() if log_writer is not None else {"mode": "sync"}
+    if log_sampler is not None:
+        stats["sampling"] = log_sampler.stats()
+    return stats
 
 
 configure_logging()
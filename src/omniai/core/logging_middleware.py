@@ -1,17 +1,33 @@
 # omniai/core/logging_middleware.py
+import time
 import uuid
-from typing import Awaitable, Callable
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog.contextvars import bind_contextvars, clear_contextvars
 
+from omniai.core.config import settings
 from omniai.core.logging import logger
+from omniai.db.instrumentation import track_queries
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware: binds a trace_id and logs request start / end.
+
+    Unlike BaseHTTPMiddleware this adds no extra task or memory stream per request,
+    and streaming responses pass straight through. http_request_end is logged once
+    the response body has been fully sent.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Clear any leftover context from previous requests (important in async!)
         clear_contextvars()
 
@@ -20,23 +36,42 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         bind_contextvars(trace_id=trace_id)
 
         # Log request start
+        client = scope.get("client")
         logger.info(
             "http_request_start",
-            method=request.method,
-            url=str(request.url),
-            client_ip=request.client.host if request.client else "unknown",
+            method=scope["method"],
+            url=str(URL(scope=scope)),
+            client_ip=client[0] if client else "unknown",
         )
 
-        try:
-            response: Response = await call_next(request)
-            # Log request end
-            logger.info(
-                "http_request_end",
-                status_code=response.status_code,
-                content_length=getattr(response, "content_length", 0),
-            )
-            return response
-        except Exception as e:
-            # Log unhandled exceptions
-            logger.exception("http_request_unhandled_error", error=str(e))
-            raise
+        started = time.perf_counter()
+        status_code = 500
+        content_length = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_length
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-length":
+                        content_length = int(value)
+                        break
+            await send(message)
+
+        with track_queries(settings.DB_QUERY_BUDGET) as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                # Log unhandled exceptions
+                logger.exception("http_request_unhandled_error", error=str(e), db_queries=queries.count)
+                raise
+
+        # Log request end
+        logger.info(
+            "http_request_end",
+            status_code=status_code,
+            content_length=content_length,
+            db_queries=queries.count,
+            db_ms=round(queries.seconds * 1000, 2),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
@@ -0,0 +1,142 @@
+# src/omniai/core/membership_cache.py
+"""
+In-process tenant membership cache used by TenantValidationMiddleware.
+
+Two views are cached, both bounded (LRU) and time-limited (TTL):
+- (user_id, tenant_id) → membership answer, including negative answers
+  ("not a member", "organization not found")
+- user_id → default organization (or "no default org")
+
+It also remembers the latest membership_version seen per user, so tokens with
+an older membership claim are recognised as stale.
+
+Negative answers get a shorter TTL. The cache is per worker process: code that
+changes memberships must call the invalidate_* hooks, and the TTL bounds how long
+other workers can serve a stale answer.
+"""
+from enum import Enum
+from typing import Iterable, NamedTuple, Optional
+
+from omniai.core.cache import TTLLRUCache
+from omniai.core.config import settings
+
+
+class MembershipStatus(str, Enum):
+    MEMBER = "member"
+    NOT_MEMBER = "not_member"
+    ORG_NOT_FOUND = "org_not_found"
+
+
+class CachedMembership(NamedTuple):
+    status: MembershipStatus
+    role: Optional[str] = None
+
+
+class CachedDefaultOrg(NamedTuple):
+    organization_id: Optional[str]
+
+
+class MembershipCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        version_ttl_seconds: float,
+    ) -> None:
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._memberships: TTLLRUCache[tuple[str, str], CachedMembership] = TTLLRUCache(
+            max_entries, ttl_seconds, on_remove=self._forget_membership_key
+        )
+        self._defaults: TTLLRUCache[str, CachedDefaultOrg] = TTLLRUCache(
+            max_entries, ttl_seconds
+        )
+        self._versions: TTLLRUCache[str, int] = TTLLRUCache(max_entries, version_ttl_seconds)
+        # Secondary indexes so invalidation does not scan the whole cache
+        self._tenants_by_user: dict[str, set[str]] = {}
+        self._users_by_tenant: dict[str, set[str]] = {}
+
+    # --- membership: (user_id, tenant_id) ---
+    def get_membership(self, user_id: str, tenant_id: str) -> Optional[CachedMembership]:
+        return self._memberships.get((user_id, tenant_id))
+
+    def set_membership(self, user_id: str, tenant_id: str, membership: CachedMembership) -> None:
+        ttl = None if membership.status is MembershipStatus.MEMBER else self.negative_ttl_seconds
+        self._memberships.set((user_id, tenant_id), membership, ttl_seconds=ttl)
+        if (user_id, tenant_id) in self._memberships:
+            self._tenants_by_user.setdefault(user_id, set()).add(tenant_id)
+            self._users_by_tenant.setdefault(tenant_id, set()).add(user_id)
+
+    # --- default org: user_id ---
+    def get_default_org(self, user_id: str) -> Optional[CachedDefaultOrg]:
+        return self._defaults.get(user_id)
+
+    def set_default_org(self, user_id: str, organization_id: Optional[str]) -> None:
+        ttl = None if organization_id else self.negative_ttl_seconds
+        self._defaults.set(user_id, CachedDefaultOrg(organization_id), ttl_seconds=ttl)
+
+    # --- membership_version: user_id ---
+    def set_version(self, user_id: str, version: int) -> None:
+        known = self._versions.get(user_id)
+        if known is None or version > known:
+            self._versions.set(user_id, version)
+
+    def is_stale(self, user_id: str, version: int) -> bool:
+        """True if this worker has seen a newer membership_version than `version`."""
+        known = self._versions.get(user_id)
+        return known is not None and known > version
+
+    # --- invalidation hooks ---
+    def invalidate(self, user_id: str, tenant_id: str) -> None:
+        """Drop one (user, tenant) answer and the user's default-org entry."""
+        self._memberships.pop((user_id, tenant_id))
+        self._defaults.pop(user_id)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop everything cached for a user (call after any membership change)."""
+        for tenant_id in list(self._tenants_by_user.get(user_id, ())):
+            self._memberships.pop((user_id, tenant_id))
+        self._defaults.pop(user_id)
+
+    def invalidate_users(self, user_ids: Iterable[str]) -> None:
+        for user_id in user_ids:
+            self.invalidate_user(user_id)
+
+    def invalidate_org(self, tenant_id: str) -> None:
+        """Drop every answer about an organization (e.g. org created or deleted)."""
+        for user_id in list(self._users_by_tenant.get(tenant_id, ())):
+            self._memberships.pop((user_id, tenant_id))
+
+    def clear(self) -> None:
+        self._memberships.clear()
+        self._defaults.clear()
+        self._versions.clear()
+
+    def _forget_membership_key(self, key: tuple[str, str]) -> None:
+        user_id, tenant_id = key
+        tenants = self._tenants_by_user.get(user_id)
+        if tenants is not None:
+            tenants.discard(tenant_id)
+            if not tenants:
+                del self._tenants_by_user[user_id]
+        users = self._users_by_tenant.get(tenant_id)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self._users_by_tenant[tenant_id]
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            "memberships": self._memberships.stats(),
+            "default_orgs": self._defaults.stats(),
+            "versions": self._versions.stats(),
+        }
+
+
+membership_cache = MembershipCache(
+    max_entries=settings.MEMBERSHIP_CACHE_MAX_ENTRIES if settings.MEMBERSHIP_CACHE_ENABLED else 0,
+    ttl_seconds=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.MEMBERSHIP_CACHE_NEGATIVE_TTL_SECONDS,
+    # A token can't outlive this, so neither does the version needed to reject it
+    version_ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
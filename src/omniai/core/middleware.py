@@ -1,19 +1,35 @@
 
 # OMNIAI Core Middleware Layer
-from typing import Awaitable, Callable
+import time
+from typing import Optional
 
 from fastapi import Request
 from jwt import PyJWTError
-from sqlalchemy import select
-from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import MutableHeaders
+from starlette.requests import cookie_parser
 from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog.contextvars import bind_contextvars
 
-from omniai.core.jwt import decode_token
+from omniai.core.audit import audit_log
+from omniai.core.config import settings
+from omniai.core.jwt import MembershipClaim, decode_token
 from omniai.core.logging import logger
-from omniai.db.session import AsyncSessionLocal
-from omniai.models.organization import Organization
-from omniai.models.user import user_organization
+from omniai.core.membership_cache import (
+    CachedDefaultOrg,
+    CachedMembership,
+    MembershipStatus,
+    membership_cache,
+)
+from omniai.db.routing import (
+    WROTE_AT_COOKIE,
+    parse_wrote_at,
+    read_from_replica,
+    track_client_writes,
+)
+from omniai.db.session import AsyncSessionLocal, read_only_request, shard_map
+from omniai.services.organization import TenantResolution, resolve_tenant
 
 # Public paths (no auth needed)
 PUBLIC_PATHS = {
@@ -24,19 +40,95 @@ PUBLIC_PATHS = {
     "/ready",
     "/v1/auth/signup",
     "/v1/auth/login",
+    "/v1/auth/refresh",
+    "/v1/auth/logout",
     "/docs",
     "/openapi.json",
 }
 
-class TenantValidationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
-        if request.url.path in PUBLIC_PATHS:
-            return await call_next(request)
+# Set by core/prewarm.py on its in-process requests (never by a client): not audited
+PREWARM_SCOPE_KEY = "omniai.prewarm"
 
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware: carries the client's last write time between workers.
+
+    The omniai_wrote_at cookie of the request keeps its reads on the primary
+    (db/routing.py); a request that commits a write gets the cookie set on
+    its response. Must wrap TenantValidationMiddleware, whose tenant checks
+    are reads too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        if scope["type"] != "http" or window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        cookies = {}
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                cookies = cookie_parser(value.decode("latin-1"))
+                break
+
+        with track_client_writes(parse_wrote_at(cookies.get(WROTE_AT_COOKIE))) as writes:
+
+            async def send_wrapper(message: Message) -> None:
+                # Endpoints commit before responding, so `wrote` is known by now
+                if message["type"] == "http.response.start" and writes.wrote:
+                    MutableHeaders(scope=message).append(
+                        "set-cookie",
+                        f"{WROTE_AT_COOKIE}={time.time():.3f}; Max-Age={int(window) or 1}; Path=/; HttpOnly; SameSite=lax",
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class TenantValidationMiddleware:
+    """
+    Pure ASGI middleware: authenticates the bearer token and validates the tenant.
+
+    On success `request.state.user_id`, `.tenant_id`, `.membership`, `.shard`
+    and `.tenant_moving` (db/sharding.py) are set for the endpoint, and
+    `request.state.db` carries the request's directory DB session;
+    otherwise the error response is sent and the app is never called.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # One session per request, shared with the endpoint through get_db.
+        # AsyncSession checks out a connection lazily, so a request served
+        # entirely from the membership cache costs a single pool checkout.
+        async with AsyncSessionLocal() as db:
+            # Request(scope).state writes into scope["state"], shared with the endpoint
+            request = Request(scope)
+            request.state.db = db
+            db.info["read_only"] = read_only_request(scope["method"])
+            denied = await self.authorize(request, db)
+            if denied is not None:
+                await denied(scope, receive, send)
+                return
+
+            await self.app(scope, receive, send)
+
+    async def authorize(self, request: Request, db: AsyncSession) -> Optional[Response]:
+        """Return an error response, or None once the request is authorized."""
         # === STEP 1: Authenticate user via JWT ===
         auth_header = request.headers.get("authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             logger.warn("auth_missing", url=str(request.url))
+            self._audit(request, "denied", "MISSING_AUTH_TOKEN")
             return JSONResponse(
                 status_code=401,
                 content={"error": {"code": "MISSING_AUTH_TOKEN", "message": "Authorization header missing"}}
@@ -48,67 +140,90 @@ class TenantValidationMiddleware(BaseHTTPMiddleware):
             user_id = payload["sub"]
         except PyJWTError as e:
             logger.warn("auth_invalid_token", url=str(request.url), error=str(e))
+            self._audit(request, "denied", "INVALID_TOKEN")
             return JSONResponse(
                 status_code=401,
                 content={"error": {"code": "INVALID_TOKEN", "message": "Invalid or expired token"}}
             )
 
-        # === STEP 2–3: Handle tenant resolution + validation in ONE DB session ===
+        db.info["user_id"] = user_id  # read-your-writes routing (db/routing.py)
+
+        # === STEP 2–3: Handle tenant resolution + validation ===
+        # Answers come from the membership cache when possible; on a miss ONE
+        # statement resolves default org, org existence and role together.
         tenant_id = request.headers.get("x-tenant-id")
-        used_default = False
+        used_default = not tenant_id
+        membership: Optional[CachedMembership] = None
+        if used_default:
+            logger.info("tenant_missing_fallback_to_default", user_id=user_id)
 
-        async with AsyncSessionLocal() as db:
-            # --- Resolve tenant_id if missing ---
-            if not tenant_id:
-                logger.info("tenant_missing_fallback_to_default", user_id=user_id)
-                result = await db.execute(
-                    select(user_organization.c.organization_id)
-                    .where(
-                        user_organization.c.user_id == user_id,
-                        user_organization.c.is_default
-                    )
-                )
-                default_org = result.scalar_one_or_none()
-                if not default_org:
-                    logger.warn("user_no_default_org", user_id=user_id)
-                    return JSONResponse(
-                        status_code=403,
-                        content={"error": {"code": "NO_DEFAULT_ORG", "message": "User has no default organization."}}
-                    )
-                tenant_id = default_org
-                used_default = True
-            else:
-                # --- Validate org exists ---
-                org_exists = await db.execute(
-                    select(Organization.id).where(Organization.id == tenant_id)
-                )
-                if org_exists.scalar_one_or_none() is None:
-                    logger.warn("tenant_not_found", tenant_id=tenant_id, user_id=user_id)
-                    return JSONResponse(
-                        status_code=404,
-                        content={"error": {"code": "ORG_NOT_FOUND", "message": "Organization not found"}}
-                    )
+        # --- Signed membership claim: authorize from the verified token alone ---
+        # Only positive answers are taken from the claim; anything else (stale
+        # version, claim too old, tenant not in the claim) falls through to the
+        # cache / DB so error codes stay exactly the same. The age cap bounds
+        # how long a revocation seen by another worker only goes unnoticed here.
+        claim = MembershipClaim.from_payload(payload)
+        if (
+            claim is not None
+            and claim.is_fresh(settings.JWT_MEMBERSHIP_CLAIM_MAX_AGE_SECONDS)
+            and not membership_cache.is_stale(user_id, claim.version)
+        ):
+            claimed_tenant = tenant_id or claim.default_org_id
+            role = claim.roles.get(claimed_tenant) if claimed_tenant else None
+            if claimed_tenant and role is not None:
+                tenant_id = claimed_tenant
+                membership = CachedMembership(MembershipStatus.MEMBER, role)
 
-            # --- Validate user is a member of the resolved tenant_id ---
-            membership = await db.execute(
-                select(user_organization.c.organization_id)
-                .where(
-                    user_organization.c.user_id == user_id,
-                    user_organization.c.organization_id == tenant_id
-                )
-            )
-            if membership.scalar_one_or_none() is None:
-                logger.warn("access_denied_not_org_member", user_id=user_id, tenant_id=tenant_id)
+        if not tenant_id:
+            cached_default = membership_cache.get_default_org(user_id)
+            if cached_default is None:
+                resolution = await self._resolve(db, user_id, None)
+                cached_default = CachedDefaultOrg(resolution.default_org_id)
+                membership = self._membership_from(resolution)
+
+            if not cached_default.organization_id:
+                logger.warn("user_no_default_org", user_id=user_id)
+                self._audit(request, "denied", "NO_DEFAULT_ORG", user_id=user_id)
                 return JSONResponse(
                     status_code=403,
-                    content={"error": {"code": "NOT_ORG_MEMBER", "message": "Not a member of the specified organization"}}
+                    content={"error": {"code": "NO_DEFAULT_ORG", "message": "User has no default organization."}}
                 )
+            tenant_id = cached_default.organization_id
+
+        if membership is None:
+            membership = membership_cache.get_membership(user_id, tenant_id)
+        if membership is None:
+            membership = self._membership_from(await self._resolve(db, user_id, tenant_id))
+
+        # --- Org must exist, and user must be a member of the resolved tenant_id ---
+        if membership.status is MembershipStatus.ORG_NOT_FOUND:
+            logger.warn("tenant_not_found", tenant_id=tenant_id, user_id=user_id)
+            self._audit(request, "denied", "ORG_NOT_FOUND", user_id=user_id, tenant_id=tenant_id)
+            return JSONResponse(
+                status_code=404,
+                content={"error": {"code": "ORG_NOT_FOUND", "message": "Organization not found"}}
+            )
+        if membership.status is MembershipStatus.NOT_MEMBER:
+            logger.warn("access_denied_not_org_member", user_id=user_id, tenant_id=tenant_id)
+            self._audit(request, "denied", "NOT_ORG_MEMBER", user_id=user_id, tenant_id=tenant_id)
+            return JSONResponse(
+                status_code=403,
+                content={"error": {"code": "NOT_ORG_MEMBER", "message": "Not a member of the specified organization"}}
+            )
+
+        # --- Shard holding the tenant's data (no query unless sharded, then cached) ---
+        # A move in progress only blocks writes to the tenant's data (get_tenant_db)
+        placement = await shard_map.locate(db, tenant_id)
 
         # === STEP 4: Bind to logs and request state ===
         bind_contextvars(user_id=user_id, tenant_id=tenant_id)
         request.state.user_id = user_id
         request.state.tenant_id = tenant_id
+        request.state.membership = membership
+        request.state.shard = placement.shard
+        request.state.tenant_moving = placement.moving
 
+        self._audit(request, "allowed", user_id=user_id, tenant_id=tenant_id)
         logger.info(
             "auth_and_tenant_success",
             user_id=user_id,
@@ -116,4 +231,50 @@ class TenantValidationMiddleware(BaseHTTPMiddleware):
             used_default=used_default
         )
 
-        return await call_next(request)
+        return None
+
+    @staticmethod
+    def _audit(
+        request: Request,
+        outcome: str,
+        code: Optional[str] = None,
+        user_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ) -> None:
+        if request.scope.get(PREWARM_SCOPE_KEY):
+            return
+        detail = {"method": request.method, "path": request.url.path}
+        if code is not None:
+            detail["code"] = code
+        audit_log.record(
+            "tenant_access",
+            outcome,
+            user_id=user_id,
+            tenant_id=tenant_id,
+            client_ip=request.client.host if request.client else None,
+            detail=detail,
+        )
+
+    @classmethod
+    async def _resolve(cls, db: AsyncSession, user_id: str, tenant_id: Optional[str]) -> TenantResolution:
+        resolution = await resolve_tenant(db, user_id, tenant_id)
+        # A lagging replica may not have the user's new membership / org yet:
+        # its negative answers are used for this request but not cached
+        trusted = not read_from_replica(db.info)
+        if resolution.default_org_id or trusted:
+            membership_cache.set_default_org(user_id, resolution.default_org_id)
+        if resolution.membership_version is not None:
+            membership_cache.set_version(user_id, resolution.membership_version)
+        if resolution.tenant_id:
+            membership = cls._membership_from(resolution)
+            if membership.status is MembershipStatus.MEMBER or trusted:
+                membership_cache.set_membership(user_id, resolution.tenant_id, membership)
+        return resolution
+
+    @staticmethod
+    def _membership_from(resolution: TenantResolution) -> CachedMembership:
+        if not resolution.org_exists:
+            return CachedMembership(MembershipStatus.ORG_NOT_FOUND)
+        if resolution.role is None:
+            return CachedMembership(MembershipStatus.NOT_MEMBER)
+        return CachedMembership(MembershipStatus.MEMBER, resolution.role)
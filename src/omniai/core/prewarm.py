@@ -0,0 +1,91 @@
+# src/omniai/core/prewarm.py
+"""
+Optional warm-up in the lifespan, before the worker accepts requests, so the
+first real requests don't pay for it:
+- STARTUP_PREWARM_CONNECTIONS pool connections are opened in parallel and
+  the hot statements are prepared on each of them (asyncpg caches prepared
+  statements per connection; SQLAlchemy compiles each one once)
+- STARTUP_PREWARM_ROUTES sends one in-process request to each hot route.
+  The token carries a signed membership claim for an org that does not
+  exist, so the JWT and tenant middleware authorize it without the DB and
+  /v1/orgs runs its dependencies, query and response model (an empty page).
+  Nothing is written: the requests are marked in the ASGI scope and the
+  tenant middleware does not audit them.
+  /v1/me is not called: without a real user it stops at "user not found";
+  its statement is among the ones prepared on the pool connections
+"""
+import asyncio
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import Executable
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from omniai.api.v1.me import _USER_WITH_ORGS
+from omniai.core.jwt import MEMBERSHIP_CLAIM, MembershipClaim, create_access_token
+from omniai.core.middleware import PREWARM_SCOPE_KEY
+from omniai.db.pool import sizing
+from omniai.services.auth import _USER_BY_EMAIL
+from omniai.services.organization import (
+    _MEMBERSHIP_CLAIM_ROWS,
+    _RESOLVE_TENANT,
+    _USER_ORG_ROLE,
+)
+
+PREWARM_USER_ID = "usr_prewarm"
+PREWARM_ORG_ID = "org_prewarm"
+
+HOT_STATEMENTS: list[tuple[Executable, dict[str, Any]]] = [
+    (_RESOLVE_TENANT, {"user_id": PREWARM_USER_ID, "tenant_id": None}),
+    (_USER_WITH_ORGS, {"user_id": PREWARM_USER_ID}),
+    (_USER_BY_EMAIL, {"email": "prewarm@omniai.invalid"}),
+    (_MEMBERSHIP_CLAIM_ROWS, {"user_id": PREWARM_USER_ID, "limit": 1}),
+    (_USER_ORG_ROLE, {"user_id": PREWARM_USER_ID, "org_id": PREWARM_ORG_ID}),
+]
+
+HOT_ROUTES = ["/v1/health", "/v1/health/ready", "/v1/orgs"]
+
+
+async def _prepare(conn: AsyncConnection) -> None:
+    for statement, params in HOT_STATEMENTS:
+        await conn.execute(statement, params)
+    await conn.rollback()
+
+
+async def prewarm_pool(engine: AsyncEngine, connections: int) -> int:
+    """Open up to `connections` pooled connections at once; returns how many."""
+    count = min(connections, sizing.pool_size)
+    if count <= 0:
+        return 0
+    conns = [engine.connect() for _ in range(count)]
+    try:
+        await asyncio.gather(*(conn.start() for conn in conns))
+        await asyncio.gather(*(_prepare(conn) for conn in conns))
+    finally:
+        # Back to the pool, which keeps them open (up to pool_size)
+        await asyncio.gather(*(conn.close() for conn in conns))
+    return count
+
+
+def _marked(app: ASGIApp) -> ASGIApp:
+    async def prewarm_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await app({**scope, PREWARM_SCOPE_KEY: True}, receive, send)
+
+    return prewarm_app
+
+
+async def prewarm_routes(app: FastAPI) -> dict[str, int]:
+    """One in-process GET per hot route; returns the status codes (all 200)."""
+    claim = MembershipClaim(version=0, default_org_id=PREWARM_ORG_ID, roles={PREWARM_ORG_ID: "owner"})
+    token = create_access_token({"sub": PREWARM_USER_ID, MEMBERSHIP_CLAIM: claim.to_payload()})
+    headers = {"Authorization": f"Bearer {token}"}
+    statuses = {}
+    transport = httpx.ASGITransport(app=_marked(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://prewarm") as client:
+        for path in HOT_ROUTES:
+            # Own task, like a served request: per-request log context stays out of the lifespan
+            response = await asyncio.create_task(client.get(path, headers=headers))
+            statuses[path] = response.status_code
+    return statuses
@@ -0,0 +1,21 @@
+# src/omniai/core/ratelimit.py
+"""Token bucket used by auth admission control (core/admission.py) and log rate limits (core/log_sampling.py)."""
+import time
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, burst: float) -> None:
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self, rate: float, burst: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
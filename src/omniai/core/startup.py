@@ -0,0 +1,42 @@
+# src/omniai/core/startup.py
+"""
+Cold start timings.
+
+main.py imports this module before anything else and wraps each startup
+phase (settings, logging, engine, imports, routers, then the lifespan steps)
+in `startup_timer.phase(...)`. Once the lifespan is done, the report is
+logged as startup_report and served under "startup" in /metrics. The total
+runs from the moment omniai.main started importing to readiness; interpreter
+and uvicorn startup come before that and are not included.
+
+Nothing from the app may be imported here, or it would be timed as "startup".
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+class StartupTimer:
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self.phases_ms: dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def ready(self) -> dict[str, Any]:
+        """Stop the clock: the app is about to accept requests."""
+        self.total_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        return self.report()
+
+    def report(self) -> dict[str, Any]:
+        return {"total_ms": self.total_ms, "phases_ms": dict(self.phases_ms)}
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,102 @@
+# src/omniai/db/instrumentation.py
+"""
+Per-request query counting and timing, hooked into the engine's cursor events.
+
+LoggingMiddleware, the outermost middleware, opens a QueryStats for every
+request (track_queries); each statement executed while handling it, the
+tenant middleware's included, is counted and timed, and
+http_request_end reports `db_queries` / `db_ms`. Statements slower than
+DB_SLOW_QUERY_MS are logged on their own.
+
+Budget: more than DB_QUERY_BUDGET statements in one request logs
+db_query_budget_exceeded; with DB_QUERY_BUDGET_STRICT (tests) the statement
+that crosses the budget raises QueryBudgetExceeded instead, so an N+1 fails
+the test that introduced it. Routes that legitimately run many statements
+declare their own budget with the `query_budget(n)` dependency.
+
+The counter lives in a ContextVar; SQLAlchemy's async layer runs the sync
+events in a greenlet that shares the calling task's context, so the events
+see the request's QueryStats.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised in strict mode when a request runs more statements than its budget."""
+
+
+@dataclass
+class QueryStats:
+    budget: Optional[int]
+    count: int = 0
+    seconds: float = 0.0
+    budget_reported: bool = False
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("omniai_query_stats", default=None)
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """Count the statements executed in this context (one request)."""
+    stats = QueryStats(budget=budget)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def query_budget(limit: Optional[int]) -> Callable[[], None]:
+    """Route dependency overriding the request's budget (None = unlimited)."""
+
+    def set_budget() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return set_budget
+
+
+def _before_cursor_execute(
+    _conn: Any, _cursor: Any, _statement: str, _parameters: Any, context: Any, _executemany: bool
+) -> None:
+    context._omniai_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    _conn: Any, _cursor: Any, statement: str, _parameters: Any, context: Any, _executemany: bool
+) -> None:
+    elapsed = time.perf_counter() - context._omniai_query_start
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warn("db_slow_query", duration_ms=round(elapsed * 1000, 2), statement=statement[:500])
+
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.seconds += elapsed
+    if stats.budget is not None and stats.count > stats.budget and not stats.budget_reported:
+        stats.budget_reported = True
+        logger.warn("db_query_budget_exceeded", budget=stats.budget, statement=statement[:500])
+        if settings.DB_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(f"More than {stats.budget} queries in one request")
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,169 @@
+# src/omniai/db/migrate.py
+"""
+Schema migration runner.
+
+    python -m omniai.db.migrate            # apply pending migrations
+    python -m omniai.db.migrate status     # print applied / latest version
+
+Run once per deploy, before the new workers start (scripts/start.sh does it
+unless RUN_MIGRATIONS=false). Runners on several replicas are serialized by a
+Postgres advisory lock, so only the first applies anything. Workers never
+touch the schema: at boot they only compare schema_migrations with the
+latest version they know (check_schema_version).
+
+The lock is held on one session for the whole run, so point DATABASE_URL at
+Postgres itself rather than PgBouncer in transaction mode when migrating.
+"""
+import argparse
+import asyncio
+import importlib
+import pkgutil
+import re
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.db import migrations
+
+# pg_advisory_lock key shared by every runner ("omniai-migrations")
+_LOCK_KEY = 0x6F6D6E6961696D67
+
+_CREATE_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+class SchemaOutdated(RuntimeError):
+    """The database is behind the code: migrations have not been applied."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+
+@lru_cache(maxsize=1)
+def load_migrations() -> tuple[Migration, ...]:
+    found = []
+    for module in pkgutil.iter_modules(migrations.__path__):
+        match = re.fullmatch(r"m(\d{4})_(\w+)", module.name)
+        if match is None:
+            continue
+        sql = importlib.import_module(f"{migrations.__name__}.{module.name}").SQL
+        found.append(Migration(int(match.group(1)), match.group(2), sql))
+    found.sort(key=lambda m: m.version)
+    versions = [m.version for m in found]
+    if versions != list(range(1, len(found) + 1)):
+        raise RuntimeError(f"Migration versions must be contiguous from 1, found {versions}")
+    return tuple(found)
+
+
+def latest_version() -> int:
+    return len(load_migrations())
+
+
+async def _applied_version(driver_conn: Any) -> Optional[int]:
+    """Highest applied version; None when migrations have never run."""
+    if await driver_conn.fetchval("SELECT to_regclass('schema_migrations')") is None:
+        return None
+    return int(await driver_conn.fetchval("SELECT coalesce(max(version), 0) FROM schema_migrations"))
+
+
+async def applied_version(engine: AsyncEngine) -> Optional[int]:
+    async with engine.connect() as conn:
+        return await _applied_version((await conn.get_raw_connection()).driver_connection)
+
+
+async def migrate(engine: AsyncEngine) -> list[Migration]:
+    """Apply pending migrations, each in its own transaction; returns those applied."""
+    applied: list[Migration] = []
+    async with engine.connect() as conn:
+        # Migrations may hold several statements: run them on asyncpg directly
+        driver_conn: Any = (await conn.get_raw_connection()).driver_connection
+        await driver_conn.execute("SELECT pg_advisory_lock($1)", _LOCK_KEY)
+        try:
+            await driver_conn.execute(_CREATE_VERSION_TABLE)
+            current = await _applied_version(driver_conn) or 0
+            for migration in load_migrations()[current:]:
+                start = time.perf_counter()
+                async with driver_conn.transaction():
+                    await driver_conn.execute(migration.sql)
+                    await driver_conn.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+                        migration.version,
+                        migration.name,
+                    )
+                applied.append(migration)
+                logger.info(
+                    "migration_applied",
+                    version=migration.version,
+                    name=migration.name,
+                    duration_ms=round((time.perf_counter() - start) * 1000, 1),
+                )
+        finally:
+            await driver_conn.execute("SELECT pg_advisory_unlock($1)", _LOCK_KEY)
+    return applied
+
+
+async def check_schema_version(engine: AsyncEngine) -> int:
+    """Boot check for workers: one query, no DDL. Raises SchemaOutdated if behind."""
+    current = await applied_version(engine)
+    latest = latest_version()
+    if current is None or current < latest:
+        raise SchemaOutdated(
+            f"Database schema is at version {current or 0}, this build needs {latest}: "
+            "run `python -m omniai.db.migrate`"
+        )
+    if current > latest:
+        # Rolling deploy: an older build on a newer (backward compatible) schema
+        logger.warn("schema_newer_than_code", schema_version=current, code_version=latest)
+    return current
+
+
+async def _wait_for_database(engine: AsyncEngine, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with engine.connect():
+                return
+        except Exception as e:
+            if time.monotonic() >= deadline:
+                raise
+            logger.warning("database_connection_retry", error=str(e))
+            await asyncio.sleep(1)
+
+
+async def _main(command: str, wait_seconds: float) -> int:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        await _wait_for_database(engine, wait_seconds)
+        if command == "status":
+            current = await applied_version(engine)
+            print(f"schema version {current or 0}, latest {latest_version()}")
+            return 0 if (current or 0) >= latest_version() else 1
+        applied = await migrate(engine)
+        logger.info("migrations_complete", applied=len(applied), schema_version=latest_version())
+        return 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--wait", type=float, default=30.0, help="Seconds to wait for the database to accept connections")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.command, args.wait)))
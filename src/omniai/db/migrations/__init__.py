@@ -0,0 +1,15 @@
+# src/omniai/db/migrations/__init__.py
+"""
+Versioned schema migrations, applied in order by `python -m omniai.db.migrate`.
+
+Each module is named mNNNN_<description>.py and defines SQL, which runs in
+one transaction together with its schema_migrations row. Versions are
+contiguous and never edited once released; change the schema with a new
+module. Keep every migration backward compatible with the code currently
+running (add, backfill, then drop in a later release), since during a rolling
+deploy old workers keep serving on the new schema.
+
+Every migration uses IF [NOT] EXISTS. For 0001-0004 that adopts databases
+created by the old metadata.create_all() at startup as they are; later ones
+follow suit so a statement that already took effect is not an error.
+"""
@@ -0,0 +1,33 @@
+# src/omniai/db/migrations/m0001_initial.py
+"""Users, organizations and memberships (the schema create_all() used to build)."""
+
+SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id VARCHAR PRIMARY KEY,
+    email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email);
+
+CREATE TABLE IF NOT EXISTS organizations (
+    id VARCHAR PRIMARY KEY,
+    name VARCHAR NOT NULL,
+    slug VARCHAR NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    description TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_organizations_name ON organizations (name);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_organizations_slug ON organizations (slug);
+
+CREATE TABLE IF NOT EXISTS user_organization (
+    user_id VARCHAR NOT NULL REFERENCES users (id),
+    organization_id VARCHAR NOT NULL REFERENCES organizations (id),
+    joined_at TIMESTAMPTZ DEFAULT now(),
+    is_default BOOLEAN NOT NULL,
+    role VARCHAR NOT NULL,
+    PRIMARY KEY (user_id, organization_id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_default_org ON user_organization (user_id) WHERE is_default;
+"""
@@ -0,0 +1,6 @@
+# src/omniai/db/migrations/m0002_membership_version.py
+"""users.membership_version: bumped on membership changes to invalidate token claims."""
+
+SQL = """
+ALTER TABLE users ADD COLUMN IF NOT EXISTS membership_version INTEGER NOT NULL DEFAULT 0;
+"""
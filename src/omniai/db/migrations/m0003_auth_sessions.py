@@ -0,0 +1,17 @@
+# src/omniai/db/migrations/m0003_auth_sessions.py
+"""Refresh tokens (hashed), grouped in rotation families."""
+
+SQL = """
+CREATE TABLE IF NOT EXISTS auth_sessions (
+    id VARCHAR PRIMARY KEY,
+    token_hash VARCHAR(64) NOT NULL UNIQUE,
+    family_id VARCHAR NOT NULL,
+    user_id VARCHAR NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    used_at TIMESTAMPTZ,
+    revoked_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS ix_auth_sessions_family_id ON auth_sessions (family_id);
+CREATE INDEX IF NOT EXISTS ix_auth_sessions_user_id ON auth_sessions (user_id);
+"""
@@ -0,0 +1,6 @@
+# src/omniai/db/migrations/m0004_user_org_role_index.py
+"""Covering index for GET /v1/orgs pages filtered by role."""
+
+SQL = """
+CREATE INDEX IF NOT EXISTS idx_user_org_role ON user_organization (user_id, role, organization_id);
+"""
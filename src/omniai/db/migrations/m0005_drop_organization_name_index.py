@@ -0,0 +1,6 @@
+# src/omniai/db/migrations/m0005_drop_organization_name_index.py
+"""Organizations are never looked up by name: the index was only write cost."""
+
+SQL = """
+DROP INDEX IF EXISTS ix_organizations_name;
+"""
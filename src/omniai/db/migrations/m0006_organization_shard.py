@@ -0,0 +1,7 @@
+# src/omniai/db/migrations/m0006_organization_shard.py
+"""Shard directory: which database holds each organization's tenant data."""
+
+SQL = """
+ALTER TABLE organizations ADD COLUMN IF NOT EXISTS shard VARCHAR;
+ALTER TABLE organizations ADD COLUMN IF NOT EXISTS moving_to_shard VARCHAR;
+"""
@@ -0,0 +1,16 @@
+# src/omniai/db/migrations/m0007_audit_events.py
+"""Audit trail, partitioned by month; partitions are created by the writer."""
+
+SQL = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    occurred_at TIMESTAMPTZ NOT NULL,
+    action VARCHAR NOT NULL,
+    outcome VARCHAR NOT NULL,
+    user_id VARCHAR,
+    tenant_id VARCHAR,
+    trace_id VARCHAR,
+    client_ip VARCHAR,
+    detail JSONB
+) PARTITION BY RANGE (occurred_at);
+CREATE INDEX IF NOT EXISTS ix_audit_events_tenant_time ON audit_events (tenant_id, occurred_at);
+"""
@@ -0,0 +1,10 @@
+# src/omniai/db/migrations/m0008_audit_event_ids.py
+"""Audit event ids: occurred_at isn't unique, so pages continue from (occurred_at, id)."""
+
+SQL = """
+CREATE SEQUENCE IF NOT EXISTS audit_events_id_seq;
+ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS id BIGINT NOT NULL DEFAULT nextval('audit_events_id_seq');
+ALTER SEQUENCE audit_events_id_seq OWNED BY audit_events.id;
+CREATE INDEX IF NOT EXISTS ix_audit_events_tenant_time_id ON audit_events (tenant_id, occurred_at, id);
+DROP INDEX IF EXISTS ix_audit_events_tenant_time;
+"""
@@ -0,0 +1,6 @@
+# src/omniai/db/migrations/m0009_auth_sessions_expiry_index.py
+"""Expired refresh-token rows are purged in the background along this index."""
+
+SQL = """
+CREATE INDEX IF NOT EXISTS ix_auth_sessions_expires_at ON auth_sessions (expires_at);
+"""
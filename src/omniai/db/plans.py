@@ -0,0 +1,125 @@
+# src/omniai/db/plans.py
+"""
+Query plan checks and index advice.
+
+tests/unit/test_query_plans.py seeds a scratch database, captures every
+statement the services issue and runs them through `explain()`: plans must
+not sequentially scan an application table, and their cost is compared with
+a stored baseline.
+
+The unused-index report is most useful against production statistics, where
+idx_scan reflects real traffic since the last stats reset:
+
+    python -m omniai.db.plans          # unused indexes on DATABASE_URL
+"""
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from omniai.core.config import settings
+from omniai.models.base import Base
+
+# Non-unique, non-primary indexes never used for a scan: each one is still
+# maintained on every INSERT / UPDATE of its table. Indexes leading with a
+# foreign key column are left out: they serve ON DELETE CASCADE and the key
+# checks of parent deletes, which request traffic rarely exercises
+_UNUSED_INDEXES = """
+SELECT s.relname AS table_name, s.indexrelname AS index_name,
+       pg_relation_size(s.indexrelid) AS size_bytes
+FROM pg_stat_user_indexes s
+JOIN pg_index i ON i.indexrelid = s.indexrelid
+WHERE s.idx_scan = 0 AND NOT i.indisunique AND NOT i.indisprimary
+  AND s.schemaname = current_schema()
+  AND NOT EXISTS (
+      SELECT 1 FROM pg_constraint c
+      WHERE c.contype = 'f' AND c.conrelid = i.indrelid AND c.conkey[1] = i.indkey[0]
+  )
+ORDER BY s.relname, s.indexrelname
+"""
+
+
+@dataclass(frozen=True)
+class SeqScan:
+    table: str
+    filter: Optional[str]   # None → the whole table is read
+
+
+@dataclass(frozen=True)
+class UnusedIndex:
+    table: str
+    index: str
+    size_bytes: int
+
+
+def app_tables() -> set[str]:
+    return set(Base.metadata.tables)
+
+
+async def explain(driver_conn: Any, sql: str, params: Any, analyze: bool) -> dict[str, Any]:
+    """
+    Plan of one statement as EXPLAIN's JSON root node. With analyze=True the
+    statement runs (with BUFFERS), so only pass analyze for reads or inside a
+    transaction that is rolled back.
+    """
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    raw = await driver_conn.fetchval(f"EXPLAIN ({options}) {sql}", *(params or ()))
+    # SQLAlchemy's asyncpg connections decode json themselves; a bare one returns text
+    document = json.loads(raw) if isinstance(raw, str) else raw
+    plan: dict[str, Any] = document[0]["Plan"]
+    return plan
+
+
+def plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def seq_scans(plan: dict[str, Any]) -> list[SeqScan]:
+    """Sequential scans of application tables anywhere in the plan."""
+    tables = app_tables()
+    return [
+        SeqScan(node["Relation Name"], node.get("Filter"))
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in tables
+    ]
+
+
+def missing_index_hint(scan: SeqScan) -> str:
+    if scan.filter is None:
+        return f"{scan.table}: read in full (no usable predicate)"
+    return f"{scan.table}: no index serves {scan.filter}"
+
+
+async def unused_indexes(driver_conn: Any) -> list[UnusedIndex]:
+    """Indexes with no scans since the statistics were last reset."""
+    # Backends flush their counters lazily; make this one's visible now (PostgreSQL 15+)
+    await driver_conn.execute("SELECT pg_stat_force_next_flush()")
+    rows = await driver_conn.fetch(_UNUSED_INDEXES)
+    return [UnusedIndex(row["table_name"], row["index_name"], row["size_bytes"]) for row in rows]
+
+
+async def _main() -> int:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            driver_conn: Any = (await conn.get_raw_connection()).driver_connection
+            unused = await unused_indexes(driver_conn)
+            reset = await driver_conn.fetchval(
+                "SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()"
+            )
+    finally:
+        await engine.dispose()
+    print(f"statistics since {reset or 'cluster start'}")
+    for index in unused:
+        print(f"unused: {index.table}.{index.index} ({index.size_bytes // 1024} KiB)")
+    return 1 if unused else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
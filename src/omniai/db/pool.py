@@ -0,0 +1,134 @@
+# src/omniai/db/pool.py
+"""
+Connection pool sizing and telemetry.
+
+Every uvicorn worker has its own pool, so the connections one instance can
+open are WEB_CONCURRENCY × (pool_size + max_overflow). Unless DB_POOL_SIZE /
+DB_MAX_OVERFLOW are pinned, each worker gets an equal share of
+DB_MAX_CONNECTIONS: a third kept open, the rest as overflow.
+
+TelemetryPool records how long each checkout waited for a connection and how
+many gave up after DB_POOL_TIMEOUT, per pool (the main engine and each
+shard have their own); /metrics reports them with the live pool counters. A wait histogram stuck in the lowest bucket with a low
+peak_checked_out means the pool can shrink. Waits and timeouts mean it, or
+DB_MAX_CONNECTIONS, is too small.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+
+# Upper bounds (ms) of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, math.inf)
+
+
+@dataclass(frozen=True)
+class PoolSizing:
+    pool_size: int
+    max_overflow: int
+    mode: str  # "auto" or "fixed"
+
+
+def pool_sizing(
+    max_connections: int,
+    workers: int,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> PoolSizing:
+    """Per-worker pool size and overflow; unset values come from this worker's share of max_connections."""
+    share = max(1, max_connections // workers)
+    size = pool_size if pool_size is not None else max(1, share // 3)
+    overflow = max_overflow if max_overflow is not None else max(0, share - size)
+    mode = "fixed" if pool_size is not None and max_overflow is not None else "auto"
+    return PoolSizing(size, overflow, mode)
+
+
+class PoolTelemetry:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS_MS)
+
+    def record_checkout(self, wait: float, checked_out: int) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+        wait_ms = wait * 1000
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                break
+
+    def stats(self, pool: Pool) -> dict[str, Any]:
+        live: dict[str, Any] = {}
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            live = {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative while the pool has not opened all pool_size connections yet
+                "overflow": pool.overflow(),
+            }
+        return {
+            **live,
+            "max_overflow": sizing.max_overflow,
+            "timeout_seconds": settings.DB_POOL_TIMEOUT,
+            "sizing": sizing.mode,
+            "workers": settings.WEB_CONCURRENCY,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+            "wait_ms_histogram": {
+                ("+Inf" if math.isinf(bound) else f"le_{bound}"): count
+                for bound, count in zip(WAIT_BUCKETS_MS, self.wait_buckets, strict=True)
+            },
+        }
+
+
+class TelemetryPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records its own checkout waits and timeouts."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.telemetry = PoolTelemetry()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.timeouts += 1
+            logger.warn("db_pool_timeout", **self.telemetry.stats(self))
+            raise
+        self.telemetry.record_checkout(time.perf_counter() - start, self.checkedout())
+        return entry
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    """Telemetry and live counters of one engine's pool (empty unless it is a TelemetryPool)."""
+    return pool.telemetry.stats(pool) if isinstance(pool, TelemetryPool) else {}
+
+
+sizing = pool_sizing(
+    settings.DB_MAX_CONNECTIONS, settings.WEB_CONCURRENCY, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+)
+if settings.WEB_CONCURRENCY * (sizing.pool_size + sizing.max_overflow) > settings.DB_MAX_CONNECTIONS:
+    logger.warn(
+        "db_pool_exceeds_connection_budget",
+        workers=settings.WEB_CONCURRENCY,
+        pool_size=sizing.pool_size,
+        max_overflow=sizing.max_overflow,
+        max_connections=settings.DB_MAX_CONNECTIONS,
+    )
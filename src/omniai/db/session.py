@@ -1,6 +1,8 @@
 # omniai/db/session.py
-from typing import AsyncGenerator
+import uuid
+from typing import Any, AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,  # ✅ Use async_sessionmaker (not sessionmaker)
@@ -8,29 +10,126 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from omniai.core.config import settings
+from omniai.db.instrumentation import instrument_engine
+from omniai.db.pool import TelemetryPool, sizing
+from omniai.db.routing import ReplicaSet, RoutingSession
+from omniai.db.sharding import MAIN_SHARD, ShardMap, TenantMoving, shard_urls
 
-# Production-grade async engine
+
+def asyncpg_connect_args() -> dict[str, Any]:
+    """
+    Prepared statement caching: SQLAlchemy compiles each statement once (the
+    hot ones are module-level constants) and asyncpg prepares it once per
+    connection, so repeats only send Bind/Execute.
+
+    Behind PgBouncer in transaction mode consecutive statements can land on
+    different server connections, so nothing may be reused: both caches are
+    off and every prepared statement gets a unique name.
+    """
+    if settings.DB_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__omniai_{uuid.uuid4().hex}__",
+        }
+    return {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+# Production-grade async engine; one pool per worker (db/pool.py)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=30,
-    pool_recycle=1800,  # Recycle every 30 minutes
+    connect_args=asyncpg_connect_args(),
+    poolclass=TelemetryPool,
+    pool_size=sizing.pool_size,
+    max_overflow=sizing.max_overflow,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
 )
+# Read replicas get the same per-worker sizing: the budget is per server
+replica_set = ReplicaSet([
+    create_async_engine(
+        url.strip(),
+        echo=False,
+        connect_args=asyncpg_connect_args(),
+        pool_size=sizing.pool_size,
+        max_overflow=sizing.max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+])
+# Tenant data shards (db/sharding.py); DATABASE_URL is "main" and the directory
+shard_map = ShardMap({
+    MAIN_SHARD: engine,
+    **{
+        name: create_async_engine(
+            url,
+            echo=False,
+            connect_args=asyncpg_connect_args(),
+            poolclass=TelemetryPool,
+            pool_size=sizing.pool_size,
+            max_overflow=sizing.max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        for name, url in shard_urls().items()
+    },
+})
+# Per-request query counts / timings (db/instrumentation.py)
+for _engine in [*shard_map.engines.values(), *(replica.engine for replica in replica_set.replicas)]:
+    instrument_engine(_engine.sync_engine)
 
 # ✅ Use async_sessionmaker — designed for AsyncSession
+# RoutingSession sends plain reads of GET requests to a replica (db/routing.py)
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replica_set,
     expire_on_commit=False,
     autoflush=False,
 )
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+
+def read_only_request(method: str) -> bool:
+    return method in ("GET", "HEAD")
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     FastAPI dependency for async DB sessions.
-    Automatically closes session after request.
+    Reuses the session TenantValidationMiddleware opened for this request (it
+    closes it once the response is sent); public routes get their own session,
+    closed automatically after the request.
     """
+    shared = getattr(request.state, "db", None)
+    if shared is not None:
+        yield shared
+        return
+
     async with AsyncSessionLocal() as session:
+        session.info["read_only"] = read_only_request(request.method)
+        yield session
+
+
+async def get_tenant_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI dependency for the shard holding the request tenant's data, as
+    resolved by TenantValidationMiddleware. On "main" this is the request's
+    shared session; other shards get a session closed after the request.
+    Write requests raise TenantMoving while the tenant is being moved.
+    """
+    if getattr(request.state, "tenant_moving", False) and not read_only_request(request.method):
+        raise TenantMoving(request.state.tenant_id)
+    shard = getattr(request.state, "shard", MAIN_SHARD)
+    if shard == MAIN_SHARD:
+        async for session in get_db(request):
+            yield session
+        return
+
+    async with shard_map.session(shard) as session:
         yield session
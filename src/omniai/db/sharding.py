@@ -0,0 +1,333 @@
+# src/omniai/db/sharding.py
+"""
+Tenant-sharded database routing.
+
+DATABASE_URL stays the global directory: users, organizations, memberships
+and refresh sessions live there (shard "main"), so login and tenant checks
+never fan out. Data owned by one organization lives on that org's shard:
+
+- `organizations.shard` is the directory entry; NULL (orgs created before
+  sharding) means "main"
+- new orgs are placed on a consistent-hash ring over all shards when they
+  are created, and keep that placement: adding a shard never relocates an
+  existing tenant, only `move_tenant` does
+- TenantValidationMiddleware resolves the tenant's shard once per request
+  (ShardMap.locate, cached per worker) and `get_tenant_db` hands endpoints a
+  session on it; while the tenant is being moved, write requests asking for
+  that session get 503 TENANT_MOVING (TenantMoving), and everything else,
+  directory writes included, goes on as usual
+
+Tables owned by a tenant (with an organization_id column) are listed in
+TENANT_TABLES; the move tool copies exactly those. None exist yet, so no
+endpoint uses `get_tenant_db` and today a move only rewrites the directory
+entry: tenant-owned tables and their endpoints plug into this as they come.
+
+    python -m omniai.db.sharding move <org_id> <shard>
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import Table, delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from omniai.core.cache import TTLLRUCache
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.db.pool import pool_stats
+from omniai.models.organization import Organization
+
+MAIN_SHARD = "main"
+
+# Tables holding one organization's rows (organization_id column), in copy
+# order: parents before children
+TENANT_TABLES: list[Table] = []
+
+# Rows per INSERT when copying a tenant
+_COPY_BATCH = 1_000
+
+
+def shard_urls() -> dict[str, str]:
+    """Extra shards from DATABASE_SHARD_URLS ("name=url,name=url")."""
+    urls = {}
+    for entry in settings.DATABASE_SHARD_URLS.split(","):
+        if not entry.strip():
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep or not name.strip() or name.strip() == MAIN_SHARD:
+            raise ValueError(f"DATABASE_SHARD_URLS entries must be name=url with a name other than 'main': {entry!r}")
+        urls[name.strip()] = url.strip()
+    return urls
+
+
+class HashRing:
+    """Consistent hashing with virtual nodes: adding a shard moves ~1/N of the keys."""
+
+    def __init__(self, names: Sequence[str], vnodes: int = 64) -> None:
+        points = sorted((self._hash(f"{name}#{i}"), name) for name in names for i in range(vnodes))
+        self._keys = [point for point, _ in points]
+        self._names = [name for _, name in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def lookup(self, key: str) -> str:
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._names[index]
+
+
+shard_ring = HashRing([MAIN_SHARD, *shard_urls()])
+
+
+def place_organization(org_id: str) -> str:
+    """Shard for a new organization's tenant data."""
+    return shard_ring.lookup(org_id)
+
+
+@dataclass(frozen=True)
+class Placement:
+    shard: str
+    moving: bool = False    # a move is cutting over: reads only
+
+
+class ShardMap:
+    def __init__(self, engines: dict[str, AsyncEngine]) -> None:
+        """`engines` has one engine per shard, "main" included."""
+        self.engines = engines
+        self._sessions = {
+            name: async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+            for name, engine in engines.items()
+        }
+        self.directory: TTLLRUCache[str, Placement] = TTLLRUCache(
+            max_entries=settings.SHARD_DIRECTORY_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SHARD_DIRECTORY_CACHE_SECONDS,
+        )
+        self.lookups = 0
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    def session(self, shard: str) -> AsyncSession:
+        return self._sessions[shard]()
+
+    async def locate(self, db: AsyncSession, org_id: str) -> Placement:
+        """Where `org_id`'s data lives; `db` is a directory session. No query when unsharded."""
+        if not self.sharded:
+            return Placement(MAIN_SHARD)
+        placement = self.directory.get(org_id)
+        if placement is None:
+            self.lookups += 1
+            row = (
+                await db.execute(
+                    select(Organization.shard, Organization.moving_to_shard).where(Organization.id == org_id)
+                )
+            ).one_or_none()
+            shard = (row.shard if row else None) or MAIN_SHARD
+            placement = Placement(shard, moving=bool(row and row.moving_to_shard))
+            self.directory.set(org_id, placement)
+        return placement
+
+    def forget(self, org_id: str) -> None:
+        self.directory.pop(org_id)
+
+    async def dispose(self) -> None:
+        for name, engine in self.engines.items():
+            if name != MAIN_SHARD:
+                await engine.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shards": sorted(self.engines),
+            "directory_lookups": self.lookups,
+            "directory_cache": self.directory.stats(),
+            "pools": {name: pool_stats(engine.pool) for name, engine in sorted(self.engines.items())},
+        }
+
+
+class TenantMoving(Exception):
+    """Raised by get_tenant_db for a write request while its tenant is being moved."""
+
+    def __init__(self, org_id: str) -> None:
+        super().__init__(f"{org_id} is being moved")
+        self.org_id = org_id
+
+
+async def tenant_moving_handler(request: Request, exc: Exception) -> JSONResponse:
+    tenant_id = exc.org_id if isinstance(exc, TenantMoving) else None
+    logger.warn("tenant_moving_write_refused", tenant_id=tenant_id, url=str(request.url))
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(int(settings.SHARD_DIRECTORY_CACHE_SECONDS))},
+        content={"error": {"code": "TENANT_MOVING", "message": "Organization is being moved; retry shortly"}},
+    )
+
+
+class TenantMoveError(RuntimeError):
+    """The tenant can't be moved (unknown org or shard, or a move is already running)."""
+
+
+async def _tenant_rows(session: AsyncSession, table: Table, org_id: str) -> list[dict[str, Any]]:
+    result = await session.execute(select(table).where(table.c.organization_id == org_id))
+    return [dict(row._mapping) for row in result]
+
+
+async def _copy_tenant(
+    source: AsyncSession, target: AsyncSession, tables: Sequence[Table], org_id: str
+) -> dict[str, int]:
+    """
+    Make the target's rows for org_id equal to the source's: upsert every row,
+    then drop target rows the source no longer has. Commits on the target.
+    """
+    copied = {}
+    for table in tables:
+        rows = await _tenant_rows(source, table, org_id)
+        key = list(table.primary_key.columns)
+        for start in range(0, len(rows), _COPY_BATCH):
+            statement = pg_insert(table).values(rows[start:start + _COPY_BATCH])
+            others = {c.name: statement.excluded[c.name] for c in table.columns if not c.primary_key}
+            await target.execute(
+                statement.on_conflict_do_update(index_elements=key, set_=others)
+                if others
+                else statement.on_conflict_do_nothing(index_elements=key)
+            )
+        kept = [tuple(row[c.name] for c in key) for row in rows]
+        stale = delete(table).where(table.c.organization_id == org_id)
+        if kept:
+            stale = stale.where(tuple_(*key).not_in(kept))
+        await target.execute(stale)
+        copied[table.name] = len(rows)
+    await target.commit()
+    await source.rollback()
+    return copied
+
+
+async def move_tenant(
+    shard_map: ShardMap,
+    org_id: str,
+    target: str,
+    tables: Optional[Sequence[Table]] = None,
+    settle_seconds: Optional[float] = None,
+) -> dict[str, int]:
+    """
+    Move one organization's tenant data to another shard while the app keeps
+    serving it. Returns rows copied per table.
+
+    1. Bulk copy while the tenant is live (reads and writes continue)
+    2. Freeze: mark the org moving; once every worker has seen that (one
+       directory cache TTL, `settle_seconds`), writes to its data get 503
+       (get_tenant_db) and its reads still go to the source
+    3. Copy again so the target matches the source exactly, then point the
+       directory at the target: writes resume, on the target
+    4. After another TTL no worker reads the source any more: its rows are
+       deleted
+
+    Without change timestamps on tenant tables, step 3 re-reads the whole
+    tenant; the freeze lasts that long.
+    """
+    tables = TENANT_TABLES if tables is None else tables
+    settle = settings.SHARD_DIRECTORY_CACHE_SECONDS + 1 if settle_seconds is None else settle_seconds
+    if target not in shard_map.engines:
+        raise TenantMoveError(f"Unknown shard {target!r}")
+    started = time.perf_counter()
+
+    async with shard_map.session(MAIN_SHARD) as directory:
+        row = (
+            await directory.execute(
+                select(Organization.shard, Organization.moving_to_shard).where(Organization.id == org_id)
+            )
+        ).one_or_none()
+        if row is None:
+            raise TenantMoveError(f"Unknown organization {org_id!r}")
+        source = row.shard or MAIN_SHARD
+        if source == target:
+            raise TenantMoveError(f"{org_id} is already on {target!r}")
+        if row.moving_to_shard is not None:
+            raise TenantMoveError(f"{org_id} is already moving to {row.moving_to_shard!r}")
+        await directory.rollback()  # no transaction left open during the copy
+
+        async with shard_map.session(source) as src, shard_map.session(target) as dst:
+            await _copy_tenant(src, dst, tables, org_id)
+
+        frozen = await directory.execute(
+            update(Organization)
+            .where(Organization.id == org_id, Organization.moving_to_shard.is_(None))
+            .values(moving_to_shard=target)
+        )
+        await directory.commit()
+        if frozen.rowcount != 1:  # type: ignore[attr-defined]
+            raise TenantMoveError(f"{org_id} started moving concurrently")
+        shard_map.forget(org_id)
+        logger.info("tenant_move_frozen", organization_id=org_id, source=source, target=target)
+
+        moved = False
+        try:
+            await asyncio.sleep(settle)
+            freeze_started = time.perf_counter()
+            async with shard_map.session(source) as src, shard_map.session(target) as dst:
+                copied = await _copy_tenant(src, dst, tables, org_id)
+            await directory.execute(
+                update(Organization).where(Organization.id == org_id).values(shard=target, moving_to_shard=None)
+            )
+            await directory.commit()
+            moved = True
+            frozen_ms = round((time.perf_counter() - freeze_started) * 1000, 1)
+        finally:
+            if not moved:
+                await directory.rollback()
+                await directory.execute(
+                    update(Organization).where(Organization.id == org_id).values(moving_to_shard=None)
+                )
+                await directory.commit()
+                logger.warn("tenant_move_aborted", organization_id=org_id, source=source, target=target)
+            shard_map.forget(org_id)
+
+    await asyncio.sleep(settle)
+    async with shard_map.session(source) as src:
+        for table in reversed(tables):
+            await src.execute(delete(table).where(table.c.organization_id == org_id))
+        await src.commit()
+
+    logger.info(
+        "tenant_moved",
+        organization_id=org_id,
+        source=source,
+        target=target,
+        rows=copied,
+        writes_frozen_ms=frozen_ms,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return copied
+
+
+async def _main(org_id: str, target: str) -> int:
+    from omniai.db.session import shard_map
+
+    try:
+        copied = await move_tenant(shard_map, org_id, target)
+    except TenantMoveError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        await shard_map.dispose()
+    print(f"{org_id} moved to {target}: {copied}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move an organization's tenant data to another shard")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    move = subcommands.add_parser("move")
+    move.add_argument("org_id")
+    move.add_argument("shard")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.org_id, args.shard)))
@@ -56,25 +56,42 @@ IMPORTANT: This file should remain CLEAN.
 
 
 # src/omniai/main.py
-import asyncio
 import os
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-import uvicorn
-from fastapi import FastAPI
-from sqlalchemy.exc import OperationalError
-
-from omniai.api.v1 import auth, me, health, agriculture
-from omniai.api.v1.agriculture import router as agriculture_router
-from omniai.api.v1.health import router as health_router
-from omniai.core.config import settings
-from omniai.core.logging import logger
-from omniai.core.logging_middleware import LoggingMiddleware
-from omniai.core.middleware import TenantValidationMiddleware
-from omniai.db.session import engine
-from omniai.models.organization import Base as OrgBase
-from omniai.models.user import Base as UserBase
+# First: starts the cold-start clock (phases are reported once the lifespan is done)
+from omniai.core.startup import startup_timer
+
+with startup_timer.phase("settings"):
+    from omniai.core.config import settings
+with startup_timer.phase("logging"):
+    from omniai.core.logging import logger, shutdown_logging
+with startup_timer.phase("engine"):
+    from omniai.db.session import AsyncSessionLocal, engine, replica_set, shard_map
+with startup_timer.phase("imports"):
+    import uvicorn
+    from fastapi import FastAPI
+
+    from omniai.api.v1 import agriculture, audit, auth, health, me, metrics, orgs, users
+    from omniai.api.v1.agriculture import router as agriculture_router
+    from omniai.api.v1.health import router as health_router
+    from omniai.core.audit import audit_log
+    from omniai.core.hashing import (
+        PasswordHashQueueFull,
+        calibrate_password_hash_policy,
+        password_hash_busy_handler,
+        password_hash_pool,
+    )
+    from omniai.core.logging_middleware import LoggingMiddleware
+    from omniai.core.middleware import (
+        ReadYourWritesMiddleware,
+        TenantValidationMiddleware,
+    )
+    from omniai.core.prewarm import prewarm_pool, prewarm_routes
+    from omniai.db.migrate import check_schema_version
+    from omniai.db.sharding import TenantMoving, tenant_moving_handler
+    from omniai.services.sessions import session_purger
 
 # 🔒 Security & config audit at startup
 logger.info(
@@ -95,42 +112,71 @@ if len(settings.JWT_SECRET_KEY) < 32:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    # Wait for DB to be ready
-    for i in range(10):
-        try:
-            async with engine.begin() as conn:
-                await conn.run_sync(UserBase.metadata.create_all)
-                await conn.run_sync(OrgBase.metadata.create_all)
-            logger.info("database_initialized", tables_created=["users", "organizations", "user_organization"])
-            break
-        except OperationalError as e:
-            logger.warning("database_connection_retry", attempt=i+1, max_attempts=10, error=str(e))
-            await asyncio.sleep(2)
-    else:
-        logger.error("database_connection_failed", message="Failed to connect to database after 10 attempts")
-        raise RuntimeError("Failed to connect to database after 10 attempts")
-
+    # Schema changes are applied once per deploy by `python -m omniai.db.migrate`
+    # (scripts/start.sh), never by workers: only check this build's are in
+    with startup_timer.phase("schema_check"):
+        schema_version = await check_schema_version(engine)
+    logger.info("database_schema_ok", schema_version=schema_version)
+
+    with startup_timer.phase("password_hash_calibration"):
+        await calibrate_password_hash_policy()
+    with startup_timer.phase("replicas"):
+        await replica_set.start()
+    with startup_timer.phase("audit_log"):
+        await audit_log.start(engine)
+    session_purger.start(AsyncSessionLocal)
+
+    if settings.STARTUP_PREWARM_CONNECTIONS:
+        with startup_timer.phase("prewarm_pool"):
+            opened = await prewarm_pool(engine, settings.STARTUP_PREWARM_CONNECTIONS)
+        logger.info("prewarm_pool_done", connections=opened)
+    if settings.STARTUP_PREWARM_ROUTES:
+        with startup_timer.phase("prewarm_routes"):
+            statuses = await prewarm_routes(app)
+        logger.info("prewarm_routes_done", statuses=statuses)
+
+    logger.info("startup_report", **startup_timer.ready())
     yield
+    password_hash_pool.shutdown()
+    await audit_log.stop()
+    await session_purger.stop()
+    await replica_set.stop()
+    await shard_map.dispose()
     await engine.dispose()
     logger.info("application_shutdown", message="Database engine disposed")
+    shutdown_logging()
 
 
-app = FastAPI(
-    title="OMNIAI Core Platform",
-    description="The sovereign foundation for trillion-dollar AI applications.",
-    version="0.1.0",
-    lifespan=lifespan,
-)
-
-# Middleware (order matters!)
-app.add_middleware(LoggingMiddleware)
-app.add_middleware(TenantValidationMiddleware)
+with startup_timer.phase("routers"):
+    app = FastAPI(
+        title="OMNIAI Core Platform",
+        description="The sovereign foundation for trillion-dollar AI applications.",
+        version="0.1.0",
+        lifespan=lifespan,
+    )
 
-# Routers
-app.include_router(health.router, prefix="/v1")
-app.include_router(agriculture.router, prefix="/v1")
-app.include_router(auth.router, prefix="/v1/auth")
-app.include_router(me.router, prefix="/v1")
+    # Exception handlers
+    app.add_exception_handler(PasswordHashQueueFull, password_hash_busy_handler)
+    app.add_exception_handler(TenantMoving, tenant_moving_handler)
+
+    # Middleware (order matters! the last one added runs first)
+    app.add_middleware(TenantValidationMiddleware)
+    # Wraps the tenant checks: their reads must see the client's recent writes
+    app.add_middleware(ReadYourWritesMiddleware)
+    # Outermost: trace_id and the query counter cover the whole request,
+    # tenant checks and their audit events included
+    app.add_middleware(LoggingMiddleware)
+
+    # Routers
+    app.include_router(health.router, prefix="/v1")
+    app.include_router(agriculture.router, prefix="/v1")
+    # Login and signup go through admission control (api/v1/auth.py)
+    app.include_router(auth.router, prefix="/v1/auth")
+    app.include_router(me.router, prefix="/v1")
+    app.include_router(users.router, prefix="/v1")
+    app.include_router(orgs.router, prefix="/v1")
+    app.include_router(audit.router, prefix="/v1")
+    app.include_router(metrics.router)
 
 logger.info("application_startup_complete", message="OMNIAI Core is ready to accept requests")
 
@@ -0,0 +1,29 @@
+# src/omniai/models/audit.py
+from sqlalchemy import BigInteger, Column, DateTime, Index, Sequence, String, Table
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+# Filled in by the database, COPY included
+audit_event_id_seq = Sequence("audit_events_id_seq", metadata=Base.metadata)
+
+# Append-only, range-partitioned by month (core/audit.py creates partitions as
+# needed); no foreign keys, so the trail outlives the users and orgs it names
+audit_events = Table(
+    "audit_events",
+    Base.metadata,
+    Column("occurred_at", DateTime(timezone=True), nullable=False),
+    # Tie-breaker for paging: occurred_at isn't unique
+    Column("id", BigInteger, audit_event_id_seq, server_default=audit_event_id_seq.next_value(), nullable=False),
+    Column("action", String, nullable=False),
+    Column("outcome", String, nullable=False),
+    Column("user_id", String),
+    Column("tenant_id", String),
+    Column("trace_id", String),
+    Column("client_ip", String),
+    Column("detail", JSONB),
+    # Per-tenant time ranges, paged by (occurred_at, id) (GET /v1/audit/events);
+    # built on every partition
+    Index("ix_audit_events_tenant_time_id", "tenant_id", "occurred_at", "id"),
+    postgresql_partition_by="RANGE (occurred_at)",
+)
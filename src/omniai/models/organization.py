@@ -48,7 +48,7 @@ class Organization(Base):
         primary_key=True,
         default=lambda: "org_" + uuid.uuid4().hex
     )
-    name: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
     slug: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -56,10 +56,14 @@ class Organization(Base):
         DateTime(timezone=True),
         server_default=func.now()
     )
+    # Shard holding this org's tenant data (db/sharding.py); NULL → "main".
+    # moving_to_shard is set while a move is cutting over: writes are refused.
+    shard: Mapped[str | None] = mapped_column(String, nullable=True)
+    moving_to_shard: Mapped[str | None] = mapped_column(String, nullable=True)
 
     users: Mapped[list["User"]] = relationship(
         "User",
         secondary="user_organization",
         back_populates="organizations",
-        lazy="selectin"
+        lazy="raise"  # opt in with selectinload() where needed
     )
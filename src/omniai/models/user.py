@@ -43,7 +43,17 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Table, func
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -65,7 +75,10 @@ user_organization = Table(
         "user_id",
         unique=True,
         postgresql_where=Column("is_default")
-    )
+    ),
+    # Keyset pages of a user's orgs filtered by role (GET /v1/orgs?role=);
+    # unfiltered pages use the primary key (user_id, organization_id)
+    Index("idx_user_org_role", "user_id", "role", "organization_id"),
 )
 
 class User(Base):
@@ -82,10 +95,15 @@ class User(Base):
         DateTime(timezone=True),
         server_default=func.now()
     )
+    # Bumped on every membership change; access tokens carrying an older
+    # membership claim are no longer trusted (see core/jwt.py MembershipClaim)
+    membership_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     organizations: Mapped[list["Organization"]] = relationship(
         "Organization",
         secondary=user_organization,
         back_populates="users",
-        lazy="selectin"
+        lazy="raise"  # opt in with selectinload() where needed
     )
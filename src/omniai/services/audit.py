@@ -0,0 +1,66 @@
+# src/omniai/services/audit.py
+"""
+Reading the audit trail (core/audit.py writes it).
+
+Every query is bounded in time: `occurred_at` between since and until is the
+partition key, so Postgres only opens the months in range (pruned at plan or
+executor startup, prepared statements included), then walks
+ix_audit_events_tenant_time_id within them. Pages continue from the last
+(occurred_at, id) returned: events sharing a timestamp are never skipped.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    Row,
+    String,
+    bindparam,
+    select,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from omniai.models.audit import audit_events
+
+_until = bindparam("until", type_=DateTime(timezone=True))
+
+_TENANT_EVENTS = (
+    select(audit_events)
+    .where(
+        audit_events.c.tenant_id == bindparam("tenant_id", type_=String),
+        audit_events.c.occurred_at >= bindparam("since", type_=DateTime(timezone=True)),
+        # Redundant with the row comparison, but lets the planner prune partitions
+        audit_events.c.occurred_at <= _until,
+        tuple_(audit_events.c.occurred_at, audit_events.c.id) < tuple_(_until, bindparam("before_id", type_=BigInteger)),
+    )
+    .order_by(audit_events.c.occurred_at.desc(), audit_events.c.id.desc())
+    .limit(bindparam("limit", type_=Integer))
+)
+
+
+async def list_tenant_events(
+    db: AsyncSession,
+    tenant_id: str,
+    since: datetime,
+    until: datetime,
+    limit: int,
+    action: Optional[str] = None,
+    before_id: int = 0,
+) -> tuple[list[Row[Any]], bool]:
+    """
+    Newest first, one page of up to `limit` events of [since, until), or,
+    with `before_id`, of the events before (until, before_id). Returns
+    (rows, has_more); the next page is the same query with `until` and
+    `before_id` set to the last row's occurred_at and id.
+    """
+    query = _TENANT_EVENTS
+    if action is not None:
+        query = query.where(audit_events.c.action == action)
+    result = await db.execute(
+        query, {"tenant_id": tenant_id, "since": since, "until": until, "before_id": before_id, "limit": limit + 1}
+    )
+    rows = list(result.fetchall())
+    return rows[:limit], len(rows) > limit
@@ -1,22 +1,47 @@
 # src/omniai/services/auth.py
 import re
-from typing import Optional
+import uuid
+from typing import Iterable, Optional
 
 import bcrypt
-from sqlalchemy import insert, select
+from sqlalchemy import (
+    ARRAY,
+    Insert,
+    String,
+    any_,
+    bindparam,
+    insert,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from omniai.core.config import settings
+from omniai.core.hashing import (
+    PasswordHashQueueFull,
+    bcrypt_cost,
+    password_hash_policy,
+    password_hash_pool,
+)
+from omniai.core.jwt import MEMBERSHIP_CLAIM, create_access_token
 from omniai.core.logging import logger
+from omniai.core.membership_cache import membership_cache
+from omniai.db.routing import note_write
+from omniai.db.sharding import place_organization
 from omniai.models.organization import Organization
 from omniai.models.user import User, user_organization
+from omniai.services.organization import load_membership_claim
 
 
-def get_password_hash(password: str) -> str:
+def get_password_hash(password: str, rounds: Optional[int] = None) -> str:
     # ✅ Truncate to 72 bytes (bcrypt limit)
     password_bytes = password.encode("utf-8")
     truncated = password_bytes[:72]
-    # Hash using bcrypt
-    hashed = bcrypt.hashpw(truncated, bcrypt.gensalt())
+    # Hash using bcrypt at the calibrated cost (passed explicitly so process-pool
+    # workers, which don't share this module's state, use the same cost)
+    hashed = bcrypt.hashpw(truncated, bcrypt.gensalt(rounds=rounds or password_hash_policy.rounds))
     return hashed.decode("utf-8")
 
 
@@ -26,77 +51,220 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_bytes, hashed_bytes)
 
 
+# Async variants: run bcrypt on the hashing pool instead of the event loop.
+# Both raise PasswordHashQueueFull when the pool is saturated.
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_hash, password, password_hash_policy.rounds)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def issue_access_token(db: AsyncSession, user_id: str) -> str:
+    """
+    Access token for a user. With settings.JWT_EMBED_MEMBERSHIPS the token also
+    carries the signed membership claim, letting the middleware skip the DB.
+    """
+    data: dict[str, object] = {"sub": user_id}
+    if settings.JWT_EMBED_MEMBERSHIPS:
+        claim = await load_membership_claim(db, user_id)
+        if claim is not None:
+            data[MEMBERSHIP_CLAIM] = claim.to_payload()
+    return create_access_token(data=data)
+
+
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
 
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     logger.debug("authenticate_user_start", email=email)
 
-    result = await db.execute(select(User).where(User.email == email))
+    result = await db.execute(_USER_BY_EMAIL, {"email": email})
     user = result.scalar_one_or_none()
 
     if not user:
         logger.debug("authenticate_user_user_not_found", email=email)
         return None  # ✅ Correct: None means "not authenticated"
 
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         logger.debug("authenticate_user_password_invalid", email=email)
         return None  # ✅ Still None
 
+    if password_hash_policy.needs_rehash(user.hashed_password):
+        await _rehash_password(db, user, password)
+
     logger.debug("authenticate_user_success", user_id=str(user.id), email=email)
     return user  # ✅ Only ever returns User or None
 
 
+async def _rehash_password(db: AsyncSession, user: User, password: str) -> None:
+    """Upgrade (or downgrade) a stored hash to the target cost; never fails the login."""
+    user_id, old_hash = str(user.id), user.hashed_password
+    old_rounds = bcrypt_cost(old_hash)
+    try:
+        user.hashed_password = await get_password_hash_async(password)
+        await db.commit()
+    except PasswordHashQueueFull:
+        logger.info("password_rehash_skipped", user_id=user_id, reason="password_hash_queue_full")
+        return
+    except SQLAlchemyError as e:
+        # Detached first: the rollback would expire the user the caller still reads.
+        # The old hash stays valid; the next login tries again.
+        db.expunge(user)
+        user.hashed_password = old_hash
+        await db.rollback()
+        logger.warn("password_rehash_failed", user_id=user_id, error=str(e))
+        return
+    logger.info(
+        "password_rehashed",
+        user_id=user_id,
+        old_rounds=old_rounds,
+        new_rounds=password_hash_policy.rounds,
+    )
+
+
+class EmailAlreadyRegistered(Exception):
+    """Raised by create_user_with_org when the email is taken."""
+
+
+# Numbered suffixes tried when a personal-org slug is taken (base-1 … base-99);
+# past that a random suffix is used
+SLUG_NUMBERED_SUFFIXES = 99
+_SIGNUP_ATTEMPTS = 3
+
+
+def slugify(name: str, max_length: int = 26) -> str:
+    normalized = re.sub(r"[^a-z0-9\s-]", "", name.lower())
+    return re.sub(r"[-\s]+", "-", normalized).strip("-")[:max_length]
+
+
+def _slug_candidates(base_slug: str) -> list[str]:
+    return [base_slug] + [f"{base_slug}-{n}" for n in range(1, SLUG_NUMBERED_SUFFIXES + 1)]
+
+
+async def _taken_slugs(db: AsyncSession, slugs: Iterable[str]) -> set[str]:
+    # One array parameter, however many candidates (IN would bind one each)
+    result = await db.execute(
+        select(Organization.slug).where(
+            Organization.slug == any_(bindparam("slugs", list(slugs), type_=ARRAY(String)))
+        )
+    )
+    return set(result.scalars())
+
+
+async def find_available_slugs(db: AsyncSession, base_slugs: list[str]) -> list[str]:
+    """
+    A free slug per base, also unique within the list: base, else the first free
+    base-1 … base-99, else base-<random>. At most two indexed queries for the
+    whole list (the numbered candidates are only looked up for bases that clash).
+    """
+    taken = await _taken_slugs(db, set(base_slugs))
+    clashing = {base for base in base_slugs if base in taken or base_slugs.count(base) > 1}
+    if clashing:
+        taken |= await _taken_slugs(db, [slug for base in clashing for slug in _slug_candidates(base)[1:]])
+
+    slugs: list[str] = []
+    for base in base_slugs:
+        slug = next((c for c in _slug_candidates(base) if c not in taken), f"{base}-{uuid.uuid4().hex[:8]}")
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+async def find_available_slug(db: AsyncSession, base_slug: str) -> str:
+    return (await find_available_slugs(db, [base_slug]))[0]
+
+
+def _insert_user_with_org(
+    user_id: str, email: str, hashed_password: str, org_id: str, org_name: str, slug: str
+) -> Insert:
+    """Org, user and owner+default membership as ONE statement (data-modifying CTEs)."""
+    new_org = (
+        insert(Organization)
+        .values(id=org_id, name=org_name, slug=slug, is_active=True, shard=place_organization(org_id))
+        .returning(Organization.id)
+        .cte("new_org")
+    )
+    new_user = (
+        insert(User)
+        .values(id=user_id, email=email, hashed_password=hashed_password, membership_version=0)
+        .returning(User.id, User.created_at)
+        .cte("new_user")
+    )
+    return (
+        insert(user_organization)
+        .from_select(
+            ["user_id", "organization_id", "is_default", "role"],
+            # One row each: joined ON true, the single (user, org) pair
+            select(new_user.c.id, new_org.c.id, literal(True), literal("owner")).select_from(
+                new_user.join(new_org, true())
+            ),
+        )
+        .returning(select(new_user.c.created_at).scalar_subquery())
+    )
+
+
+def _violated_constraint(exc: IntegrityError) -> str:
+    return str(getattr(exc.orig, "__cause__", None) or exc.orig)
+
+
 async def create_user_with_org(db: AsyncSession, email: str, password: str) -> User:
     """
     Creates a new user with a Personal organization.
     The user is the OWNER of this org, and it is set as their DEFAULT.
+
+    The password is hashed before the session touches the DB, so no pooled
+    connection is held during bcrypt. The common case is then a single INSERT
+    statement; a slug collision costs one lookup and a retry, and losing a race
+    for that slug falls back to a random suffix.
+    Raises EmailAlreadyRegistered if the email is taken. The returned User is
+    not attached to the session.
     """
     # Later: org_name = f"Personal – {email} ({country_code})"
     # In future, infer from email domain or IP — for now, just label
-    # === 1. Create Personal Organization ===
     logger.info("create_user_with_org_start", email=email)
-    personal_org_name = f"Personal – {email}"
+    hashed_pw = await get_password_hash_async(password)
 
-    # Generate slug
-    normalized = re.sub(r"[^a-z0-9\s-]", "", personal_org_name.lower())
-    base_slug = re.sub(r"[-\s]+", "-", normalized).strip("-")[:26]
+    personal_org_name = f"Personal – {email}"
+    base_slug = slugify(personal_org_name)
+    user_id, org_id = "usr_" + uuid.uuid4().hex, "org_" + uuid.uuid4().hex
 
+    # Optimistically take the base slug; unique-index conflicts decide the rest
     slug = base_slug
-    counter = 1
-    while True:
-        result = await db.execute(select(Organization).where(Organization.slug == slug))
-        if result.scalar_one_or_none() is None:
+    for attempt in range(1, _SIGNUP_ATTEMPTS + 1):
+        try:
+            result = await db.execute(
+                _insert_user_with_org(user_id, email, hashed_pw, org_id, personal_org_name, slug)
+            )
+            created_at = result.scalar_one()
+            await db.commit()
             break
-        slug = f"{base_slug}-{counter}"
-        counter += 1
-        if counter > 100:
-            logger.error("create_user_with_org_slug_failure", email=email, base_slug=base_slug)
-            raise ValueError("Could not generate a unique slug for Personal org")
-
-    # Save org
-    org = Organization(name=personal_org_name, slug=slug)
-    db.add(org)
-    await db.flush()  # Get org.id
-    logger.debug("create_user_with_org_org_created", org_id=str(org.id), slug=slug, email=email)
-
-    # === 2. Create User ===
-    hashed_pw = get_password_hash(password)
-    user = User(email=email, hashed_password=hashed_pw)
-    db.add(user)
-    await db.flush()  # Get user.id
-    logger.debug("create_user_with_org_user_created", user_id=str(user.id), email=email)
-
-    # === 3. Link user to org as OWNER + DEFAULT ===
-    await db.execute(
-        insert(user_organization),
-        [{
-            "user_id": user.id,
-            "organization_id": org.id,
-            "is_default": True,
-            "role": "owner"
-        }]
-    )
+        except IntegrityError as e:
+            await db.rollback()
+            constraint = _violated_constraint(e)
+            if "ix_users_email" in constraint:
+                raise EmailAlreadyRegistered(email) from None
+            if "ix_organizations_slug" not in constraint or attempt == _SIGNUP_ATTEMPTS:
+                raise
+            logger.debug("create_user_with_org_slug_taken", email=email, slug=slug, attempt=attempt)
+            if attempt == 1:
+                slug = await find_available_slug(db, base_slug)
+            else:
+                # Concurrent signups with the same base all picked the same
+                # numbered slug; a random suffix breaks the tie
+                slug = f"{base_slug}-{uuid.uuid4().hex[:8]}"
 
-    await db.commit()
-    await db.refresh(user)
-    logger.info("create_user_with_org_success", user_id=str(user.id), org_id=str(org.id), email=email)
-    return user
+    # New memberships: forget any cached "no default org" / "not a member" answers
+    membership_cache.invalidate_user(user_id)
+    membership_cache.invalidate_org(org_id)
+    # The new user's first requests must not hit a replica that hasn't seen them yet
+    note_write(user_id)
+    logger.info("create_user_with_org_success", user_id=user_id, org_id=org_id, slug=slug, email=email)
+    return User(
+        id=user_id,
+        email=email,
+        hashed_password=hashed_pw,
+        created_at=created_at,
+        membership_version=0,
+    )
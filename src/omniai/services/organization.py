@@ -8,21 +8,370 @@
     Add logging here later
 """
 
-from sqlalchemy import select
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    Integer,
+    Row,
+    String,
+    and_,
+    bindparam,
+    case,
+    column,
+    exists,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from omniai.models.user import user_organization
+from omniai.core.config import settings
+from omniai.core.jwt import MembershipClaim
+from omniai.core.logging import logger
+from omniai.core.membership_cache import membership_cache
+from omniai.db.routing import note_write
+from omniai.models.organization import Organization
+from omniai.models.user import User, user_organization
 
 
-async def get_user_org_role(db: AsyncSession, user_id: str, org_id: str) -> str | None:
-    result = await db.execute(
-        select(user_organization.c.role)
-        .where(user_organization.c.user_id == user_id)
-        .where(user_organization.c.organization_id == org_id)
+@dataclass(frozen=True)
+class TenantResolution:
+    """Everything tenant validation needs to know, from one round trip."""
+    tenant_id: Optional[str]        # requested tenant, or the default org if none was given
+    default_org_id: Optional[str]
+    org_exists: bool
+    role: Optional[str]             # None → not a member of tenant_id
+    membership_version: Optional[int] = None   # None → unknown user
+
+    @property
+    def is_default(self) -> bool:
+        return self.tenant_id is not None and self.tenant_id == self.default_org_id
+
+
+_default_membership = user_organization.alias("default_membership")
+_default_org = (
+    select(_default_membership.c.organization_id)
+    .where(
+        _default_membership.c.user_id == bindparam("user_id"),
+        _default_membership.c.is_default
+    )
+    .scalar_subquery()
+)
+_target_org = func.coalesce(bindparam("tenant_id", type_=String), _default_org)
+
+# Scalar subqueries only, so the statement always returns exactly one row:
+# default org (partial unique index), org existence (PK), role (PK) and the
+# user's membership_version (PK).
+_RESOLVE_TENANT = select(
+    _default_org.label("default_org_id"),
+    exists().where(Organization.id == _target_org).label("org_exists"),
+    select(user_organization.c.role)
+    .where(
+        user_organization.c.user_id == bindparam("user_id"),
+        user_organization.c.organization_id == _target_org
+    )
+    .scalar_subquery()
+    .label("role"),
+    select(User.membership_version)
+    .where(User.id == bindparam("user_id"))
+    .scalar_subquery()
+    .label("membership_version"),
+)
+
+
+async def resolve_tenant(db: AsyncSession, user_id: str, tenant_id: Optional[str]) -> TenantResolution:
+    """
+    Resolve org existence, membership role and the user's default org in ONE query.
+    With tenant_id=None the user's default org is the tenant being checked.
+    """
+    result = await db.execute(_RESOLVE_TENANT, {"user_id": user_id, "tenant_id": tenant_id})
+    row = result.one()
+    return TenantResolution(
+        tenant_id=tenant_id or row.default_org_id,
+        default_org_id=row.default_org_id,
+        org_exists=bool(row.org_exists),
+        role=row.role,
+        membership_version=row.membership_version,
     )
+
+
+_USER_ORG_ROLE = select(user_organization.c.role).where(
+    user_organization.c.user_id == bindparam("user_id"),
+    user_organization.c.organization_id == bindparam("org_id"),
+)
+
+
+async def get_user_org_role(db: AsyncSession, user_id: str, org_id: str) -> str | None:
+    result = await db.execute(_USER_ORG_ROLE, {"user_id": user_id, "org_id": org_id})
     row = result.fetchone()
     return row[0] if row else None
 
 async def is_org_owner(db: AsyncSession, user_id: str, org_id: str) -> bool:
     role = await get_user_org_role(db, user_id, org_id)
     return role == "owner"
+
+
+_MEMBERSHIP_CLAIM_ROWS = (
+    select(
+        User.membership_version,
+        user_organization.c.organization_id,
+        user_organization.c.role,
+        user_organization.c.is_default
+    )
+    .select_from(User)
+    .outerjoin(user_organization, user_organization.c.user_id == User.id)
+    .where(User.id == bindparam("user_id"))
+    .limit(bindparam("limit", type_=Integer))
+)
+
+
+async def load_membership_claim(db: AsyncSession, user_id: str) -> Optional[MembershipClaim]:
+    """
+    Build the access-token membership claim for a user in one query.
+    Returns None for unknown users, or when the user has more orgs than
+    settings.JWT_MEMBERSHIP_CLAIM_MAX_ORGS (the token would get too large).
+    """
+    max_orgs = settings.JWT_MEMBERSHIP_CLAIM_MAX_ORGS
+    result = await db.execute(_MEMBERSHIP_CLAIM_ROWS, {"user_id": user_id, "limit": max_orgs + 1})
+    rows = result.fetchall()
+    if not rows:
+        return None
+
+    memberships = [row for row in rows if row.organization_id is not None]
+    if len(memberships) > max_orgs:
+        logger.info("membership_claim_too_large", user_id=user_id, max_orgs=max_orgs)
+        return None
+
+    return MembershipClaim(
+        version=rows[0].membership_version,
+        default_org_id=next((row.organization_id for row in memberships if row.is_default), None),
+        roles={row.organization_id: row.role for row in memberships},
+    )
+
+
+async def bump_membership_version(db: AsyncSession, user_ids: list[str]) -> dict[str, int]:
+    """
+    Increment membership_version for users whose memberships changed, so access
+    tokens carrying an older membership claim stop being trusted.
+    Does not commit; call forget_memberships() with the result after commit.
+    """
+    if not user_ids:
+        return {}
+    result = await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(membership_version=User.membership_version + 1)
+        .returning(User.id, User.membership_version)
+    )
+    return {row.id: row.membership_version for row in result}
+
+
+def forget_memberships(versions: dict[str, int]) -> None:
+    """Post-commit hook: drop cached answers for these users and record their new versions."""
+    membership_cache.invalidate_users(versions)
+    for user_id, version in versions.items():
+        membership_cache.set_version(user_id, version)
+        note_write(user_id)  # their tenant checks read the primary for a while
+
+
+async def list_user_organizations(
+    db: AsyncSession,
+    user_id: str,
+    limit: int,
+    after_org_id: Optional[str] = None,
+    role: Optional[str] = None,
+) -> tuple[list[Row[Any]], bool]:
+    """
+    One keyset page of a user's organizations, ordered by organization id.
+    Returns (rows, has_more). Each page is an index range scan starting at
+    after_org_id, so its cost doesn't depend on how deep the client pages.
+    """
+    # Pick the page from the membership index first, then fetch just those
+    # orgs by primary key; joining before the LIMIT lets the planner scan
+    # organizations from the start instead
+    page = (
+        select(
+            user_organization.c.organization_id,
+            user_organization.c.role,
+            user_organization.c.is_default,
+        )
+        .where(user_organization.c.user_id == user_id)
+        .order_by(user_organization.c.organization_id)
+        .limit(limit + 1)  # one extra row tells us whether there is a next page
+    )
+    if role is not None:
+        page = page.where(user_organization.c.role == role)
+    if after_org_id is not None:
+        page = page.where(user_organization.c.organization_id > after_org_id)
+    page_cte = page.cte("page")
+
+    query = (
+        select(
+            Organization.id,
+            Organization.name,
+            Organization.slug,
+            page_cte.c.role,
+            page_cte.c.is_default,
+        )
+        .join(page_cte, page_cte.c.organization_id == Organization.id)
+        .order_by(Organization.id)
+    )
+    rows = list((await db.execute(query)).fetchall())
+    return rows[:limit], len(rows) > limit
+
+
+@dataclass(frozen=True)
+class MembershipChange:
+    user_id: str
+    role: str = "member"
+    is_default: bool = False
+
+
+@dataclass(frozen=True)
+class MembershipConflict:
+    index: int      # position in the request
+    user_id: str
+    reason: str     # "duplicate" | "user_not_found" | "default_org_exists"
+
+
+@dataclass(frozen=True)
+class MembershipUpsertResult:
+    changed_user_ids: list[str] = field(default_factory=list)
+    conflicts: list[MembershipConflict] = field(default_factory=list)
+
+
+# The whole request as three parallel arrays, numbered from 1
+_members_in = (
+    func.unnest(
+        bindparam("user_ids", type_=ARRAY(String)),
+        bindparam("roles", type_=ARRAY(String)),
+        bindparam("defaults", type_=ARRAY(Boolean)),
+    )
+    .table_valued(
+        column("user_id", String),
+        column("role", String),
+        column("is_default", Boolean),
+        with_ordinality="ord",
+    )
+    .render_derived()
+)
+_other_default = user_organization.alias("other_default")
+_org_id = bindparam("organization_id", type_=String)
+
+# Each row is checked set-wise in the same statement: the user must exist, and
+# may only become default here if they have no default org elsewhere
+# (idx_user_default_org allows one per user)
+_classified = (
+    select(
+        _members_in.c.ord,
+        _members_in.c.user_id,
+        _members_in.c.role,
+        _members_in.c.is_default,
+        case(
+            (User.id.is_(None), "user_not_found"),
+            (and_(_members_in.c.is_default, _other_default.c.organization_id.is_not(None)), "default_org_exists"),
+            else_=null(),
+        ).label("conflict"),
+    )
+    .select_from(
+        _members_in
+        .outerjoin(User, User.id == _members_in.c.user_id)
+        .outerjoin(
+            _other_default,
+            and_(
+                _other_default.c.user_id == _members_in.c.user_id,
+                _other_default.c.is_default,
+                _other_default.c.organization_id != _org_id,
+            ),
+        )
+    )
+    .cte("classified")
+)
+
+_insert_members = pg_insert(user_organization).from_select(
+    ["user_id", "organization_id", "role", "is_default"],
+    select(_classified.c.user_id, _org_id, _classified.c.role, _classified.c.is_default)
+    .where(_classified.c.conflict.is_(None)),
+)
+# Rows that didn't change are left alone (and not returned); is_default is
+# only ever switched on, so nobody loses their default org through here
+_upserted = (
+    _insert_members.on_conflict_do_update(
+        index_elements=[user_organization.c.user_id, user_organization.c.organization_id],
+        set_={
+            "role": _insert_members.excluded.role,
+            "is_default": or_(user_organization.c.is_default, _insert_members.excluded.is_default),
+        },
+        where=or_(
+            user_organization.c.role.is_distinct_from(_insert_members.excluded.role),
+            and_(_insert_members.excluded.is_default, ~user_organization.c.is_default),
+        ),
+    )
+    .returning(user_organization.c.user_id)
+    .cte("upserted")
+)
+
+# Conflicts and written rows come back together: (ord, user_id, conflict)
+_UPSERT_MEMBERSHIPS = (
+    select(_classified.c.ord, _classified.c.user_id, _classified.c.conflict)
+    .where(_classified.c.conflict.is_not(None))
+    .union_all(select(literal(None, Integer), _upserted.c.user_id, literal(None, String)))
+)
+
+
+async def upsert_memberships(
+    db: AsyncSession, organization_id: str, members: Sequence[MembershipChange]
+) -> MembershipUpsertResult:
+    """
+    Add users to an organization, or change their role / make it their default,
+    in ONE statement however many rows there are. Rows that can't be applied
+    are skipped and returned as conflicts; the rest are committed, membership
+    versions bumped and the membership cache updated.
+    """
+    conflicts: list[MembershipConflict] = []
+    unique: list[tuple[int, MembershipChange]] = []
+    seen: set[str] = set()
+    for index, member in enumerate(members):
+        if member.user_id in seen:
+            # ON CONFLICT can't touch the same row twice in one statement
+            conflicts.append(MembershipConflict(index, member.user_id, "duplicate"))
+            continue
+        seen.add(member.user_id)
+        unique.append((index, member))
+
+    result = await db.execute(
+        _UPSERT_MEMBERSHIPS,
+        {
+            "organization_id": organization_id,
+            "user_ids": [member.user_id for _, member in unique],
+            "roles": [member.role for _, member in unique],
+            "defaults": [member.is_default for _, member in unique],
+        },
+    )
+    changed: list[str] = []
+    for row in result:
+        if row.conflict is None:
+            changed.append(row.user_id)
+        else:
+            conflicts.append(MembershipConflict(unique[row.ord - 1][0], row.user_id, row.conflict))
+
+    versions = await bump_membership_version(db, changed)
+    await db.commit()
+    forget_memberships(versions)
+
+    conflicts.sort(key=lambda conflict: conflict.index)
+    logger.info(
+        "memberships_upserted",
+        organization_id=organization_id,
+        requested=len(members),
+        changed=len(changed),
+        conflicts=len(conflicts),
+    )
+    return MembershipUpsertResult(changed_user_ids=changed, conflicts=conflicts)
@@ -0,0 +1,240 @@
+# src/omniai/services/provisioning.py
+"""
+Bulk user provisioning: thousands of users (e.g. a cooperative's farmers) in
+one streamed request instead of one /v1/auth/signup call each.
+
+Records are read incrementally (JSONL or CSV with an `email,password` header)
+and handled in batches of settings.USER_IMPORT_BATCH_SIZE:
+1. validate each row with the same rules as signup (UserCreate)
+2. drop emails already registered (one query per batch)
+3. hash the remaining passwords in parallel on the hashing pool, with no DB
+   connection held
+4. insert users, personal orgs and memberships with one multi-row INSERT per
+   table, then commit
+
+Every imported user gets a Personal org (owner, default) like a normal signup,
+and is added to the importing organization as a member. One result per input
+row is yielded, tagged with its line number: rows rejected during validation
+right away, the others once their batch is committed; then a summary.
+"""
+import codecs
+import csv
+import json
+import uuid
+from typing import Any, AsyncIterator, Literal, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from omniai.api.v1.schemas import UserCreate
+from omniai.core.config import settings
+from omniai.core.hashing import password_hash_policy, password_hash_pool
+from omniai.core.logging import logger
+from omniai.db.sharding import place_organization
+from omniai.models.organization import Organization
+from omniai.models.user import User, user_organization
+from omniai.services.auth import find_available_slugs, get_password_hash, slugify
+
+ImportFormat = Literal["jsonl", "csv"]
+# (line number, parsed record or a parse error message)
+Record = tuple[int, Union[dict[str, Any], str]]
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending.rstrip("\r")
+
+
+async def read_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[Record]:
+    """Parse a JSONL or CSV body as it arrives. CSV values may not contain newlines."""
+    header: Optional[list[str]] = None
+    async for line_no, line in _lines(chunks):
+        if not line.strip():
+            continue
+        if fmt == "jsonl":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"Invalid JSON: {e}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip().lower() for name in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, dict(zip(header, values, strict=True))
+
+
+def _result(line: int, email: Optional[str], status: str, **extra: Any) -> dict[str, Any]:
+    return {"line": line, "email": email, "status": status, **extra}
+
+
+async def import_users(
+    db: AsyncSession,
+    records: AsyncIterator[Record],
+    organization_id: str,
+    imported_by: str,
+) -> AsyncIterator[dict[str, Any]]:
+    """Create users from `records`; yields one result per row, then {"summary": ...}."""
+    counts = {"created": 0, "exists": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+    seen: set[str] = set()
+    batch: list[tuple[int, UserCreate]] = []
+    rows = 0
+
+    async def flush() -> AsyncIterator[dict[str, Any]]:
+        try:
+            results = await _import_batch(db, batch, organization_id)
+        except Exception as e:
+            await db.rollback()
+            logger.exception("user_import_batch_failed", organization_id=organization_id, error=str(e))
+            results = [_result(line, user.email, "failed") for line, user in batch]
+        batch.clear()
+        for result in results:
+            counts[result["status"]] += 1
+            yield result
+
+    async for line, record in records:
+        rows += 1
+        if rows > settings.USER_IMPORT_MAX_ROWS:
+            yield {"line": line, "status": "aborted", "error": f"More than {settings.USER_IMPORT_MAX_ROWS} rows"}
+            break
+
+        if isinstance(record, str):
+            counts["invalid"] += 1
+            yield _result(line, None, "invalid", errors=[{"field": None, "message": record}])
+            continue
+        try:
+            user = UserCreate.model_validate(record)
+        except ValidationError as e:
+            counts["invalid"] += 1
+            errors = [
+                {"field": ".".join(str(part) for part in err["loc"]) or None, "message": err["msg"]}
+                for err in e.errors(include_url=False, include_input=False)
+            ]
+            yield _result(line, record.get("email"), "invalid", errors=errors)
+            continue
+
+        # Same rule as the users.email unique index: exact match
+        if user.email in seen:
+            counts["duplicate"] += 1
+            yield _result(line, user.email, "duplicate")
+            continue
+        seen.add(user.email)
+
+        batch.append((line, user))
+        if len(batch) >= settings.USER_IMPORT_BATCH_SIZE:
+            async for result in flush():
+                yield result
+
+    if batch:
+        async for result in flush():
+            yield result
+
+    logger.info("user_import_complete", organization_id=organization_id, imported_by=imported_by, **counts)
+    yield {"summary": counts}
+
+
+async def _import_batch(
+    db: AsyncSession, batch: list[tuple[int, UserCreate]], organization_id: str
+) -> list[dict[str, Any]]:
+    emails = [user.email for _, user in batch]
+    existing = set((await db.execute(select(User.email).where(User.email.in_(emails)))).scalars())
+    # End the read transaction: no pooled connection is held while hashing
+    await db.rollback()
+
+    new = [(line, user) for line, user in batch if user.email not in existing]
+    results = {line: _result(line, user.email, "exists") for line, user in batch if user.email in existing}
+    if new:
+        hashes = await password_hash_pool.run_many(
+            get_password_hash, [(user.password, password_hash_policy.rounds) for _, user in new]
+        )
+        created = await _insert_users(db, [user.email for _, user in new], hashes, organization_id)
+        for line, user in new:
+            user_id = created.get(user.email)
+            # Not inserted: the email was registered concurrently
+            results[line] = (
+                _result(line, user.email, "created", user_id=user_id)
+                if user_id
+                else _result(line, user.email, "exists")
+            )
+    return [results[line] for line, _ in batch]
+
+
+async def _insert_users(
+    db: AsyncSession, emails: list[str], hashes: list[str], organization_id: str
+) -> dict[str, str]:
+    """Insert users, their personal orgs and memberships; returns email → user_id for rows created."""
+    user_rows = [
+        {"id": "usr_" + uuid.uuid4().hex, "email": email, "hashed_password": hashed, "membership_version": 0}
+        for email, hashed in zip(emails, hashes, strict=True)
+    ]
+    result = await db.execute(
+        pg_insert(User)
+        .values(user_rows)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+    created = {row.email: row.id for row in result}
+    if not created:
+        await db.rollback()
+        return created
+
+    user_ids = list(created.values())
+    org_names = [f"Personal – {email}" for email in created]
+    org_ids = ["org_" + uuid.uuid4().hex for _ in user_ids]
+    slugs = await find_available_slugs(db, [slugify(name) for name in org_names])
+    pending = list(range(len(user_ids)))
+    # Slugs can still be taken by concurrent signups: retry those with a random suffix
+    for attempt in range(3):
+        result = await db.execute(
+            pg_insert(Organization)
+            .values([
+                {
+                    "id": org_ids[i],
+                    "name": org_names[i],
+                    "slug": slugs[i],
+                    "is_active": True,
+                    "shard": place_organization(org_ids[i]),
+                }
+                for i in pending
+            ])
+            .on_conflict_do_nothing(index_elements=[Organization.slug])
+            .returning(Organization.id)
+        )
+        inserted = set(result.scalars())
+        pending = [i for i in pending if org_ids[i] not in inserted]
+        if not pending:
+            break
+        logger.debug("user_import_slug_retry", attempt=attempt + 1, clashes=len(pending))
+        for i in pending:
+            slugs[i] = f"{slugify(org_names[i])}-{uuid.uuid4().hex[:8]}"
+    else:
+        raise RuntimeError("Could not allocate unique organization slugs")
+
+    memberships = [
+        {"user_id": user_id, "organization_id": org_id, "is_default": True, "role": "owner"}
+        for user_id, org_id in zip(user_ids, org_ids, strict=True)
+    ] + [
+        {"user_id": user_id, "organization_id": organization_id, "is_default": False, "role": "member"}
+        for user_id in user_ids
+    ]
+    await db.execute(user_organization.insert().values(memberships))
+    await db.commit()
+    # Brand-new user IDs: nothing about them can be in the membership cache yet
+    return created
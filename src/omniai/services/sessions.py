@@ -0,0 +1,194 @@
+# src/omniai/services/sessions.py
+"""
+Refresh-token sessions: renewing an access token is one indexed UPDATE on
+auth_sessions instead of a bcrypt password check.
+
+- Tokens are random (256 bits) and opaque; only their SHA-256 is stored
+- Every refresh rotates the token: the old row is marked used and a new one is
+  inserted in the same family
+- Presenting a used token again means it leaked (or a client replayed it), so
+  the whole family is revoked and the user has to log in again
+- Used rows are kept until they expire (that's what makes reuse detectable);
+  SessionPurger deletes expired rows in the background, every
+  AUTH_SESSION_PURGE_INTERVAL_SECONDS, along ix_auth_sessions_expires_at
+"""
+import asyncio
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Integer, bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from omniai.core.config import settings
+from omniai.core.logging import logger
+from omniai.models.auth_session import AuthSession
+
+# One batch of expired rows; SKIP LOCKED lets every worker's purger run at once
+_PURGE_EXPIRED = delete(AuthSession).where(
+    AuthSession.id.in_(
+        select(AuthSession.id)
+        .where(AuthSession.expires_at <= func.now())
+        .limit(bindparam("batch_size", type_=Integer))
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+)
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Refresh token rejected: {reason}")
+        self.reason = reason
+
+
+def hash_refresh_token(token: str) -> str:
+    # The token is high-entropy random data, so a fast hash is enough (no bcrypt)
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def _insert_refresh_token(db: AsyncSession, user_id: str, family_id: str) -> str:
+    token = secrets.token_urlsafe(32)
+    await db.execute(
+        insert(AuthSession).values(
+            id="ses_" + uuid.uuid4().hex,
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            user_id=user_id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def start_session(db: AsyncSession, user_id: str) -> str:
+    """New refresh-token family for a password login; commits and returns the token."""
+    token = await _insert_refresh_token(db, user_id, family_id="fam_" + uuid.uuid4().hex)
+    await db.commit()
+    return token
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[str, str]:
+    """
+    Exchange a refresh token for its successor; returns (user_id, new_token).
+    Raises RefreshTokenError if the token can't be used.
+    """
+    token_hash = hash_refresh_token(token)
+    # Claiming the row is a single conditional UPDATE, so two concurrent
+    # refreshes with the same token can't both succeed
+    result = await db.execute(
+        update(AuthSession)
+        .where(AuthSession.token_hash == token_hash)
+        .where(AuthSession.used_at.is_(None))
+        .where(AuthSession.revoked_at.is_(None))
+        .where(AuthSession.expires_at > func.now())
+        .values(used_at=func.now())
+        .returning(AuthSession.user_id, AuthSession.family_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        await db.rollback()
+        raise RefreshTokenError(await _rejection_reason(db, token_hash))
+
+    new_token = await _insert_refresh_token(db, row.user_id, row.family_id)
+    await db.commit()
+    return row.user_id, new_token
+
+
+async def _rejection_reason(db: AsyncSession, token_hash: str) -> str:
+    result = await db.execute(
+        select(
+            AuthSession.user_id,
+            AuthSession.family_id,
+            AuthSession.used_at,
+            AuthSession.revoked_at,
+        ).where(AuthSession.token_hash == token_hash)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return "unknown"
+    if row.revoked_at is not None:
+        return "revoked"
+    if row.used_at is not None:
+        await _revoke_family(db, row.family_id)
+        logger.warn("refresh_token_reuse_detected", user_id=row.user_id, family_id=row.family_id)
+        return "reused"
+    return "expired"
+
+
+async def _revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(AuthSession)
+        .where(AuthSession.family_id == family_id)
+        .where(AuthSession.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+    await db.commit()
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> Optional[str]:
+    """Log out: revoke the token's whole family. Returns the user_id, or None if unknown."""
+    result = await db.execute(
+        select(AuthSession.user_id, AuthSession.family_id)
+        .where(AuthSession.token_hash == hash_refresh_token(token))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    await _revoke_family(db, row.family_id)
+    return str(row.user_id)
+
+
+async def purge_expired_sessions(db: AsyncSession, batch_size: int) -> int:
+    """Delete expired refresh-token rows, one committed batch at a time; returns how many."""
+    purged = 0
+    while True:
+        result = await db.execute(_PURGE_EXPIRED, {"batch_size": batch_size})
+        await db.commit()
+        deleted: int = result.rowcount  # type: ignore[attr-defined]
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+
+
+class SessionPurger:
+    """Background task deleting expired auth_sessions rows (per worker)."""
+
+    def __init__(self, interval: float, batch_size: int) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task[None]] = None
+        self.purged = 0
+
+    async def _run(self, sessions: async_sessionmaker[AsyncSession]) -> None:
+        while True:
+            try:
+                async with sessions() as db:
+                    purged = await purge_expired_sessions(db, self.batch_size)
+            except Exception as e:
+                logger.warn("auth_sessions_purge_failed", error=str(e))
+            else:
+                self.purged += purged
+                if purged:
+                    logger.info("auth_sessions_purged", rows=purged)
+            await asyncio.sleep(self.interval)
+
+    def start(self, sessions: async_sessionmaker[AsyncSession]) -> None:
+        """Startup hook; AUTH_SESSION_PURGE_INTERVAL_SECONDS=0 disables the purger."""
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run(sessions))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+session_purger = SessionPurger(
+    interval=settings.AUTH_SESSION_PURGE_INTERVAL_SECONDS,
+    batch_size=settings.AUTH_SESSION_PURGE_BATCH_SIZE,
+)
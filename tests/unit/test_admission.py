@@ -0,0 +1,60 @@
+import pytest
+from fastapi import HTTPException
+
+from omniai.core.admission import AdmissionController, RateLimit
+
+
+def make_controller(max_concurrency=10, ip_burst=100, email_burst=100):
+    return AdmissionController(
+        max_concurrency=max_concurrency,
+        ip_limit=RateLimit(per_minute=1, burst=ip_burst, max_keys=100),
+        email_limit=RateLimit(per_minute=1, burst=email_burst, max_keys=100),
+    )
+
+
+# Per-IP bucket sheds with 429 + Retry-After once the burst is spent 1
+def test_ip_bucket_sheds_after_burst():
+    controller = make_controller(ip_burst=2)
+    controller.admit("10.0.0.1", None)
+    controller.admit("10.0.0.1", None)
+    with pytest.raises(HTTPException) as exc:
+        controller.admit("10.0.0.1", None)
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    controller.admit("10.0.0.2", None)  # other clients are unaffected
+    assert controller.stats()["shed_ip"] == 1
+
+
+# Per-email bucket is case-insensitive and independent of the IP 2
+def test_email_bucket_sheds_across_ips():
+    controller = make_controller(email_burst=1)
+    controller.admit("10.0.0.1", "Farmer@Test.com")
+    with pytest.raises(HTTPException) as exc:
+        controller.admit("10.0.0.2", "farmer@test.com")
+    assert exc.value.status_code == 429
+    assert controller.stats()["shed_email"] == 1
+
+
+# Global concurrency cap sheds with 503 until a slot is released 3
+def test_concurrency_cap():
+    controller = make_controller(max_concurrency=1)
+    controller.admit("10.0.0.1", None)
+    with pytest.raises(HTTPException) as exc:
+        controller.admit("10.0.0.2", None)
+    assert exc.value.status_code == 503
+    controller.release()
+    controller.admit("10.0.0.2", None)
+    assert controller.stats()["shed_concurrency"] == 1
+
+
+# Only the password endpoints go through admission: refresh and logout are never shed 4
+def test_admission_guards_only_password_routes():
+    from omniai.api.v1.auth import router
+    from omniai.core.admission import auth_admission
+
+    guarded = {
+        route.path
+        for route in router.routes
+        if any(dep.call is auth_admission for dep in route.dependant.dependencies)
+    }
+    assert guarded == {"/signup", "/login"}
@@ -136,6 +136,78 @@ def test_jwt_roundtrip():
     assert payload["sub"] == user_id
     assert "exp" in payload
 
+# Membership claim survives signing and is parsed back 10b
+def test_membership_claim_roundtrip():
+    from omniai.core.jwt import (
+        MEMBERSHIP_CLAIM,
+        MembershipClaim,
+        create_access_token,
+        decode_token,
+    )
+    claim = MembershipClaim(version=3, default_org_id="org_a", roles={"org_a": "owner", "org_b": "member"})
+    token = create_access_token({"sub": "usr_123abc", MEMBERSHIP_CLAIM: claim.to_payload()})
+    payload = decode_token(token)
+    assert MembershipClaim.from_payload(payload) == claim
+    assert MembershipClaim.from_payload({"sub": "usr_123abc"}) is None
+    assert MembershipClaim.from_payload({MEMBERSHIP_CLAIM: {"v": "3", "o": {}}}) is None
+
+# Membership claims authorize only while young; older ones fall back to the DB 10b2
+@pytest.mark.asyncio
+async def test_membership_claim_max_age():
+    import time
+
+    import jwt
+    from starlette.responses import PlainTextResponse
+
+    from omniai.core.config import settings
+    from omniai.core.jwt import MEMBERSHIP_CLAIM, MembershipClaim, create_access_token
+    from omniai.core.middleware import TenantValidationMiddleware
+    from omniai.db.session import engine
+
+    # Neither the user nor the org exist: only the claim can authorize this request
+    claim = MembershipClaim(version=1, default_org_id="org_claimonly", roles={"org_claimonly": "owner"})
+    fresh = create_access_token({"sub": "usr_claimonly", MEMBERSHIP_CLAIM: claim.to_payload()})
+    issued = time.time() - settings.JWT_MEMBERSHIP_CLAIM_MAX_AGE_SECONDS - 1
+    old = jwt.encode(
+        {"sub": "usr_claimonly", "iat": int(issued), "exp": int(time.time()) + 600, MEMBERSHIP_CLAIM: claim.to_payload()},
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+    )
+    assert MembershipClaim.from_payload({MEMBERSHIP_CLAIM: claim.to_payload()}).is_fresh(60) is False  # no iat
+
+    app = TenantValidationMiddleware(PlainTextResponse("ok"))
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            headers = {"X-Tenant-ID": "org_claimonly"}
+            resp = await client.get("/v1/me", headers={**headers, "Authorization": f"Bearer {fresh}"})
+            assert resp.status_code == 200
+            resp = await client.get("/v1/me", headers={**headers, "Authorization": f"Bearer {old}"})
+            assert resp.status_code == 404
+            assert resp.json()["error"]["code"] == "ORG_NOT_FOUND"
+    finally:
+        await engine.dispose()
+
+# Verified tokens are served from cache until the signing key rotates 10c
+def test_verified_token_cache_hit_and_key_rotation(monkeypatch):
+    from jwt import PyJWTError
+
+    from omniai.core.config import settings
+    from omniai.core.jwt import create_access_token, decode_token, verified_token_cache
+
+    verified_token_cache.clear()
+    token = create_access_token({"sub": "usr_cached"})
+    decode_token(token)
+    hits = verified_token_cache.stats()["hits"]
+    assert decode_token(token)["sub"] == "usr_cached"
+    assert verified_token_cache.stats()["hits"] == hits + 1
+
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", settings.JWT_SECRET_KEY + "-rotated")
+    try:
+        decode_token(token)
+        raise AssertionError("Token signed with the old key must be re-verified and rejected")
+    except PyJWTError:
+        pass
+
 # tests if token format is checked 9
 def test_decode_invalid_token():
     from jwt import PyJWTError
@@ -161,10 +233,11 @@ async def test_user_with_no_default_org_fails_gracefully():
 
         from sqlalchemy import delete, select
 
-        from omniai.db.session import AsyncSessionLocal
+        from omniai.db.session import AsyncSessionLocal, engine
         from omniai.models.organization import Organization
         from omniai.models.user import User, user_organization
 
+        # Pooled connections belong to this test's event loop: dispose them after
         async with AsyncSessionLocal() as db:
             user_result = await db.execute(select(User.id).where(User.email == email))
             user_id = user_result.scalar()
@@ -183,6 +256,7 @@ async def test_user_with_no_default_org_fails_gracefully():
                     )
                 )
                 await db.commit()
+        await engine.dispose()
 
         resp = await ac.get("/v1/me", headers={"Authorization": f"Bearer {token}"})
         assert resp.status_code == 403
@@ -200,6 +274,95 @@ def test_password_hashing():
     assert verify_password("Wrong", hashed) is False
 
 
+# Hashing pool sheds load instead of queueing without bound 12b
+@pytest.mark.asyncio
+async def test_password_hash_pool_rejects_when_full():
+    import asyncio
+    import time
+
+    from omniai.core.hashing import PasswordHashPool, PasswordHashQueueFull
+
+    pool = PasswordHashPool(workers=1, max_queue=1, executor="thread")
+    try:
+        slow = [asyncio.ensure_future(pool.run(time.sleep, 0.05)) for _ in range(2)]
+        await asyncio.sleep(0)
+        try:
+            await pool.run(time.sleep, 0)
+            raise AssertionError("Third call should have been shed")
+        except PasswordHashQueueFull:
+            pass
+        await asyncio.gather(*slow)
+        stats = pool.stats()
+        assert stats["completed"] == 2
+        assert stats["rejected"] == 1
+        assert stats["wait_ms_max"] > 0
+    finally:
+        pool.shutdown()
+
+
+# Hashes at a different cost than the policy are flagged for rehash 12c
+def test_password_hash_policy_rehash_and_calibration():
+    from omniai.core.hashing import (
+        PasswordHashPolicy,
+        bcrypt_cost,
+        calibrate_bcrypt_rounds,
+    )
+    from omniai.services.auth import get_password_hash, verify_password
+
+    old_hash = get_password_hash("TestPass123!", rounds=4)
+    assert bcrypt_cost(old_hash) == 4
+
+    policy = PasswordHashPolicy(rounds=5)
+    assert policy.needs_rehash(old_hash) is True
+    new_hash = get_password_hash("TestPass123!", rounds=policy.rounds)
+    assert policy.needs_rehash(new_hash) is False
+    assert verify_password("TestPass123!", new_hash) is True
+
+    # A target no machine can meet still yields the minimum cost
+    rounds, elapsed_ms = calibrate_bcrypt_rounds(target_ms=0.001, min_rounds=4, max_rounds=12)
+    assert rounds == 4
+    assert elapsed_ms > 0
+
+
+# A rehash that fails to save still lets the login succeed, with the old hash kept 12d
+@pytest.mark.asyncio
+async def test_rehash_db_failure_does_not_fail_login(monkeypatch):
+    from sqlalchemy import select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from omniai.core.config import settings
+    from omniai.core.hashing import bcrypt_cost, password_hash_policy
+    from omniai.models.organization import Organization  # noqa: F401  (resolves User.organizations)
+    from omniai.models.user import User
+    from omniai.services.auth import authenticate_user
+
+    email, password = "rehash.dbdown@test.com", "SecurePass123!"
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        await ac.post("/v1/auth/signup", json={"email": email, "password": password})
+
+    class CommitFails(AsyncSession):
+        async def commit(self):
+            raise OperationalError("UPDATE users", {}, ConnectionError("connection lost"))
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with AsyncSession(engine) as db:
+            stored = (await db.execute(select(User.hashed_password).where(User.email == email))).scalar_one()
+        monkeypatch.setattr(password_hash_policy, "rounds", 4 if bcrypt_cost(stored) != 4 else 5)
+
+        async with CommitFails(engine) as db:
+            user = await authenticate_user(db, email, password)
+            assert user is not None
+            assert user.email == email and user.hashed_password == stored
+
+        async with AsyncSession(engine) as db:
+            assert (await db.execute(select(User.hashed_password).where(User.email == email))).scalar_one() == stored
+    finally:
+        await engine.dispose()
+
+
 # Password strength test 13
 @pytest.mark.asyncio
 async def test_signup_weak_password():
@@ -209,6 +372,132 @@ async def test_signup_weak_password():
         assert "Password must be at least 8 characters" in r.json()["detail"][0]["msg"]
 
 
+# Refresh tokens rotate, and replaying a used one revokes the session 14
+@pytest.mark.asyncio
+async def test_refresh_token_rotation_and_reuse_detection():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        email = "refresh.test@omniai.dev"
+        password = "SecurePass123!"
+        await ac.post("/v1/auth/signup", json={"email": email, "password": password})
+        r1 = await ac.post("/v1/auth/login", data={"username": email, "password": password})
+        first = r1.json()["refresh_token"]
+
+        r2 = await ac.post("/v1/auth/refresh", json={"refresh_token": first})
+        assert r2.status_code == 200
+        second = r2.json()["refresh_token"]
+        assert second != first
+        r3 = await ac.get("/v1/me", headers={"Authorization": f"Bearer {r2.json()['access_token']}"})
+        assert r3.status_code == 200
+
+        # Replaying the first token kills the family, including the second token
+        assert (await ac.post("/v1/auth/refresh", json={"refresh_token": first})).status_code == 401
+        assert (await ac.post("/v1/auth/refresh", json={"refresh_token": second})).status_code == 401
+
+
+# Logout revokes the refresh token 15
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_token():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        email = "logout.test@omniai.dev"
+        password = "SecurePass123!"
+        await ac.post("/v1/auth/signup", json={"email": email, "password": password})
+        r1 = await ac.post("/v1/auth/login", data={"username": email, "password": password})
+        token = r1.json()["refresh_token"]
+
+        assert (await ac.post("/v1/auth/logout", json={"refresh_token": token})).status_code == 204
+        assert (await ac.post("/v1/auth/refresh", json={"refresh_token": token})).status_code == 401
+        assert (await ac.post("/v1/auth/logout", json={"refresh_token": "unknown"})).status_code == 204
+
+
+# Expired refresh-token rows are purged in batches; live and used-but-unexpired rows stay 15b
+@pytest.mark.asyncio
+async def test_purge_expired_sessions():
+    from sqlalchemy import func, select, update
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from omniai.core.config import settings
+    from omniai.models.auth_session import AuthSession
+    from omniai.services.sessions import purge_expired_sessions
+
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        email = "purge.test@omniai.dev"
+        await ac.post("/v1/auth/signup", json={"email": email, "password": "SecurePass123!"})
+        for _ in range(4):
+            r = await ac.post("/v1/auth/login", data={"username": email, "password": "SecurePass123!"})
+        user_id = (await ac.get("/v1/me", headers={"Authorization": f"Bearer {r.json()['access_token']}"})).json()["id"]
+        await ac.post("/v1/auth/refresh", json={"refresh_token": r.json()["refresh_token"]})
+
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as db:
+            rows = select(AuthSession.id).where(AuthSession.user_id == user_id).order_by(AuthSession.created_at)
+            ids = list((await db.execute(rows)).scalars())
+            assert len(ids) == 5  # four logins, one rotation
+            await db.execute(
+                update(AuthSession).where(AuthSession.id.in_(ids[:3])).values(expires_at=func.now() - func.make_interval(0, 0, 0, 1))
+            )
+            await db.commit()
+
+            assert await purge_expired_sessions(db, batch_size=2) >= 3
+            assert list((await db.execute(rows)).scalars()) == ids[3:]
+    finally:
+        await engine.dispose()
+
+
+# Signups whose personal-org slugs collide still succeed, with distinct slugs 16
+@pytest.mark.asyncio
+async def test_signup_with_colliding_org_slug():
+    from omniai.services.auth import slugify
+
+    emails = ["slugclash.same.prefix.a@omniai.dev", "slugclash.same.prefix.b@omniai.dev"]
+    assert slugify(f"Personal – {emails[0]}") == slugify(f"Personal – {emails[1]}")
+
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        slugs = set()
+        for email in emails:
+            r1 = await ac.post("/v1/auth/signup", json={"email": email, "password": "SecurePass123!"})
+            assert r1.status_code == 201
+            r2 = await ac.post("/v1/auth/login", data={"username": email, "password": "SecurePass123!"})
+            r3 = await ac.get("/v1/me", headers={"Authorization": f"Bearer {r2.json()['access_token']}"})
+            slugs.update(org["slug"] for org in r3.json()["organizations"])
+        assert len(slugs) == 2
+
+
+# /v1/me revalidates with its ETag; a membership change produces a new one 17
+@pytest.mark.asyncio
+async def test_me_etag_and_not_modified():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        tokens = {}
+        for email in ("etag.user@omniai.dev", "etag.owner@omniai.dev"):
+            await ac.post("/v1/auth/signup", json={"email": email, "password": "SecurePass123!"})
+            r = await ac.post("/v1/auth/login", data={"username": email, "password": "SecurePass123!"})
+            tokens[email] = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        user = tokens["etag.user@omniai.dev"]
+
+        r1 = await ac.get("/v1/me", headers=user)
+        etag = r1.headers["etag"]
+        assert r1.status_code == 200 and etag.startswith('"')
+
+        r2 = await ac.get("/v1/me", headers={**user, "If-None-Match": etag})
+        assert r2.status_code == 304
+        assert r2.content == b""
+        assert r2.headers["etag"] == etag
+        assert (await ac.get("/v1/me", headers={**user, "If-None-Match": f'"other", W/{etag}'})).status_code == 304
+
+        # Joining another org changes the representation, so the ETag changes
+        owner_me = (await ac.get("/v1/me", headers=tokens["etag.owner@omniai.dev"])).json()
+        await ac.put(
+            f"/v1/orgs/{owner_me['active_organization_id']}/members/bulk",
+            json={"members": [{"user_id": r1.json()["id"]}]},
+            headers=tokens["etag.owner@omniai.dev"],
+        )
+        r3 = await ac.get("/v1/me", headers={**user, "If-None-Match": etag})
+        assert r3.status_code == 200
+        assert r3.headers["etag"] != etag
+        assert len(r3.json()["organizations"]) == 2
+
+
 
 
 
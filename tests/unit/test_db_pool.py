@@ -0,0 +1,96 @@
+import httpx
+import pytest
+import requests
+from fastapi import FastAPI
+from sqlalchemy import exc, literal, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from omniai.api.v1 import metrics
+from omniai.core.config import settings
+from omniai.db.pool import TelemetryPool, pool_sizing
+from omniai.db.session import asyncpg_connect_args
+
+BASE_URL = "http://app:8000"
+
+
+# Unpinned pools split the connection budget evenly between workers 1
+def test_pool_sizing_auto():
+    sizing = pool_sizing(max_connections=90, workers=3)
+    assert (sizing.pool_size, sizing.max_overflow, sizing.mode) == (10, 20, "auto")
+    sizing = pool_sizing(max_connections=90, workers=3, pool_size=5)
+    assert (sizing.pool_size, sizing.max_overflow) == (5, 25)
+    sizing = pool_sizing(max_connections=4, workers=8)
+    assert (sizing.pool_size, sizing.max_overflow) == (1, 0)
+
+
+# Pinned values are used as-is 2
+def test_pool_sizing_fixed():
+    sizing = pool_sizing(max_connections=30, workers=1, pool_size=10, max_overflow=50)
+    assert (sizing.pool_size, sizing.max_overflow, sizing.mode) == (10, 50, "fixed")
+
+
+# Checkouts record their wait; an exhausted pool counts a timeout, in its own telemetry only 3
+@pytest.mark.asyncio
+async def test_pool_telemetry_counts_waits_and_timeouts():
+    engine, other = (
+        create_async_engine(
+            settings.DATABASE_URL, poolclass=TelemetryPool, pool_size=1, max_overflow=0, pool_timeout=0.1
+        )
+        for _ in range(2)
+    )
+    telemetry = engine.pool.telemetry
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+    finally:
+        await engine.dispose()
+    assert telemetry.checkouts == 1
+    assert telemetry.timeouts == 1
+    assert sum(telemetry.wait_buckets) == telemetry.checkouts
+    assert (other.pool.telemetry.checkouts, other.pool.telemetry.timeouts) == (0, 0)
+
+
+# /metrics reports the app's pool 4
+def test_metrics_reports_db_pool():
+    response = requests.get(f"{BASE_URL}/metrics")
+    assert response.status_code == 200
+    pool = response.json()["db_pool"]
+    assert pool["checkouts"] >= 1
+    assert pool["pool_size"] >= 1
+    assert set(pool) >= {"checked_out", "overflow", "timeouts", "wait_ms_histogram"}
+    assert set(response.json()["db_shards"]["pools"]) >= {"main"}
+
+
+# With METRICS_TOKEN set, /metrics needs it as a bearer token 4b
+@pytest.mark.asyncio
+async def test_metrics_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics.router)
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret-metrics")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 401
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        response = await client.get("/metrics", headers={"Authorization": "Bearer s3cret-metrics"})
+    assert response.status_code == 200
+    assert "db_replicas" in response.json()
+
+
+# PgBouncer mode turns prepared statement reuse off and names every statement uniquely 5
+@pytest.mark.asyncio
+async def test_pgbouncer_connect_args(monkeypatch):
+    assert asyncpg_connect_args()["prepared_statement_cache_size"] == settings.DB_STATEMENT_CACHE_SIZE
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    args = asyncpg_connect_args()
+    assert args["statement_cache_size"] == args["prepared_statement_cache_size"] == 0
+    assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+
+    engine = create_async_engine(settings.DATABASE_URL, connect_args=args)
+    try:
+        async with engine.connect() as conn:
+            for _ in range(3):
+                assert (await conn.execute(select(literal(1)))).scalar_one() == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,171 @@
+import io
+import threading
+
+import httpx
+import orjson
+import pytest
+import structlog
+from structlog.contextvars import merge_contextvars
+from structlog.testing import CapturingLogger, capture_logs
+
+from omniai.core.log_sampling import LogSampler, parse_rate_limits, parse_sample_rates
+from omniai.core.logging import QueueLogger, QueueLogWriter
+
+BASE_URL = "http://app:8000"
+
+
+class BlockedStream(io.BytesIO):
+    """Holds the writer thread in its first write until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+# Records rendered with orjson are written in batches and all of them are flushed on close 1
+def test_queue_writer_batches_and_flushes_on_close():
+    stream = io.BytesIO()
+    writer = QueueLogWriter(stream, max_queue=1_000, batch_max=50)
+    log = structlog.wrap_logger(
+        QueueLogger(writer),
+        processors=[structlog.processors.add_log_level, structlog.processors.JSONRenderer(serializer=orjson.dumps)],
+    )
+    for i in range(500):
+        log.info("tick", n=i)
+    writer.close()
+
+    lines = stream.getvalue().splitlines()
+    assert [orjson.loads(line)["n"] for line in lines] == list(range(500))
+    assert orjson.loads(lines[0]) == {"event": "tick", "n": 0, "level": "info"}
+    assert writer.written == 500
+    assert writer.batches >= 500 // 50
+    assert writer.dropped == 0
+    assert writer.write(b"late") is False
+
+
+# A full queue drops new records without blocking, counts them and says so in the output 2
+def test_queue_writer_drops_when_full():
+    stream = BlockedStream()
+    writer = QueueLogWriter(stream, max_queue=10, batch_max=5)
+    writer.write(b'{"event":"first"}')
+    assert stream.entered.wait(5)  # writer thread is now stuck in write()
+
+    accepted = sum(writer.write(b'{"event":"x"}') for _ in range(100))
+    assert accepted == 10
+    assert writer.dropped == 90
+    assert writer.stats()["queued"] == 10
+
+    stream.release.set()
+    writer.close()
+    events = [orjson.loads(line) for line in stream.getvalue().splitlines()]
+    assert len([e for e in events if e["event"] == "x"]) == 10
+    assert {"event": "log_records_dropped", "level": "warning", "dropped": 90} in events
+
+
+def sampled_logger(sample_rates="", rate_limits=""):
+    sampler = LogSampler(
+        structlog.processors.JSONRenderer(),
+        parse_sample_rates(sample_rates),
+        parse_rate_limits(rate_limits),
+        slow_ms=1000,
+        max_traces=100,
+        max_events=10,
+    )
+    captured = CapturingLogger()
+    log = structlog.wrap_logger(captured, processors=[structlog.processors.add_log_level, sampler])
+    return captured, sampler, log
+
+
+def request(log, trace_id, status_code=200, duration_ms=5.0, warn=False):
+    traced = log.bind(trace_id=trace_id)
+    traced.info("http_request_start", method="GET")
+    traced.info("auth_and_tenant_success", user_id="u1")
+    if warn:
+        traced.warning("db_slow_query", ms=250)
+    traced.info("http_request_end", status_code=status_code, duration_ms=duration_ms)
+
+
+def emitted(captured):
+    return [orjson.loads(call.args[0]) for call in captured.calls]
+
+
+def emitted_traces(captured):
+    traces = {}
+    for event in emitted(captured):
+        if "trace_id" in event:
+            traces.setdefault(event["trace_id"], []).append(event["event"])
+    return traces
+
+
+# Sampling is decided per request at its end: a request is logged whole or not at all 3
+def test_sampling_keeps_or_drops_whole_requests():
+    captured, sampler, log = sampled_logger("http_request_start=0.3,http_request_end=1.0")
+    for i in range(200):
+        request(log, f"trace-{i}")
+
+    traces = emitted_traces(captured)
+    assert 20 < len(traces) < 100
+    whole = ["http_request_start", "auth_and_tenant_success", "http_request_end"]
+    assert all(events == whole for events in traces.values())
+    assert sampler.stats()["kept"] == 3 * len(traces)
+    assert sampler.stats()["sampled_out"] == 3 * (200 - len(traces))
+    assert sampler.stats()["open_traces"] == 0
+
+    # Warnings, 5xx and slow requests are kept however low the rate
+    captured, sampler, log = sampled_logger("http_request_start=0,auth_and_tenant_success=0")
+    request(log, "plain")
+    request(log, "warned", warn=True)
+    request(log, "failed", status_code=503)
+    request(log, "slow", duration_ms=1500)
+    log.info("untraced_event")
+    log.warning("untraced_warning")
+    traces = emitted_traces(captured)
+    assert set(traces) == {"warned", "failed", "slow"}
+    assert traces["warned"] == ["http_request_start", "auth_and_tenant_success", "db_slow_query", "http_request_end"]
+    assert [e["event"] for e in emitted(captured) if "trace_id" not in e] == ["untraced_event", "untraced_warning"]
+
+
+# A per-event token bucket caps how many requests containing that event are logged 4
+def test_rate_limit_per_event():
+    captured, sampler, log = sampled_logger(rate_limits="auth_and_tenant_success=0.001:3,tick=0.001:2")
+    for i in range(10):
+        request(log, f"trace-{i}")
+    for _ in range(5):
+        log.info("tick")
+
+    assert list(emitted_traces(captured)) == ["trace-0", "trace-1", "trace-2"]
+    assert [e["event"] for e in emitted(captured)].count("tick") == 2
+    assert sampler.stats()["rate_limited"] == 7 * 3 + 3
+
+
+# Through the app's own middleware stack, the tenant check logs under the request's trace_id 5
+@pytest.mark.asyncio
+async def test_tenant_events_carry_request_trace_id():
+    from omniai.db.session import engine
+    from omniai.main import app
+
+    email, password = "trace.owner@omniai.dev", "SecurePass123!"
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        await ac.post("/v1/auth/signup", json={"email": email, "password": password})
+        login = await ac.post("/v1/auth/login", data={"username": email, "password": password})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            with capture_logs(processors=[merge_contextvars]) as logs:
+                response = await client.get("/v1/me", headers=headers)
+    finally:
+        await engine.dispose()
+
+    assert response.status_code == 200
+    events = {event["event"]: event for event in logs}
+    assert list(events)[0] == "http_request_start"
+    trace_id = events["http_request_start"]["trace_id"]
+    for name in ("tenant_missing_fallback_to_default", "auth_and_tenant_success", "http_request_end"):
+        assert events[name]["trace_id"] == trace_id
@@ -0,0 +1,83 @@
+import time
+
+from omniai.core.cache import TTLLRUCache
+from omniai.core.membership_cache import (
+    CachedMembership,
+    MembershipCache,
+    MembershipStatus,
+)
+
+
+# LRU eviction + hit/miss counters 1
+def test_ttl_lru_evicts_least_recently_used():
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now most recent
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+# Entries expire after their TTL 2
+def test_ttl_lru_expires_entries():
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_entries=10, ttl_seconds=60)
+    cache.set("short", 1, ttl_seconds=0.01)
+    cache.set("long", 2)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    assert len(cache) == 1
+
+
+# Negative answers are cached with the shorter TTL 3
+def test_negative_membership_uses_negative_ttl():
+    cache = MembershipCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=0.01, version_ttl_seconds=60)
+    cache.set_membership("usr_a", "org_x", CachedMembership(MembershipStatus.NOT_MEMBER))
+    cache.set_membership("usr_a", "org_y", CachedMembership(MembershipStatus.MEMBER, "owner"))
+    cache.set_default_org("usr_b", None)
+
+    assert cache.get_membership("usr_a", "org_x") == CachedMembership(MembershipStatus.NOT_MEMBER)
+    assert cache.get_default_org("usr_b") is not None
+    time.sleep(0.02)
+    assert cache.get_membership("usr_a", "org_x") is None
+    assert cache.get_default_org("usr_b") is None
+    assert cache.get_membership("usr_a", "org_y") == CachedMembership(MembershipStatus.MEMBER, "owner")
+
+
+# Invalidation hooks drop every answer for a user / an org 4
+def test_membership_invalidation_hooks():
+    cache = MembershipCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=60, version_ttl_seconds=60)
+    member = CachedMembership(MembershipStatus.MEMBER, "member")
+    cache.set_membership("usr_a", "org_x", member)
+    cache.set_membership("usr_a", "org_y", member)
+    cache.set_membership("usr_b", "org_x", member)
+    cache.set_default_org("usr_a", "org_x")
+
+    cache.invalidate_user("usr_a")
+    assert cache.get_membership("usr_a", "org_x") is None
+    assert cache.get_membership("usr_a", "org_y") is None
+    assert cache.get_default_org("usr_a") is None
+    assert cache.get_membership("usr_b", "org_x") == member
+
+    cache.invalidate_org("org_x")
+    assert cache.get_membership("usr_b", "org_x") is None
+
+
+# Tokens with an older membership_version are recognised as stale 5
+def test_membership_version_staleness():
+    cache = MembershipCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=60, version_ttl_seconds=60)
+    assert cache.is_stale("usr_a", 0) is False  # unknown version → trust the token
+    cache.set_version("usr_a", 2)
+    cache.set_version("usr_a", 1)  # never goes backwards
+    assert cache.is_stale("usr_a", 1) is True
+    assert cache.is_stale("usr_a", 2) is False
+
+    cache.invalidate_user("usr_a")  # cached answers go, the version stays
+    assert cache.is_stale("usr_a", 1) is True
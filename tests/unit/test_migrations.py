@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from omniai.core.config import settings
+from omniai.db.migrate import (
+    check_schema_version,
+    latest_version,
+    load_migrations,
+    migrate,
+)
+from omniai.models import auth_session, organization, user  # noqa: F401  (register all tables)
+from omniai.models.base import Base
+
+
+def engine_for(database):
+    return create_async_engine(make_url(settings.DATABASE_URL).set(database=database), poolclass=NullPool)
+
+
+@pytest.fixture
+async def scratch_databases():
+    """Creates empty databases on the test server; dropped afterwards."""
+    admin = create_async_engine(
+        make_url(settings.DATABASE_URL).set(database="postgres"), poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+    created = []
+
+    async def create(name):
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+            await conn.execute(text(f'CREATE DATABASE "{name}"'))
+        created.append(name)
+        return engine_for(name)
+
+    yield create
+    async with admin.connect() as conn:
+        for name in created:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    await admin.dispose()
+
+
+async def reflect(engine):
+    def describe(sync_conn):
+        inspector = inspect(sync_conn)
+        return {
+            table: {
+                "columns": {(c["name"], str(c["type"]), c["nullable"]) for c in inspector.get_columns(table)},
+                "indexes": {(i["name"], tuple(i["column_names"]), i["unique"]) for i in inspector.get_indexes(table)},
+                "unique": {u["name"] for u in inspector.get_unique_constraints(table)},
+                "foreign_keys": {
+                    (fk["referred_table"], tuple(fk["constrained_columns"]), fk["options"].get("ondelete"))
+                    for fk in inspector.get_foreign_keys(table)
+                },
+            }
+            for table in inspector.get_table_names()
+            if table != "schema_migrations"
+        }
+
+    async with engine.connect() as conn:
+        return await conn.run_sync(describe)
+
+
+# Migration modules are numbered contiguously 1
+def test_migrations_are_contiguous():
+    assert [m.version for m in load_migrations()] == list(range(1, latest_version() + 1))
+
+
+# The test database is migrated; running again applies nothing 2
+@pytest.mark.asyncio
+async def test_migrate_is_idempotent():
+    engine = engine_for(make_url(settings.DATABASE_URL).database)
+    try:
+        assert await migrate(engine) == []
+        assert await check_schema_version(engine) == latest_version()
+    finally:
+        await engine.dispose()
+
+
+# Migrations build exactly what the models declare, and adopt a create_all() database 3
+@pytest.mark.asyncio
+async def test_migrations_match_models(scratch_databases):
+    migrated = await scratch_databases("omniai_migrations_fresh")
+    legacy = await scratch_databases("omniai_migrations_create_all")
+    try:
+        assert len(await migrate(migrated)) == latest_version()
+
+        async with legacy.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        assert len(await migrate(legacy)) == latest_version()
+
+        assert await reflect(migrated) == await reflect(legacy)
+    finally:
+        await migrated.dispose()
+        await legacy.dispose()
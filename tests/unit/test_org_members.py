@@ -0,0 +1,92 @@
+import httpx
+import pytest
+
+BASE_URL = "http://app:8000"
+PASSWORD = "SecurePass123!"
+
+
+async def _login(ac: httpx.AsyncClient, email: str) -> tuple[dict[str, str], dict]:
+    await ac.post("/v1/auth/signup", json={"email": email, "password": PASSWORD})
+    r = await ac.post("/v1/auth/login", data={"username": email, "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    return headers, (await ac.get("/v1/me", headers=headers)).json()
+
+
+# Bulk upsert writes valid rows and returns only the conflicts 1
+@pytest.mark.asyncio
+async def test_bulk_upsert_members():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        owner, owner_me = await _login(ac, "bulk.owner@omniai.dev")
+        member, member_me = await _login(ac, "bulk.member@omniai.dev")
+        _, other_me = await _login(ac, "bulk.other@omniai.dev")
+        org_id = owner_me["active_organization_id"]
+
+        # Not a member yet (this negative answer is now cached)
+        r = await ac.get("/v1/me", headers={**member, "X-Tenant-ID": org_id})
+        assert r.status_code == 403
+
+        body = {"members": [
+            {"user_id": member_me["id"]},
+            {"user_id": other_me["id"], "is_default": True},  # already has a default org
+            {"user_id": "usr_does_not_exist"},
+            {"user_id": member_me["id"], "role": "owner"},
+        ]}
+        r = await ac.put(f"/v1/orgs/{org_id}/members/bulk", json=body, headers=owner)
+        assert r.status_code == 200
+        assert r.json()["changed"] == 1
+        assert [(c["index"], c["reason"]) for c in r.json()["conflicts"]] == [
+            (1, "default_org_exists"),
+            (2, "user_not_found"),
+            (3, "duplicate"),
+        ]
+
+        r = await ac.get("/v1/me", headers={**member, "X-Tenant-ID": org_id})
+        assert r.status_code == 200
+        assert r.json()["role_in_active_org"] == "member"
+
+        # Re-applying the same rows changes nothing
+        r = await ac.put(f"/v1/orgs/{org_id}/members/bulk", json={"members": body["members"][:1]}, headers=owner)
+        assert r.json() == {"changed": 0, "conflicts": []}
+
+        # Members can't manage the org
+        r = await ac.put(
+            f"/v1/orgs/{org_id}/members/bulk",
+            json={"members": [{"user_id": other_me["id"]}]},
+            headers={**member, "X-Tenant-ID": org_id},
+        )
+        assert r.status_code == 403
+
+
+# /v1/orgs pages through a user's orgs with opaque cursors, optionally by role 2
+@pytest.mark.asyncio
+async def test_list_organizations_keyset_pages():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        user, user_me = await _login(ac, "pager.user@omniai.dev")
+        for n in range(4):
+            owner, owner_me = await _login(ac, f"pager.owner{n}@omniai.dev")
+            await ac.put(
+                f"/v1/orgs/{owner_me['active_organization_id']}/members/bulk",
+                json={"members": [{"user_id": user_me["id"]}]},
+                headers=owner,
+            )
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = (await ac.get("/v1/orgs", params=params, headers=user)).json()
+            seen += [org["id"] for org in page["items"]]
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert pages == 3
+        assert seen == sorted(seen) and len(set(seen)) == 5
+
+        owned = (await ac.get("/v1/orgs", params={"role": "owner"}, headers=user)).json()
+        assert [org["id"] for org in owned["items"]] == [user_me["active_organization_id"]]
+        assert owned["next_cursor"] is None
+
+        first = (await ac.get("/v1/orgs", params={"limit": 1}, headers=user)).json()
+        r = await ac.get("/v1/orgs", params={"cursor": first["next_cursor"], "role": "member"}, headers=user)
+        assert r.status_code == 400
+        assert (await ac.get("/v1/orgs", params={"cursor": "not-a-cursor"}, headers=user)).status_code == 400
@@ -0,0 +1,90 @@
+import httpx
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from structlog.testing import capture_logs
+
+from omniai.core.config import settings
+from omniai.core.membership_cache import membership_cache
+from omniai.db.instrumentation import (
+    QueryBudgetExceeded,
+    instrument_engine,
+    track_queries,
+)
+from omniai.models.organization import Organization  # noqa: F401  (resolves User.organizations)
+from omniai.models.user import User
+
+BASE_URL = "http://app:8000"
+
+
+@pytest.fixture
+async def session_factory():
+    # Own engine: each test runs on its own event loop, so no pooled connections
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    instrument_engine(engine.sync_engine)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+# Statements run inside track_queries are counted and timed 1
+@pytest.mark.asyncio
+async def test_track_queries_counts_statements(session_factory):
+    async with session_factory() as db:
+        with track_queries() as queries:
+            await db.execute(text("SELECT 1"))
+            await db.execute(text("SELECT 2"))
+        await db.execute(text("SELECT 3"))  # outside the request: not counted
+    assert queries.count == 2
+    assert queries.seconds > 0
+
+
+# Going over budget raises in strict mode 2
+@pytest.mark.asyncio
+async def test_query_budget_strict(monkeypatch, session_factory):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", True)
+    async with session_factory() as db:
+        with track_queries(budget=1):
+            await db.execute(text("SELECT 1"))
+            with pytest.raises(QueryBudgetExceeded):
+                await db.execute(text("SELECT 2"))
+
+
+# Relationships are opt-in: touching an unloaded one raises instead of querying 3
+@pytest.mark.asyncio
+async def test_relationships_do_not_lazy_load(session_factory):
+    async with session_factory() as db:
+        with track_queries() as queries:
+            user = (await db.execute(select(User).limit(1))).scalar_one_or_none()
+        if user is None:
+            pytest.skip("No users in the database")
+        assert queries.count == 1
+        with pytest.raises(InvalidRequestError):
+            _ = user.organizations
+
+
+# The request's count covers the tenant middleware's own queries, not just the endpoint's 4
+@pytest.mark.asyncio
+async def test_request_count_includes_tenant_checks():
+    from omniai.db.session import engine
+    from omniai.main import app
+
+    email, password = "budget.owner@omniai.dev", "SecurePass123!"
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        await ac.post("/v1/auth/signup", json={"email": email, "password": password})
+        login = await ac.post("/v1/auth/login", data={"username": email, "password": password})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    counts = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            membership_cache.clear()
+            for _ in range(2):  # tenant resolved from the DB, then from the membership cache
+                with capture_logs() as logs:
+                    assert (await client.get("/v1/me", headers=headers)).status_code == 200
+                counts += [event["db_queries"] for event in logs if event["event"] == "http_request_end"]
+    finally:
+        await engine.dispose()
+    assert counts[1] >= 1
+    assert counts[0] == counts[1] + 1
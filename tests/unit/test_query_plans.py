@@ -0,0 +1,265 @@
+"""
+Query plans of everything the services issue, on a seeded scratch database.
+
+The workload below calls the real service functions; every statement they
+send is captured and EXPLAINed (reads with ANALYZE, BUFFERS). Plans may not
+sequentially scan an application table, and each plan's estimated cost is
+compared with query_plan_baseline.json. After an intended change:
+
+    UPDATE_PLAN_BASELINE=1 pytest tests/unit/test_query_plans.py
+"""
+import asyncio
+import json
+import os
+from contextvars import ContextVar
+from pathlib import Path
+
+import bcrypt
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from omniai.api.v1.me import _USER_WITH_ORGS
+from omniai.core.config import settings
+from omniai.core.hashing import password_hash_policy
+from omniai.db.migrate import migrate
+from omniai.db.plans import (
+    app_tables,
+    explain,
+    missing_index_hint,
+    seq_scans,
+    unused_indexes,
+)
+from omniai.db.routing import is_plain_read
+from omniai.services.auth import (
+    authenticate_user,
+    create_user_with_org,
+    find_available_slugs,
+)
+from omniai.services.organization import (
+    MembershipChange,
+    get_user_org_role,
+    list_user_organizations,
+    load_membership_claim,
+    resolve_tenant,
+    upsert_memberships,
+)
+from omniai.services.provisioning import import_users
+from omniai.services.sessions import (
+    RefreshTokenError,
+    purge_expired_sessions,
+    revoke_refresh_token,
+    rotate_refresh_token,
+    start_session,
+)
+
+DATABASE = "omniai_query_plans"
+BASELINE = Path(__file__).with_name("query_plan_baseline.json")
+# Allowed growth of a plan's estimated cost over the baseline (statistics are sampled)
+COST_TOLERANCE = 1.5
+
+USERS = 50_000
+COOPS = 500
+SEED_ROUNDS = 5     # the workload runs at 4, so the login also rehashes
+PASSWORD = "Harvest-2026!"
+
+# Every user has a personal org (default, owner) and belongs to one
+# cooperative; every 10th user to a second one. Coop g is owned by user g.
+SEED = [
+    """
+    INSERT INTO users (id, email, hashed_password, membership_version)
+    SELECT 'usr_' || lpad(g::text, 8, '0'), 'farmer' || g || '@coop.example.com', $1, 0
+    FROM generate_series(1, $2::int) g
+    """,
+    """
+    INSERT INTO organizations (id, name, slug, is_active)
+    SELECT 'org_p' || lpad(g::text, 8, '0'), 'Personal – farmer' || g || '@coop.example.com', 'personal-farmer' || g, true
+    FROM generate_series(1, $1::int) g
+    UNION ALL
+    SELECT 'org_c' || lpad(c::text, 5, '0'), 'Cooperative ' || c, 'coop-' || c, true
+    FROM generate_series(1, $2::int) c
+    """,
+    """
+    INSERT INTO user_organization (user_id, organization_id, is_default, role)
+    SELECT 'usr_' || lpad(g::text, 8, '0'), 'org_p' || lpad(g::text, 8, '0'), true, 'owner'
+    FROM generate_series(1, $1::int) g
+    UNION ALL
+    SELECT 'usr_' || lpad(c::text, 8, '0'), 'org_c' || lpad(c::text, 5, '0'), false, 'owner'
+    FROM generate_series(1, $2::int) c
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO user_organization (user_id, organization_id, is_default, role)
+    SELECT 'usr_' || lpad(g::text, 8, '0'), 'org_c' || lpad((g % $2 + 1)::text, 5, '0'), false, 'member'
+    FROM generate_series(1, $1::int) g
+    UNION ALL
+    SELECT 'usr_' || lpad(g::text, 8, '0'), 'org_c' || lpad((g * 7 % $2 + 1)::text, 5, '0'), false, 'member'
+    FROM generate_series(10, $1::int, 10) g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO auth_sessions (id, token_hash, family_id, user_id, expires_at)
+    SELECT 'ses_' || g, encode(sha256(g::text::bytea), 'hex'), 'fam_' || g,
+           'usr_' || lpad(g::text, 8, '0'), now() + interval '30 days'
+    FROM generate_series(1, $1::int) g
+    """,
+]
+
+USER_ID = "usr_00000042"
+EMAIL = "farmer42@coop.example.com"
+COOP_ID = "org_c00043"
+
+label: ContextVar[str | None] = ContextVar("label", default=None)
+
+
+async def _records(*records):
+    for line, record in enumerate(records, start=1):
+        yield line, record
+
+
+async def _refresh_tokens(db):
+    token = await start_session(db, USER_ID)
+    _, rotated = await rotate_refresh_token(db, token)
+    with pytest.raises(RefreshTokenError):
+        await rotate_refresh_token(db, token)  # reuse: the family is revoked
+    await revoke_refresh_token(db, rotated)
+    await purge_expired_sessions(db, batch_size=1_000)
+
+
+async def _import(db):
+    records = _records({"email": "imported1@coop.example.com", "password": PASSWORD}, {"email": EMAIL, "password": PASSWORD})
+    return [row async for row in import_users(db, records, COOP_ID, imported_by=USER_ID)]
+
+
+# (label, call); each call gets its own session
+WORKLOAD = [
+    ("resolve_tenant default", lambda db: resolve_tenant(db, USER_ID, None)),
+    ("resolve_tenant explicit", lambda db: resolve_tenant(db, USER_ID, COOP_ID)),
+    ("get_user_org_role", lambda db: get_user_org_role(db, USER_ID, COOP_ID)),
+    ("load_membership_claim", lambda db: load_membership_claim(db, USER_ID)),
+    ("/me", lambda db: db.execute(_USER_WITH_ORGS, {"user_id": USER_ID})),
+    ("list_user_organizations", lambda db: list_user_organizations(db, USER_ID, 2, after_org_id="org_c")),
+    ("list_user_organizations role", lambda db: list_user_organizations(db, USER_ID, 2, role="member")),
+    ("authenticate_user", lambda db: authenticate_user(db, EMAIL, PASSWORD)),
+    ("find_available_slugs", lambda db: find_available_slugs(db, ["personal-farmer42", "new-coop"])),
+    ("create_user_with_org", lambda db: create_user_with_org(db, "newcomer@coop.example.com", PASSWORD)),
+    (
+        "upsert_memberships",
+        lambda db: upsert_memberships(
+            db,
+            COOP_ID,
+            [MembershipChange("usr_00000001"), MembershipChange(USER_ID, role="admin"), MembershipChange("usr_missing")],
+        ),
+    ),
+    ("refresh tokens", _refresh_tokens),
+    ("import_users", _import),
+]
+
+
+def _capture(engine, captured):
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(_conn, _cursor, statement, parameters, context, _executemany):
+        if label.get() is not None:
+            compiled = getattr(context, "compiled", None)
+            read = compiled is not None and is_plain_read(compiled.statement)
+            captured.append((label.get(), statement, parameters, read))
+
+
+async def _analyze():
+    admin = create_async_engine(
+        make_url(settings.DATABASE_URL).set(database="postgres"), poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+    async with admin.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{DATABASE}" WITH (FORCE)'))
+        await conn.execute(text(f'CREATE DATABASE "{DATABASE}"'))
+    engine = create_async_engine(make_url(settings.DATABASE_URL).set(database=DATABASE), poolclass=NullPool)
+    try:
+        await migrate(engine)
+        async with engine.connect() as conn:
+            driver_conn = (await conn.get_raw_connection()).driver_connection
+            # Plans depend on statistics and the visibility map: no autovacuum run
+            # may change them between the seed and the EXPLAINs
+            plain_tables = await driver_conn.fetch(
+                "SELECT relname FROM pg_class WHERE relkind = 'r' AND relname = ANY($1::text[])", list(app_tables())
+            )
+            for table in plain_tables:  # partitioned parents hold no rows (nor storage options)
+                await driver_conn.execute(f"ALTER TABLE {table['relname']} SET (autovacuum_enabled = false)")
+            seed_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(SEED_ROUNDS)).decode()
+            await driver_conn.execute(SEED[0], seed_hash, USERS)
+            await driver_conn.execute(SEED[1], USERS, COOPS)
+            await driver_conn.execute(SEED[2], USERS, COOPS)
+            await driver_conn.execute(SEED[3], USERS, COOPS)
+            await driver_conn.execute(SEED[4], USERS)
+            await driver_conn.execute("VACUUM ANALYZE")
+            await driver_conn.execute("SELECT pg_stat_reset()")
+
+        captured = []
+        _capture(engine, captured)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        for name, call in WORKLOAD:
+            token = label.set(name)
+            try:
+                async with sessions() as db:
+                    await call(db)
+            finally:
+                label.reset(token)
+
+        plans = {}
+        async with engine.connect() as conn:
+            driver_conn = (await conn.get_raw_connection()).driver_connection
+            counts = {}
+            for name, statement, parameters, read in captured:
+                counts[name] = counts.get(name, 0) + 1
+                plans[f"{name} #{counts[name]}"] = (statement, await explain(driver_conn, statement, parameters, read))
+            unused = await unused_indexes(driver_conn)
+        return plans, unused
+    finally:
+        await engine.dispose()
+        async with admin.connect() as conn:
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{DATABASE}" WITH (FORCE)'))
+        await admin.dispose()
+
+
+@pytest.fixture(scope="module")
+def analyzed():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(password_hash_policy, "rounds", 4)
+        return asyncio.run(_analyze())
+
+
+# The workload's statements were all captured 1
+def test_workload_is_captured(analyzed):
+    plans, _ = analyzed
+    labels = {key.rsplit(" #", 1)[0] for key in plans}
+    assert labels == {name for name, _ in WORKLOAD}
+
+
+# No statement sequentially scans an application table 2
+def test_no_sequential_scans(analyzed):
+    plans, _ = analyzed
+    missing = {
+        key: [missing_index_hint(scan) for scan in seq_scans(plan)] for key, (_, plan) in plans.items() if seq_scans(plan)
+    }
+    assert missing == {}
+
+
+# Estimated costs stay within COST_TOLERANCE of the stored baseline 3
+def test_costs_match_baseline(analyzed):
+    plans, _ = analyzed
+    costs = {key: plan["Total Cost"] for key, (_, plan) in plans.items()}
+    if os.environ.get("UPDATE_PLAN_BASELINE"):
+        BASELINE.write_text(json.dumps(costs, indent=2, sort_keys=True) + "\n")
+    baseline = json.loads(BASELINE.read_text())
+    assert set(costs) == set(baseline), "statements changed: rerun with UPDATE_PLAN_BASELINE=1"
+    regressions = {
+        key: (baseline[key], cost) for key, cost in costs.items() if cost > baseline[key] * COST_TOLERANCE + 1
+    }
+    assert regressions == {}
+
+
+# Every secondary index is used by the workload: the others are only write cost 4
+def test_no_unused_indexes(analyzed):
+    _, unused = analyzed
+    assert [f"{index.table}.{index.index}" for index in unused] == []
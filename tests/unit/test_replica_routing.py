@@ -0,0 +1,157 @@
+import time
+
+import httpx
+import pytest
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.responses import PlainTextResponse
+
+from omniai.core.config import settings
+from omniai.core.membership_cache import MembershipStatus, membership_cache
+from omniai.core.middleware import ReadYourWritesMiddleware, TenantValidationMiddleware
+from omniai.db.routing import (
+    WROTE_AT_COOKIE,
+    ReplicaSet,
+    RoutingSession,
+    is_plain_read,
+    note_write,
+    track_client_writes,
+)
+from omniai.models.organization import Organization  # noqa: F401  (resolves User.organizations)
+from omniai.models.user import User
+from omniai.services.organization import _UPSERT_MEMBERSHIPS
+
+
+def make_engine(database=None, port=None):
+    url = make_url(settings.DATABASE_URL)
+    if database:
+        url = url.set(database=database)
+    if port:
+        url = url.set(port=port)
+    return create_async_engine(url, poolclass=NullPool)
+
+
+def make_session(replicas, read_only=True, user_id=None):
+    session = AsyncSession(bind=make_engine(), sync_session_class=RoutingSession, replicas=replicas)
+    session.info.update(read_only=read_only, user_id=user_id)
+    return session
+
+
+def bind_for(session, statement):
+    return session.sync_session.get_bind(clause=statement)
+
+
+# Statements with DML anywhere (e.g. a data-modifying CTE) or FOR UPDATE are not plain reads 1
+def test_is_plain_read():
+    assert is_plain_read(select(User).where(User.id == "usr_x"))
+    assert not is_plain_read(select(User).with_for_update())
+    assert not is_plain_read(insert(User).values(id="usr_x"))
+    assert not is_plain_read(_UPSERT_MEMBERSHIPS)
+    assert not is_plain_read(text("SELECT 1"))
+
+
+# Reads of a read-only session go to one replica; after a write everything stays on the primary 2
+def test_read_only_session_routing():
+    replicas = ReplicaSet([make_engine(), make_engine()])
+    session = make_session(replicas)
+    primary = session.sync_session.bind
+    chosen = bind_for(session, select(User))
+    assert chosen in {r.engine.sync_engine for r in replicas.replicas}
+    assert bind_for(session, select(User.email)) is chosen  # sticky within the session
+    assert bind_for(session, insert(User).values(id="usr_x")) is primary
+    assert bind_for(session, select(User)) is primary
+    # Round robin: the next session gets the other replica
+    assert bind_for(make_session(replicas), select(User)) is not chosen
+
+
+# Write requests, recent writers and sessions without a healthy replica use the primary 3
+def test_primary_fallbacks():
+    replicas = ReplicaSet([make_engine()])
+    session = make_session(replicas, read_only=False)
+    assert bind_for(session, select(User)) is session.sync_session.bind
+
+    note_write("usr_recent_writer")
+    session = make_session(replicas, user_id="usr_recent_writer")
+    assert bind_for(session, select(User)) is session.sync_session.bind
+
+    replicas.replicas[0].mark_down("test")
+    session = make_session(replicas)
+    assert bind_for(session, select(User)) is session.sync_session.bind
+    assert replicas.stats()["primary_fallbacks"] == 1
+
+
+# End to end with the maintenance database standing in as the replica 4
+@pytest.mark.asyncio
+async def test_replica_serves_reads_and_probe_marks_unreachable_down():
+    replicas = ReplicaSet([make_engine(database="postgres"), make_engine(port=1)])
+    await replicas.check()
+    assert [r.healthy for r in replicas.replicas] == [True, False]
+    assert replicas.replicas[0].lag_seconds == 0
+
+    async with make_session(replicas) as session:
+        assert (await session.execute(select(func.current_database()))).scalar_one() == "postgres"
+    async with make_session(replicas, read_only=False) as session:
+        primary_db = make_url(settings.DATABASE_URL).database
+        assert (await session.execute(select(func.current_database()))).scalar_one() == primary_db
+    await replicas.stop()
+
+
+# A client's recent write, carried in its cookie, keeps its reads on the primary on any worker 5
+def test_client_wrote_recently_pins_reads():
+    replicas = ReplicaSet([make_engine()])
+    session = make_session(replicas)
+    with track_client_writes(time.time() - 1):
+        assert bind_for(session, select(User)) is session.sync_session.bind
+    session = make_session(replicas)
+    with track_client_writes(time.time() - settings.DB_READ_YOUR_WRITES_SECONDS - 1):
+        assert bind_for(session, select(User)) is not session.sync_session.bind
+
+
+# A committed write sets the cookie, and the cookie routes the next request to the primary 6
+@pytest.mark.asyncio
+async def test_write_cookie_round_trip():
+    replicas = ReplicaSet([make_engine(database="postgres")])
+
+    async def app(scope, receive, send):
+        async with make_session(replicas, read_only=scope["method"] == "GET") as session:
+            if scope["method"] == "POST":
+                await session.execute(update(User).where(User.id == "usr_nobody").values(email="x"))
+                await session.commit()
+            database = (await session.execute(select(func.current_database()))).scalar_one()
+        await PlainTextResponse(database)(scope, receive, send)
+
+    primary_db = make_url(settings.DATABASE_URL).database
+    transport = httpx.ASGITransport(app=ReadYourWritesMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/")).text == "postgres"
+        assert WROTE_AT_COOKIE not in (await client.get("/")).cookies
+        response = await client.post("/")
+        assert response.text == primary_db
+        assert WROTE_AT_COOKIE in response.cookies
+        assert (await client.get("/")).text == primary_db
+        client.cookies.clear()
+        assert (await client.get("/")).text == "postgres"
+    await replicas.stop()
+
+
+# Negative tenant answers read from a replica are used but not cached; from the primary they are 7
+@pytest.mark.asyncio
+async def test_replica_negative_answers_not_cached():
+    membership_cache.clear()
+    replicas = ReplicaSet([make_engine()])  # the primary database standing in as a replica
+    async with make_session(replicas, user_id="usr_lagging") as session:
+        resolution = await TenantValidationMiddleware._resolve(session, "usr_lagging", "org_lagging")
+        assert session.info["replica"] is not None
+    assert not resolution.org_exists
+    assert membership_cache.get_membership("usr_lagging", "org_lagging") is None
+    assert membership_cache.get_default_org("usr_lagging") is None
+
+    async with make_session(ReplicaSet([]), user_id="usr_lagging") as session:
+        await TenantValidationMiddleware._resolve(session, "usr_lagging", "org_lagging")
+    cached = membership_cache.get_membership("usr_lagging", "org_lagging")
+    assert cached is not None and cached.status is MembershipStatus.ORG_NOT_FOUND
+    assert membership_cache.get_default_org("usr_lagging") is not None
+    membership_cache.clear()
+    await replicas.stop()
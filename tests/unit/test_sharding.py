@@ -0,0 +1,130 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.requests import Request
+
+from omniai.core.config import settings
+from omniai.db.session import get_tenant_db
+from omniai.db.sharding import (
+    MAIN_SHARD,
+    HashRing,
+    ShardMap,
+    TenantMoveError,
+    TenantMoving,
+    move_tenant,
+    tenant_moving_handler,
+)
+from omniai.models.organization import Organization
+
+# A tenant-owned table for the move test only
+notes = Table(
+    "shard_move_test_notes",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("organization_id", String, nullable=False),
+    Column("body", String, nullable=False),
+)
+
+
+def engine_for(database):
+    return create_async_engine(make_url(settings.DATABASE_URL).set(database=database), poolclass=NullPool)
+
+
+@pytest.fixture
+async def two_shards():
+    """The test database as "main" plus a scratch database as shard "s1"."""
+    admin = create_async_engine(
+        make_url(settings.DATABASE_URL).set(database="postgres"), poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+    async with admin.connect() as conn:
+        await conn.execute(text('DROP DATABASE IF EXISTS "omniai_shard_s1"'))
+        await conn.execute(text('CREATE DATABASE "omniai_shard_s1"'))
+    shard_map = ShardMap({MAIN_SHARD: engine_for(make_url(settings.DATABASE_URL).database), "s1": engine_for("omniai_shard_s1")})
+    for engine in shard_map.engines.values():
+        async with engine.begin() as conn:
+            await conn.run_sync(notes.metadata.create_all)
+    yield shard_map
+    async with shard_map.engines[MAIN_SHARD].begin() as conn:
+        await conn.run_sync(notes.metadata.drop_all)
+    for engine in shard_map.engines.values():
+        await engine.dispose()
+    async with admin.connect() as conn:
+        await conn.execute(text('DROP DATABASE IF EXISTS "omniai_shard_s1" WITH (FORCE)'))
+    await admin.dispose()
+
+
+# Adding a shard to the ring moves only about 1/N of the organizations 1
+def test_hash_ring_moves_few_keys():
+    keys = [f"org_{i}" for i in range(10_000)]
+    before = HashRing(["main", "s1", "s2"])
+    after = HashRing(["main", "s1", "s2", "s3"])
+    moved = sum(before.lookup(key) != after.lookup(key) for key in keys)
+    assert all(after.lookup(key) == after.lookup(key) for key in keys[:100])
+    assert 0.15 < moved / len(keys) < 0.35
+    assert {after.lookup(key) for key in keys} == {"main", "s1", "s2", "s3"}
+
+
+# Without extra shards every tenant is on "main", with no directory query 2
+@pytest.mark.asyncio
+async def test_unsharded_locate_needs_no_query():
+    shard_map = ShardMap({MAIN_SHARD: create_async_engine(settings.DATABASE_URL)})
+    placement = await shard_map.locate(None, "org_anything")
+    assert placement.shard == MAIN_SHARD and not placement.moving
+    assert shard_map.lookups == 0
+
+
+# A move copies the tenant's rows, repoints the directory and cleans up the source 3
+@pytest.mark.asyncio
+async def test_move_tenant(two_shards):
+    shard_map = two_shards
+    org_id = "org_" + uuid.uuid4().hex
+    async with shard_map.session(MAIN_SHARD) as db:
+        db.add(Organization(id=org_id, name="Shard move coop", slug=org_id))
+        await db.execute(notes.insert(), [{"id": i, "organization_id": org_id, "body": f"note {i}"} for i in range(3)])
+        await db.execute(notes.insert().values(id=99, organization_id="org_other", body="stays"))
+        await db.commit()
+        assert (await shard_map.locate(db, org_id)).shard == MAIN_SHARD
+
+    copied = await move_tenant(shard_map, org_id, "s1", tables=[notes], settle_seconds=0)
+    assert copied == {notes.name: 3}
+
+    async with shard_map.session("s1") as db:
+        assert (await db.execute(select(notes.c.body).order_by(notes.c.id))).scalars().all() == ["note 0", "note 1", "note 2"]
+    async with shard_map.session(MAIN_SHARD) as db:
+        assert (await db.execute(select(notes.c.id))).scalars().all() == [99]
+        placement = await shard_map.locate(db, org_id)
+        assert placement.shard == "s1" and not placement.moving
+        await db.delete(await db.get(Organization, org_id))
+        await db.commit()
+
+    with pytest.raises(TenantMoveError):
+        await move_tenant(shard_map, org_id, "s1", tables=[notes], settle_seconds=0)
+
+
+def tenant_request(method, moving):
+    request = Request({"type": "http", "method": method, "path": "/v1/things", "headers": [], "query_string": b""})
+    request.state.db = "directory session"
+    request.state.tenant_id = "org_moving"
+    request.state.shard = MAIN_SHARD
+    request.state.tenant_moving = moving
+    return request
+
+
+# A move freezes writes to the moving tenant's data only; its reads and other tenants go on 4
+@pytest.mark.asyncio
+async def test_move_freezes_tenant_writes_only():
+    assert [s async for s in get_tenant_db(tenant_request("GET", moving=True))] == ["directory session"]
+    assert [s async for s in get_tenant_db(tenant_request("POST", moving=False))] == ["directory session"]
+    with pytest.raises(TenantMoving) as frozen:
+        async for _ in get_tenant_db(tenant_request("POST", moving=True)):
+            pass
+
+    response = await tenant_moving_handler(tenant_request("POST", moving=True), frozen.value)
+    assert response.status_code == 503
+    assert json.loads(response.body)["error"]["code"] == "TENANT_MOVING"
+    assert response.headers["Retry-After"] == str(int(settings.SHARD_DIRECTORY_CACHE_SECONDS))
@@ -0,0 +1,41 @@
+import pytest
+import requests
+
+from omniai.core.startup import StartupTimer
+
+BASE_URL = "http://app:8000"
+
+
+# Phases are timed and the total covers them 1
+def test_startup_timer_phases():
+    timer = StartupTimer()
+    with timer.phase("settings"):
+        sum(range(10_000))
+    report = timer.ready()
+    assert set(report["phases_ms"]) == {"settings"}
+    assert report["total_ms"] >= report["phases_ms"]["settings"]
+
+
+# The running app reports its cold start, including the warm-up enabled for tests 2
+def test_metrics_reports_startup():
+    startup = requests.get(f"{BASE_URL}/metrics").json()["startup"]
+    assert startup["total_ms"] > 0
+    expected = {"settings", "logging", "engine", "imports", "routers", "schema_check", "prewarm_pool", "prewarm_routes"}
+    assert expected <= set(startup["phases_ms"])
+
+
+# Route warm-up is authorized by its token's claim and leaves no audit trail 3
+@pytest.mark.asyncio
+async def test_prewarm_routes_authorized_and_not_audited():
+    from omniai.core.audit import audit_log
+    from omniai.core.prewarm import HOT_ROUTES, prewarm_routes
+    from omniai.db.session import engine
+    from omniai.main import app
+
+    recorded = audit_log.stats()["recorded"]
+    try:
+        statuses = await prewarm_routes(app)
+    finally:
+        await engine.dispose()
+    assert statuses == dict.fromkeys(HOT_ROUTES, 200)
+    assert audit_log.stats()["recorded"] == recorded
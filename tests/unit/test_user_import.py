@@ -0,0 +1,90 @@
+import json
+
+import httpx
+import pytest
+
+from omniai.services.provisioning import read_records
+
+BASE_URL = "http://app:8000"
+PASSWORD = "SecurePass123!"
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def _owner_headers(ac: httpx.AsyncClient, email: str) -> dict[str, str]:
+    await ac.post("/v1/auth/signup", json={"email": email, "password": PASSWORD})
+    r = await ac.post("/v1/auth/login", data={"username": email, "password": PASSWORD})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+# Records split across chunks are reassembled; bad lines are reported 1
+@pytest.mark.asyncio
+async def test_read_records_across_chunks():
+    jsonl = [r async for r in read_records(_chunks(b'{"email": "a@x.io"}\n{"em', b'ail": "b@x.io"}\nnot json\n'), "jsonl")]
+    assert jsonl[0] == (1, {"email": "a@x.io"})
+    assert jsonl[1] == (2, {"email": "b@x.io"})
+    assert jsonl[2][0] == 3 and isinstance(jsonl[2][1], str)
+
+    csv_rows = [r async for r in read_records(_chunks(b"Email,password\r\na@x.io,P", b"w1!\r\n\r\nb@x.io\n"), "csv")]
+    assert csv_rows[0] == (2, {"email": "a@x.io", "password": "Pw1!"})
+    assert csv_rows[1][0] == 4 and isinstance(csv_rows[1][1], str)
+
+
+# JSONL import streams one result per row plus a summary 2
+@pytest.mark.asyncio
+async def test_import_users_jsonl():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        owner = "import.owner@omniai.dev"
+        headers = await _owner_headers(ac, owner)
+        body = "\n".join([
+            json.dumps({"email": "farmer.one@omniai.dev", "password": PASSWORD}),
+            json.dumps({"email": "farmer.two@omniai.dev", "password": "weak"}),
+            json.dumps({"email": "farmer.one@omniai.dev", "password": PASSWORD}),
+            json.dumps({"email": owner, "password": PASSWORD}),
+            "{broken",
+        ])
+        r = await ac.post(
+            "/v1/users/import",
+            content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert r.status_code == 200
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        rows = sorted(lines[:-1], key=lambda line: line["line"])  # rejected rows are reported first
+        assert [row["status"] for row in rows] == ["created", "invalid", "duplicate", "exists", "invalid"]
+        assert rows[1]["errors"][0]["field"] == "password"
+        assert "weak" not in json.dumps(rows[1])  # rejected input is never echoed
+        assert lines[-1]["summary"] == {"created": 1, "exists": 1, "duplicate": 1, "invalid": 2, "failed": 0}
+
+        # The imported user can log in, owns a personal org and is a member of the importer's org
+        farmer = await _owner_headers(ac, "farmer.one@omniai.dev")
+        me = (await ac.get("/v1/me", headers=farmer)).json()
+        assert {org["role"] for org in me["organizations"]} == {"owner", "member"}
+
+        # ...but, being a plain member there, can't import into it
+        coop_id = next(org["id"] for org in me["organizations"] if org["role"] == "member")
+        r = await ac.post(
+            "/v1/users/import",
+            content=body,
+            headers={**farmer, "X-Tenant-ID": coop_id, "Content-Type": "application/x-ndjson"},
+        )
+        assert r.status_code == 403
+
+
+# CSV import, and unsupported content types are refused 3
+@pytest.mark.asyncio
+async def test_import_users_csv():
+    async with httpx.AsyncClient(base_url=BASE_URL) as ac:
+        headers = await _owner_headers(ac, "import.csv.owner@omniai.dev")
+        emails = [f"csv.farmer.{n}@omniai.dev" for n in range(3)]
+        body = "email,password\n" + "".join(f"{email},{PASSWORD}\n" for email in emails)
+        r = await ac.post("/v1/users/import", content=body, headers={**headers, "Content-Type": "text/csv"})
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        assert [line["email"] for line in lines[:-1]] == emails
+        assert lines[-1]["summary"]["created"] == 3
+
+        r = await ac.post("/v1/users/import", content=body, headers={**headers, "Content-Type": "text/plain"})
+        assert r.status_code == 415